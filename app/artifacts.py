@@ -0,0 +1,287 @@
+# app/artifacts.py
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd необязателен, по умолчанию используется gzip
+    zstandard = None
+
+logger = logging.getLogger('app.artifacts')
+
+MANIFEST = "manifest.jsonl"
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def new_run_id() -> str:
+    """
+    Sortable run identifier, e.g. "20261017T230501-3f9a1c"
+    """
+    return f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+def url_digest(url: str) -> str:
+    return hashlib.sha1((url or "").encode("utf-8")).hexdigest()[:16]
+
+
+def compress(data: bytes, codec: str, level: int) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level)
+
+
+def decompress(path: str) -> bytes:
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if path.endswith(".gz"):
+        return gzip.decompress(data)
+    return data
+
+
+class RunArtifacts:
+    """
+    The store bound to one run, passed down to the functions that load pages
+    """
+
+    def __init__(self, store: 'ArtifactStore', run_id: str):
+        self.store = store
+        self.run_id = run_id
+
+    def save(self, url: str, content, kind: str = "page") -> None:
+        self.store.save(self.run_id, url, content, kind=kind)
+
+
+class ArtifactStore:
+    """
+    Compressed debug snapshots (rendered pages, API responses) grouped by
+    run and keyed by URL.
+
+    save() only puts the snapshot on a queue; a background thread
+    compresses and writes it, so the scrape never waits for the disk. When
+    the queue is full the snapshot is dropped and counted. Each run is a
+    directory with one file per (kind, URL) and a manifest.jsonl describing
+    them; whole runs are evicted, oldest first, once they are older than
+    max_age_days or the store exceeds max_bytes.
+
+    The saved runs are the fixtures for replay mode and the benchmarks.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 200 * 1024 * 1024, max_age_days: float = 14,
+                 codec: str = "gzip", level: Optional[int] = None, queue_size: int = 256):
+        if codec == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, compressing debug artifacts with gzip")
+            codec = "gzip"
+        if codec not in SUFFIXES:
+            raise ValueError(f"Unknown artifact codec: {codec}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.codec = codec
+        self.level = level if level is not None else (6 if codec == "gzip" else 3)
+        self.stats = {"saved": 0, "dropped": 0, "errors": 0, "bytes_in": 0, "bytes_out": 0, "runs_evicted": 0}
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._sizes: Dict[str, int] = {}
+        os.makedirs(directory, exist_ok=True)
+        for run_id in self.runs():
+            self._sizes[run_id] = self._run_size(run_id)
+
+    @classmethod
+    def from_config(cls, config) -> Optional['ArtifactStore']:
+        if not config.get('ARTIFACTS_ENABLED', True):
+            return None
+        return cls(
+            directory=config.get('ARTIFACTS_DIR', 'debug/artifacts'),
+            max_bytes=int(config.get('ARTIFACTS_MAX_MB', 200) * 1024 * 1024),
+            max_age_days=config.get('ARTIFACTS_MAX_AGE_DAYS', 14),
+            codec=config.get('ARTIFACTS_CODEC', 'gzip'),
+        )
+
+    # --- writing ---
+
+    def for_run(self, run_id: Optional[str] = None) -> RunArtifacts:
+        """
+        Starts a new run (or continues run_id) and applies the budget to older runs
+        """
+        self._put(("budget", None, None, None, None))
+        return RunArtifacts(self, run_id or new_run_id())
+
+    def save(self, run_id: str, url: str, content, kind: str = "page") -> None:
+        """
+        Queues a snapshot: str, bytes, or a JSON-serializable object
+        """
+        self._put(("save", run_id, url, kind, content))
+
+    def _put(self, task):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="artifact-writer", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(task)
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until queued snapshots are on disk. Returns False on timeout.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _worker(self):
+        while True:
+            action, run_id, url, kind, content = self._queue.get()
+            try:
+                if action == "save":
+                    self._write(run_id, url, kind, content)
+                self._enforce_budget(keep=run_id)
+            except Exception as e:
+                with self._lock:
+                    self.stats["errors"] += 1
+                logger.warning(f"Could not write debug artifact for {url}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, run_id: str, url: str, kind: str, content):
+        if isinstance(content, str):
+            data, content_type = content.encode("utf-8"), "text"
+        elif isinstance(content, (bytes, bytearray)):
+            data, content_type = bytes(content), "bytes"
+        else:
+            data, content_type = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), "json"
+        packed = compress(data, self.codec, self.level)
+
+        run_dir = os.path.join(self.directory, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        name = f"{kind}-{url_digest(url)}{SUFFIXES[self.codec]}"
+        path = os.path.join(run_dir, name)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(packed)
+        os.replace(tmp, path)
+        entry = {"url": url, "kind": kind, "file": name, "type": content_type,
+                 "size": len(data), "stored": len(packed), "saved_at": time.time()}
+        with open(os.path.join(run_dir, MANIFEST), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+        # stats и _sizes читают и потоки скрапера (summary, _put)
+        with self._lock:
+            self._sizes[run_id] = self._sizes.get(run_id, 0) + len(packed) - previous
+            self.stats["saved"] += 1
+            self.stats["bytes_in"] += len(data)
+            self.stats["bytes_out"] += len(packed)
+
+    def _run_size(self, run_id: str) -> int:
+        run_dir = os.path.join(self.directory, run_id)
+        return sum(os.path.getsize(os.path.join(run_dir, name)) for name in os.listdir(run_dir))
+
+    def _enforce_budget(self, keep: Optional[str] = None):
+        """
+        Removes runs past max_age, then the oldest runs until under
+        max_bytes. The run being written is never removed.
+        """
+        now = time.time()
+        with self._lock:
+            total = sum(self._sizes.values())
+        for run_id in self.runs():
+            if run_id == keep:
+                continue
+            run_dir = os.path.join(self.directory, run_id)
+            expired = now - os.path.getmtime(run_dir) > self.max_age
+            if not expired and total <= self.max_bytes:
+                break
+            with self._lock:
+                total -= self._sizes.pop(run_id, 0)
+                self.stats["runs_evicted"] += 1
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    # --- reading (replay fixtures) ---
+
+    def runs(self) -> List[str]:
+        """
+        Stored run ids, oldest first
+        """
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.isfile(os.path.join(self.directory, name, MANIFEST)))
+
+    def entries(self, run_id: str) -> List[dict]:
+        """
+        Manifest of a run; for a URL saved twice only the latest entry is kept
+        """
+        latest: Dict[Tuple[str, str], dict] = {}
+        with open(os.path.join(self.directory, run_id, MANIFEST), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    latest[(entry["kind"], entry["url"])] = entry
+        return list(latest.values())
+
+    def read(self, run_id: str, entry: dict):
+        data = decompress(os.path.join(self.directory, run_id, entry["file"]))
+        if entry.get("type") == "bytes":
+            return data
+        text = data.decode("utf-8")
+        return json.loads(text) if entry.get("type") == "json" else text
+
+    def load(self, run_id: str, url: str, kind: str = "page"):
+        for entry in self.entries(run_id):
+            if entry["url"] == url and entry["kind"] == kind:
+                return self.read(run_id, entry)
+        return None
+
+    def iter_snapshots(self, run_id: Optional[str] = None, kind: Optional[str] = None) -> Iterator[Tuple[dict, object]]:
+        """
+        (manifest entry, content) pairs of one run, or of every stored run
+        """
+        for run in ([run_id] if run_id else self.runs()):
+            for entry in self.entries(run):
+                if kind is None or entry["kind"] == kind:
+                    yield dict(entry, run_id=run), self.read(run, entry)
+
+    def summary(self) -> str:
+        with self._lock:
+            s = dict(self.stats)
+            runs_kept = len(self._sizes)
+        ratio = s["bytes_in"] / s["bytes_out"] if s["bytes_out"] else 0
+        return (f"{s['saved']} saved ({s['bytes_in'] // 1024} KB -> {s['bytes_out'] // 1024} KB {self.codec}, "
+                f"x{ratio:.1f}), {s['dropped']} dropped, {s['errors']} errors, "
+                f"{s['runs_evicted']} runs evicted, {runs_kept} runs kept")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store(config) -> Optional[ArtifactStore]:
+    """
+    Process-wide artifact store, or None when disabled
+    """
+    global _store
+    if not config.get('ARTIFACTS_ENABLED', True):
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore.from_config(config)
+        return _store
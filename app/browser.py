@@ -0,0 +1,290 @@
+# app/browser.py
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+import psutil
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+from app.rate_limiter import get_rate_limiter
+from app.resource_filter import enable_performance_log
+
+logger = logging.getLogger('app.browser')
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+def build_chrome_options() -> Options:
+    """
+    Headless Chrome options used by every scraper driver
+    """
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-notifications")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    return chrome_options
+
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path() -> str:
+    """
+    Resolves the chromedriver binary once per process.
+
+    CHROMEDRIVER_PATH (set in the Dockerfile) wins when the file exists,
+    otherwise webdriver-manager downloads or finds a matching driver.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path:
+            return _driver_path
+
+        env_path = os.getenv("CHROMEDRIVER_PATH")
+        if env_path and os.path.isfile(env_path):
+            _driver_path = env_path
+        else:
+            if env_path:
+                logger.warning(f"CHROMEDRIVER_PATH={env_path} not found, falling back to webdriver-manager")
+            _driver_path = ChromeDriverManager().install()
+
+        logger.info(f"Using chromedriver at {_driver_path}")
+        return _driver_path
+
+
+def create_driver(driver_path: Optional[str] = None, resource_filter=None, performance_log: bool = False):
+    """
+    Starts a new headless Chrome instance, optionally with a ResourceFilter
+    applied. performance_log enables the log the page status is read from
+    (the resource filter enables it as well).
+    """
+    if not driver_path:
+        driver_path = resolve_driver_path()
+    chrome_options = build_chrome_options()
+    if resource_filter is not None:
+        resource_filter.prepare_options(chrome_options)
+    elif performance_log:
+        enable_performance_log(chrome_options)
+
+    driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+
+    if resource_filter is not None:
+        try:
+            resource_filter.apply(driver)
+        except WebDriverException as e:
+            logger.warning(f"Could not apply resource filter: {e}")
+    return driver
+
+
+def load_url(driver, url: str, limiter=None) -> float:
+    """
+    driver.get(url) behind the shared per-host rate limiter.
+    Returns the time spent waiting for the limiter. Offline drivers
+    (replay mode) are not rate limited.
+    """
+    if getattr(driver, "offline", False):
+        driver.get(url)
+        return 0.0
+    waited = (limiter or get_rate_limiter()).acquire(url)
+    driver.get(url)
+    return waited
+
+
+def browser_rss_mb(driver) -> Optional[float]:
+    """
+    Resident memory of chromedriver and all Chrome processes it spawned, in MB
+    """
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def is_driver_healthy(driver) -> bool:
+    """
+    Cheap round trip to check that the browser session is still usable
+    """
+    try:
+        return driver.execute_script("return 1;") == 1
+    except Exception:
+        return False
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning(f"Error while quitting driver: {e}")
+
+
+class DriverPool:
+    """
+    Bounded pool of headless Chrome drivers shared by scraper worker threads.
+
+    Drivers are started lazily up to `size`, health-checked before every
+    checkout and replaced when a check fails. A driver is recycled after
+    `max_pages` checkouts or once its Chrome process tree uses more than
+    `max_rss_mb` of memory (0 disables either limit).
+    """
+
+    def __init__(self, size: int = 3, factory=None, max_pages: int = 0, max_rss_mb: float = 0):
+        self.size = max(1, int(size))
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self._factory = factory or create_driver
+        self._idle = deque()
+        self._created = 0
+        self._pages = {}
+        self._lock = threading.Lock()
+        # Ждущие выдачи будятся и при возврате драйвера, и при освобождении места (_discard)
+        self._available = threading.Condition(self._lock)
+        self._closed = False
+
+    def _new_driver(self):
+        driver = self._factory()
+        with self._lock:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _checkout(self, timeout: Optional[float]):
+        """
+        Idle driver, or a new one while fewer than `size` exist. Waits for
+        either otherwise; raises queue.Empty after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._available:
+            while True:
+                if self._idle:
+                    return self._idle.popleft()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._available.wait(remaining)
+
+        try:
+            return self._new_driver()
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+
+    def _discard(self, driver):
+        quit_driver(driver)
+        with self._available:
+            self._created -= 1
+            self._pages.pop(id(driver), None)
+            self._available.notify()
+
+    def _needs_recycle(self, driver) -> bool:
+        with self._lock:
+            self._pages[id(driver)] = pages = self._pages.get(id(driver), 0) + 1
+
+        if self.max_pages and pages >= self.max_pages:
+            logger.info(f"Recycling driver after {pages} pages")
+            return True
+
+        if self.max_rss_mb:
+            rss = browser_rss_mb(driver)
+            if rss is not None and rss > self.max_rss_mb:
+                logger.info(f"Recycling driver using {rss:.0f} MB (limit {self.max_rss_mb:.0f} MB)")
+                return True
+
+        return False
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Returns a healthy driver, starting or replacing one if needed
+        """
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+
+        while True:
+            driver = self._checkout(timeout)
+            if is_driver_healthy(driver):
+                return driver
+            logger.warning("Discarding unhealthy driver from pool")
+            self._discard(driver)
+
+    def release(self, driver, broken: bool = False):
+        if broken or self._closed or self._needs_recycle(driver):
+            self._discard(driver)
+        else:
+            with self._available:
+                self._idle.append(driver)
+                self._available.notify()
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        """
+        Context manager that checks a driver out of the pool and returns it
+        """
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = not is_driver_healthy(driver)
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self):
+        self._closed = True
+        with self._available:
+            drivers = list(self._idle)
+            self._idle.clear()
+        for driver in drivers:
+            self._discard(driver)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_browser_pool(size: int = 3, max_pages: int = 0, max_rss_mb: float = 0,
+                     resource_filter=None) -> DriverPool:
+    """
+    Process-wide pool of warm browsers reused across scheduler runs.
+
+    The pool is created on first use and closed at interpreter exit, so the
+    Chrome cold start is paid once per process instead of once per scrape.
+    With the rate limiter enabled the drivers keep a performance log even
+    without a resource filter, so 429/503 pages slow the host down.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool._closed:
+            performance_log = get_rate_limiter().enabled
+            _shared_pool = DriverPool(size=size, max_pages=max_pages, max_rss_mb=max_rss_mb,
+                                      factory=lambda: create_driver(resource_filter=resource_filter,
+                                                                    performance_log=performance_log))
+            atexit.register(_shared_pool.close)
+        return _shared_pool
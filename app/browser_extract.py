@@ -0,0 +1,122 @@
+# app/browser_extract.py
+import logging
+from typing import List, Dict
+
+logger = logging.getLogger('app.browser_extract')
+
+# JavaScript-версия extract_article_data из levitin_scraper.py: выполняется прямо в странице
+# и возвращает только записи title/url/summary. Правила должны совпадать с Python-версией.
+EXTRACT_ITEMS_SCRIPT = """
+var selector = arguments[0];
+var baseUrl = arguments[1];
+
+var HEADING_SELECTOR = "h1, h2, h3, h4, h5, .title, .heading, .card-title";
+var SUMMARY_SELECTORS = [
+    "p", ".description", ".preview-text", ".text", ".tour-description",
+    ".short-description", ".excerpt", ".summary", ".card-text",
+    ".content", ".teaser", ".subtitle"
+];
+var SKIP_PARENTS = {SCRIPT: true, STYLE: true, TEMPLATE: true};
+
+// Аналог BeautifulSoup get_text(strip=True)
+function strippedText(el) {
+    var parts = [];
+    var walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT, null);
+    var node;
+    while ((node = walker.nextNode())) {
+        if (node.parentNode && SKIP_PARENTS[node.parentNode.nodeName]) {
+            continue;
+        }
+        var t = node.nodeValue.trim();
+        if (t) {
+            parts.push(t);
+        }
+    }
+    return parts.join("");
+}
+
+function extract(item) {
+    var aTags = item.querySelectorAll("a[href]");
+    var hTags = item.querySelectorAll(HEADING_SELECTOR);
+    var i, j, text;
+
+    if (!aTags.length && !hTags.length) {
+        var content = strippedText(item);
+        if (content && content.length > 20) {
+            return {
+                title: content.slice(0, 50),
+                href: "",
+                summary: content.length > 50 ? content.slice(50, 200) : ""
+            };
+        }
+        return null;
+    }
+
+    var href = "";
+    for (i = 0; i < aTags.length; i++) {
+        href = aTags[i].getAttribute("href") || "";
+        if (href && href.trim() && href.indexOf("#") !== 0 && href.indexOf("javascript:") !== 0) {
+            if (href.indexOf("http") !== 0) {
+                href = baseUrl.replace(/\\/+$/, "") + "/" + href.replace(/^\\/+/, "");
+            }
+            break;
+        }
+    }
+
+    var title = "";
+    for (i = 0; i < hTags.length && !title; i++) {
+        text = strippedText(hTags[i]);
+        if (text && text.length > 3) {
+            title = text;
+        }
+    }
+    for (i = 0; i < aTags.length && !title; i++) {
+        text = strippedText(aTags[i]);
+        if (text && text.length > 3) {
+            title = text;
+        }
+    }
+
+    var summary = "";
+    for (i = 0; i < SUMMARY_SELECTORS.length && !summary; i++) {
+        var tags = item.querySelectorAll(SUMMARY_SELECTORS[i]);
+        for (j = 0; j < tags.length; j++) {
+            text = strippedText(tags[j]);
+            if (text && text.length > 10 && text !== title) {
+                summary = text;
+                break;
+            }
+        }
+    }
+
+    if (!summary) {
+        var img = item.querySelector("img");
+        if (img && img.getAttribute("alt")) {
+            summary = img.getAttribute("alt");
+        }
+    }
+
+    if (!title || (!href && !summary)) {
+        return null;
+    }
+    return {title: title, url: href, summary: summary};
+}
+
+var items = document.querySelectorAll(selector);
+var records = [];
+for (var k = 0; k < items.length; k++) {
+    records.push(extract(items[k]));
+}
+return records;
+"""
+
+
+def extract_items_in_browser(driver, selector: str, base_url: str) -> List[Dict[str, str]]:
+    """
+    Runs the article extraction inside the page and returns only the records,
+    so the full DOM never travels over the WebDriver connection.
+
+    Raises WebDriverException if the script cannot be executed.
+    """
+    records = driver.execute_script(EXTRACT_ITEMS_SCRIPT, selector, base_url) or []
+    return [r for r in records if r]
@@ -10,6 +10,28 @@ class Config:
     # OpenAI settings
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OPENAI_ASSISTANT_ID = os.getenv("OPENAI_ASSISTANT_ID")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # например локальный fake_openai.py для отладки
+    OPENAI_RUN_MODE = os.getenv("OPENAI_RUN_MODE", "stream")  # stream - события run, poll - опрос статуса
+    OPENAI_RUN_TIMEOUT = float(os.getenv("OPENAI_RUN_TIMEOUT", "120"))  # сколько секунд ждать ответа ассистента
+    OPENAI_POLL_INITIAL = float(os.getenv("OPENAI_POLL_INITIAL", "0.25"))  # первый интервал опроса, затем x1.5
+    OPENAI_POLL_MAX = float(os.getenv("OPENAI_POLL_MAX", "2"))  # максимальный интервал опроса
+    OPENAI_REWRITE_BACKEND = os.getenv("OPENAI_REWRITE_BACKEND", "assistants")  # assistants или chat (один запрос)
+    OPENAI_CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "")  # по умолчанию модель ассистента
+    OPENAI_REWRITE_INSTRUCTIONS = os.getenv("OPENAI_REWRITE_INSTRUCTIONS", "")  # по умолчанию инструкции ассистента
+    OPENAI_REWRITE_INSTRUCTIONS_FILE = os.getenv("OPENAI_REWRITE_INSTRUCTIONS_FILE", "")
+    REWRITE_CACHE_ENABLED = os.getenv("REWRITE_CACHE_ENABLED", "true").lower() == "true"
+    REWRITE_CACHE_DIR = os.getenv("REWRITE_CACHE_DIR", "cache/rewrites")
+    REWRITE_CACHE_MAX_MB = float(os.getenv("REWRITE_CACHE_MAX_MB", "20"))  # после превышения удаляются давно не использованные
+    REWRITE_CACHE_MAX_ENTRIES = int(os.getenv("REWRITE_CACHE_MAX_ENTRIES", "5000"))
+    REWRITE_CACHE_TTL_DAYS = float(os.getenv("REWRITE_CACHE_TTL_DAYS", "90"))  # 0 - без срока
+    REWRITE_BATCH_SIZE = int(os.getenv("REWRITE_BATCH_SIZE", "20"))  # статей за один пакет, 0 - без пакетного переписывания
+    REWRITE_BATCH_INTERVAL_MINUTES = int(os.getenv("REWRITE_BATCH_INTERVAL_MINUTES", "30"))
+    REWRITE_CONCURRENCY = int(os.getenv("REWRITE_CONCURRENCY", "4"))  # одновременных переписываний
+    REWRITE_MIN_CONCURRENCY = int(os.getenv("REWRITE_MIN_CONCURRENCY", "1"))  # нижняя граница после 429
+    REWRITE_RECOVER_AFTER = int(os.getenv("REWRITE_RECOVER_AFTER", "10"))  # успешных ответов до увеличения на 1
+    REWRITE_CHUNK_TOKENS = int(os.getenv("REWRITE_CHUNK_TOKENS", "1500"))  # длинные тексты переписываются частями параллельно, 0 - целиком
+    REWRITE_MAX_INPUT_TOKENS = int(os.getenv("REWRITE_MAX_INPUT_TOKENS", "8000"))  # более длинные тексты сокращаются, 0 - без ограничения
+    REWRITE_OVERFLOW = os.getenv("REWRITE_OVERFLOW", "summarize")  # summarize (первые предложения абзацев) или truncate
     
     # DALL-E settings
     DALLE_MODEL = os.getenv("DALLE_MODEL", "dall-e-3")
@@ -17,7 +39,15 @@ class Config:
     DALLE_QUALITY = os.getenv("DALLE_QUALITY", "standard")
 
     # RSS Feed
-    RSS_FEED_URL = os.getenv("RSS_FEED_URL")    # Telegram settings
+    RSS_FEED_URL = os.getenv("RSS_FEED_URL")  # одна или несколько лент (URL или путь к файлу) через запятую
+    RSS_CONCURRENCY = int(os.getenv("RSS_CONCURRENCY", "4"))  # лент, загружаемых одновременно
+    RSS_TIMEOUT = float(os.getenv("RSS_TIMEOUT", "15"))
+    
+    # Ingestion sources
+    INGEST_SOURCES = os.getenv("INGEST_SOURCES", "levitin_api,levitin_selenium,rss")  # порядок запуска источников
+    SOURCE_INTERVALS = os.getenv("SOURCE_INTERVALS", "")  # свой интервал в минутах, например "rss=30"; остальные раз в день
+    
+    # Telegram settings
     TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")  # Поддержка имени TELEGRAM_BOT_TOKEN из docker-compose
     TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
     
@@ -26,6 +56,65 @@ class Config:
     PUBLISH_INTERVAL_MINUTES = int(os.getenv("PUBLISH_INTERVAL_MINUTES", "10"))
     MAX_ARTICLES_PER_RUN = int(os.getenv("MAX_ARTICLES_PER_RUN", "3"))
     
+    # Scraper settings
+    SCRAPE_PAGE_TIMEOUT = float(os.getenv("SCRAPE_PAGE_TIMEOUT", "45"))  # максимум ожидания раздела, сек
+    SCRAPE_DETAIL_TIMEOUT = float(os.getenv("SCRAPE_DETAIL_TIMEOUT", "15"))  # максимум ожидания страницы статьи, сек
+    SCRAPE_QUIET_MS = int(os.getenv("SCRAPE_QUIET_MS", "500"))  # сколько мс DOM должен быть неизменным
+    SCRAPE_POOL_SIZE = int(os.getenv("SCRAPE_POOL_SIZE", "3"))  # число параллельных браузеров Chrome
+    SCRAPE_BATCH_SIZE = int(os.getenv("SCRAPE_BATCH_SIZE", "20"))  # статей в одной партии проверки и записи в БД
+    SCRAPE_BROWSER_EXTRACT = os.getenv("SCRAPE_BROWSER_EXTRACT", "true").lower() == "true"  # извлечение статей внутри страницы
+    SCRAPE_INCREMENTAL = os.getenv("SCRAPE_INCREMENTAL", "true").lower() == "true"  # пропуск разделов без изменений
+    SCRAPE_EARLY_STOP_SEEN = int(os.getenv("SCRAPE_EARLY_STOP_SEEN", "3"))  # стоп после N подряд уже виденных статей
+    SCRAPE_REPLAY_DIR = os.getenv("SCRAPE_REPLAY_DIR", "")  # снимки (debug/artifacts) вместо Chrome, для офлайн-прогонов
+    SCRAPE_REPLAY_DEFAULT_PAGE = os.getenv("SCRAPE_REPLAY_DEFAULT_PAGE", "")  # HTML для URL без снимка, например levitin_page.html
+    NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "true").lower() == "true"  # отсев почти-дубликатов при записи
+    NEAR_DUP_MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", "6"))  # макс. расстояние Хэмминга SimHash (из 64 бит), не больше 6
+    FRONTIER_ENABLED = os.getenv("FRONTIER_ENABLED", "true").lower() == "true"  # обход только тех URL, что пора проверить
+    FRONTIER_SITEMAP_URL = os.getenv("FRONTIER_SITEMAP_URL", "https://www.levitin.de/sitemap.xml")
+    FRONTIER_DEFAULT_HOURS = float(os.getenv("FRONTIER_DEFAULT_HOURS", "24"))  # начальный интервал повторного обхода
+    FRONTIER_MIN_HOURS = float(os.getenv("FRONTIER_MIN_HOURS", "6"))
+    FRONTIER_MAX_HOURS = float(os.getenv("FRONTIER_MAX_HOURS", "168"))
+    FRONTIER_SLACK_MINUTES = float(os.getenv("FRONTIER_SLACK_MINUTES", "60"))  # допуск, чтобы ежедневный запуск не пропускал URL
+    FRONTIER_MAX_PAGES = int(os.getenv("FRONTIER_MAX_PAGES", "20"))  # страниц из очереди (sitemap, ссылки) за запуск
+    SECTION_ADAPTIVE_TIMEOUTS = os.getenv("SECTION_ADAPTIVE_TIMEOUTS", "true").lower() == "true"  # таймаут раздела по истории
+    SECTION_HISTORY_RUNS = int(os.getenv("SECTION_HISTORY_RUNS", "20"))  # сколько последних визитов учитывать для p95
+    SECTION_TIMEOUT_FACTOR = float(os.getenv("SECTION_TIMEOUT_FACTOR", "1.5"))  # запас над p95 времени ожидания
+    SECTION_TIMEOUT_MIN = float(os.getenv("SECTION_TIMEOUT_MIN", "10"))
+    SECTION_TIMEOUT_MAX = float(os.getenv("SECTION_TIMEOUT_MAX", os.getenv("SCRAPE_PAGE_TIMEOUT", "45")))
+    SECTION_LOW_YIELD_RUNS = int(os.getenv("SECTION_LOW_YIELD_RUNS", "5"))  # визитов без новых статей до урежения обхода
+    BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "200"))  # перезапуск браузера после N страниц
+    BROWSER_MAX_RSS_MB = float(os.getenv("BROWSER_MAX_RSS_MB", "1024"))  # ... или при превышении памяти
+    BROWSER_BLOCK_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "true").lower() == "true"
+    BROWSER_BLOCK_TYPES = os.getenv("BROWSER_BLOCK_TYPES", "image,font,media,tracker")
+    BROWSER_DENY_DOMAINS = os.getenv("BROWSER_DENY_DOMAINS", "")  # дополнительные домены через запятую
+    BROWSER_ALLOW_DOMAINS = os.getenv("BROWSER_ALLOW_DOMAINS", "")  # домены, которые никогда не блокируются
+    
+    # API probing settings
+    API_PROBE_TIMEOUT = float(os.getenv("API_PROBE_TIMEOUT", "10"))  # таймаут одного запроса к API, сек
+    API_PROBE_DEADLINE = float(os.getenv("API_PROBE_DEADLINE", "15"))  # общий лимит на опрос всех эндпоинтов, сек
+    API_PROBE_PER_HOST = int(os.getenv("API_PROBE_PER_HOST", "4"))  # одновременных запросов к одному хосту
+    
+    # Rate limiting (общий для Selenium, API и загрузки изображений)
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_PER_HOST = float(os.getenv("RATE_LIMIT_PER_HOST", "2"))  # запросов в секунду к одному хосту
+    RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "4"))  # сколько запросов можно сделать подряд без ожидания
+    RATE_LIMIT_HOSTS = os.getenv("RATE_LIMIT_HOSTS", "")  # свои лимиты, например "www.levitin.de=1,example.org=5"
+    RATE_LIMIT_MIN = float(os.getenv("RATE_LIMIT_MIN", "0.2"))  # нижняя граница после ответов 429/503
+    
+    # HTTP cache settings
+    HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "cache/http")
+    HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "50"))  # после превышения удаляются давно не использованные ответы
+    HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", "300"))  # сколько секунд ответ используется без запроса к серверу
+    HTTP_CACHE_TTLS = os.getenv("HTTP_CACHE_TTLS", "")  # по эндпоинтам, например "/api/tours=3600,/api/news=600"
+    
+    # Debug snapshots (страницы и ответы API, они же фикстуры для бенчмарков)
+    ARTIFACTS_ENABLED = os.getenv("ARTIFACTS_ENABLED", "true").lower() == "true"
+    ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR", "debug/artifacts")
+    ARTIFACTS_CODEC = os.getenv("ARTIFACTS_CODEC", "gzip")  # gzip или zstd (нужен пакет zstandard)
+    ARTIFACTS_MAX_MB = float(os.getenv("ARTIFACTS_MAX_MB", "200"))  # после превышения удаляются самые старые запуски
+    ARTIFACTS_MAX_AGE_DAYS = float(os.getenv("ARTIFACTS_MAX_AGE_DAYS", "14"))
+    
     # Logging settings
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_LEVEL_VALUE = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
@@ -0,0 +1,150 @@
+# app/content_extractor.py
+import re
+from typing import List, Optional
+
+from lxml import etree
+
+from app.fast_extractor import parse_html, SKIP_TEXT_TAGS
+
+# Блоки, которые могут содержать основной текст статьи
+CANDIDATE_TAGS = {"div", "section", "article", "main", "td", "blockquote", "li", "form"}
+# Элементы, чей текст никогда не является содержимым статьи
+IGNORED_TAGS = SKIP_TEXT_TAGS | {"noscript", "nav", "footer", "header", "aside", "iframe", "svg", "button", "select"}
+
+POSITIVE_RE = re.compile(r"article|body|content|description|entry|main|post|rich-text|story|text|tour", re.I)
+NEGATIVE_RE = re.compile(r"banner|comment|contact|cookie|footer|header|menu|modal|nav|popup|share|sidebar|social|widget", re.I)
+
+
+def _class_weight(el) -> int:
+    names = f"{el.get('class', '')} {el.get('id', '')}"
+    weight = 0
+    if NEGATIVE_RE.search(names):
+        weight -= 25
+    if POSITIVE_RE.search(names):
+        weight += 25
+    return weight
+
+
+class _Block:
+    __slots__ = ("el", "start", "end", "p_first", "p_last", "link_start", "link_end", "score")
+
+    def __init__(self, el, start, p_first, link_start):
+        self.el = el
+        self.start = start
+        self.end = start
+        self.p_first = p_first
+        self.p_last = p_first
+        self.link_start = link_start
+        self.link_end = link_start
+        self.score = 0.0
+
+
+def extract_main_content(html: str, min_paragraph_length: int = 1) -> str:
+    """
+    Readability-style main text extraction in a single DOM pass.
+
+    While walking the tree once, every paragraph adds a score (based on its
+    length and commas) to its parent block and half of it to the grandparent.
+    Blocks also track their text length, link text length and paragraph range.
+    The best block is chosen by score scaled by (1 - link density) and its
+    paragraphs are returned separated by blank lines.
+    """
+    tree = parse_html(html)
+
+    text_length = 0
+    link_chars = 0
+    paragraphs: List[str] = []
+    blocks: List[_Block] = []
+    stack: List[Optional[_Block]] = []
+    open_paragraph = None
+    open_link = None
+    ignore = 0
+
+    def add_text(text):
+        nonlocal text_length, link_chars
+        text = text.strip() if text else ""
+        if not text or ignore:
+            return
+        text_length += len(text)
+        if open_link is not None:
+            link_chars += len(text)
+        if open_paragraph is not None:
+            open_paragraph.append(text)
+
+    for event, el in etree.iterwalk(tree, events=("start", "end")):
+        tag = el.tag if isinstance(el.tag, str) else None
+
+        if event == "start":
+            if tag in IGNORED_TAGS:
+                ignore += 1
+            block = None
+            if tag in CANDIDATE_TAGS and not ignore:
+                block = _Block(el, text_length, len(paragraphs), link_chars)
+                blocks.append(block)
+            stack.append(block)
+            if tag == "p" and open_paragraph is None and not ignore:
+                open_paragraph = []
+            if tag == "a" and open_link is None:
+                open_link = el
+            if tag:
+                add_text(el.text)
+            continue
+
+        block = stack.pop()
+        if block is not None:
+            block.end = text_length
+            block.link_end = link_chars
+        if tag == "a" and open_link is el:
+            open_link = None
+        if tag == "p" and open_paragraph is not None and not ignore:
+            text = "".join(open_paragraph)
+            open_paragraph = None
+            if len(text) >= min_paragraph_length:
+                paragraphs.append(text)
+                score = 1 + text.count(",") + min(len(text) // 100, 3)
+                parents = [b for b in stack if b is not None][-2:]
+                if parents:
+                    parents[-1].score += score
+                if len(parents) == 2:
+                    parents[0].score += score / 2
+        if tag in IGNORED_TAGS:
+            ignore -= 1
+        if block is not None:
+            block.p_last = len(paragraphs)
+        add_text(el.tail)
+
+    best = None
+    best_score = 0.0
+    for block in blocks:
+        if block.p_last == block.p_first or block.score <= 0:
+            continue
+        length = block.end - block.start
+        link_density = (block.link_end - block.link_start) / length if length else 1.0
+        score = (block.score + _class_weight(block.el)) * (1 - link_density)
+        if score > best_score:
+            best, best_score = block, score
+
+    if best is None:
+        return ""
+    return "\n\n".join(paragraphs[best.p_first:best.p_last])
+
+
+def extract_page_title(html: str) -> str:
+    """
+    Title of a detail page: og:title, else the first <h1>, else <title>
+    """
+    if not html or not html.strip():
+        return ""
+    try:
+        root = parse_html(html)
+    except (etree.ParserError, ValueError):
+        return ""
+    for content in root.xpath("//meta[@property='og:title']/@content"):
+        if content.strip():
+            return content.strip()
+    for tag in ("h1", "title"):
+        for el in root.iter(tag):
+            text = " ".join(el.text_content().split())
+            if text:
+                return text
+    return ""
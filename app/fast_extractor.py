@@ -0,0 +1,170 @@
+# app/fast_extractor.py
+from functools import lru_cache
+from typing import Optional, Dict, List
+
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+# Те же правила, что и в extract_article_data, но разобранные в таблицы для одного прохода по дереву
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5"}
+HEADING_CLASSES = {"title", "heading", "card-title"}
+# Порядковый номер в summary_selectors: "p" идёт первым, затем классы
+SUMMARY_CLASSES = {
+    "description": 1, "preview-text": 2, "text": 3, "tour-description": 4,
+    "short-description": 5, "excerpt": 6, "summary": 7, "card-text": 8,
+    "content": 9, "teaser": 10, "subtitle": 11,
+}
+SUMMARY_SELECTOR_COUNT = 12
+# Текст внутри этих тегов BeautifulSoup не включает в get_text()
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+@lru_cache(maxsize=64)
+def compile_selector(selector: str) -> CSSSelector:
+    return CSSSelector(selector)
+
+
+def parse_html(html: str):
+    return lxml.html.document_fromstring(html)
+
+
+def select_items(tree, selector: str) -> list:
+    """
+    Elements matching selector, in document order
+    """
+    return compile_selector(selector)(tree)
+
+
+def _strip(text: Optional[str]) -> str:
+    return text.strip() if text else ""
+
+
+def extract_article_data_fast(item, base_url: str) -> Optional[Dict[str, str]]:
+    """
+    lxml version of extract_article_data that walks the item subtree once.
+
+    Every descendant is classified as link, heading, summary or image
+    candidate during the walk, and the stripped text pieces are collected
+    in one list so the text of any candidate is a slice of it.
+    Returns the same records as extract_article_data.
+    """
+    pieces: List[str] = []
+    stack = []
+    a_tags = []
+    h_tags = []
+    summaries = [[] for _ in range(SUMMARY_SELECTOR_COUNT)]
+    img = None
+    skip = 0
+
+    for event, el in etree.iterwalk(item, events=("start", "end")):
+        tag = el.tag if isinstance(el.tag, str) else None
+
+        if event == "start":
+            if tag in SKIP_TEXT_TAGS and el is not item:
+                skip += 1
+            entry = [el, len(pieces), 0]
+            stack.append(entry)
+            if tag and not skip:
+                text = _strip(el.text)
+                if text:
+                    pieces.append(text)
+
+            if el is item or tag is None:
+                continue
+
+            if tag == "a" and "href" in el.attrib:
+                a_tags.append(entry)
+            classes = el.get("class", "").split()
+            if tag in HEADING_TAGS or HEADING_CLASSES.intersection(classes):
+                h_tags.append(entry)
+            if tag == "p":
+                summaries[0].append(entry)
+            for cls in classes:
+                index = SUMMARY_CLASSES.get(cls)
+                if index is not None:
+                    summaries[index].append(entry)
+            if img is None and tag == "img":
+                img = el
+        else:
+            entry = stack.pop()
+            entry[2] = len(pieces)
+            if tag in SKIP_TEXT_TAGS and el is not item:
+                skip -= 1
+            if el is not item and not skip:
+                tail = _strip(el.tail)
+                if tail:
+                    pieces.append(tail)
+
+    def text_of(entry) -> str:
+        return "".join(pieces[entry[1]:entry[2]])
+
+    if not a_tags and not h_tags:
+        # Последняя попытка найти хоть что-то
+        text_content = "".join(pieces)
+        if text_content and len(text_content) > 20:
+            return {
+                "title": text_content[:50],
+                "href": "",
+                "summary": text_content[50:200] if len(text_content) > 50 else ""
+            }
+        return None
+
+    href = ""
+    for entry in a_tags:
+        href = entry[0].get("href", "")
+        if href and href.strip() and not href.startswith("#") and not href.startswith("javascript:"):
+            if not href.startswith("http"):
+                href = f"{base_url.rstrip('/')}/{href.lstrip('/')}"
+            break
+
+    title = ""
+    # Пробуем найти заголовок в h-тегах
+    for entry in h_tags:
+        text = text_of(entry)
+        if text and len(text) > 3:
+            title = text
+            break
+
+    # Если заголовок не найден, проверяем ссылки
+    if not title:
+        for entry in a_tags:
+            text = text_of(entry)
+            if text and len(text) > 3:
+                title = text
+                break
+
+    summary = ""
+    for candidates in summaries:
+        for entry in candidates:
+            text = text_of(entry)
+            if text and len(text) > 10 and text != title:
+                summary = text
+                break
+        if summary:
+            break
+
+    if not summary and img is not None and img.get("alt"):
+        summary = img.get("alt")
+
+    if not title or (not href and not summary):
+        return None
+
+    return {
+        "title": title,
+        "url": href,
+        "summary": summary
+    }
+
+
+def extract_records(html: str, selector: str, base_url: str) -> List[Dict[str, str]]:
+    """
+    Parse a rendered page and return article records for every matched item
+    """
+    tree = parse_html(html)
+    records = []
+    for item in select_items(tree, selector):
+        data = extract_article_data_fast(item, base_url)
+        if data:
+            records.append(data)
+    return records
@@ -0,0 +1,142 @@
+# app/fingerprints.py
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from app.models import ScrapeFingerprint, db, normalize_url, title_hash
+
+logger = logging.getLogger('app.fingerprints')
+
+
+def fingerprint_text(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+def fingerprint_records(records: Iterable[Dict]) -> str:
+    """
+    Order-sensitive fingerprint of a section's extracted item list
+    """
+    digest = hashlib.sha1()
+    for record in records:
+        line = "\x1f".join((record.get("title") or "", record.get("url") or "", record.get("summary") or ""))
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def record_key(record: Dict) -> Optional[str]:
+    """
+    Identity of an item across runs: normalized URL, else title hash
+    """
+    return normalize_url(record.get("url")) or title_hash(record.get("title"))
+
+
+def section_key(section_url: str) -> str:
+    return f"section:{section_url}"
+
+
+def detail_key(url: str) -> str:
+    return f"detail:{normalize_url(url)}"
+
+
+def load_fingerprints(keys: Iterable[str]) -> Dict[str, ScrapeFingerprint]:
+    keys = sorted(set(keys))
+    if not keys:
+        return {}
+    rows = ScrapeFingerprint.query.filter(ScrapeFingerprint.key.in_(keys)).all()
+    return {row.key: row for row in rows}
+
+
+def previous_item_keys(row: Optional[ScrapeFingerprint]) -> set:
+    if row is None or not row.item_keys:
+        return set()
+    try:
+        return set(json.loads(row.item_keys))
+    except ValueError:
+        return set()
+
+
+def take_until_seen(records: List[Dict], seen_keys: set, stop_after: int = 3) -> List[Dict]:
+    """
+    Leading records of a section up to the first run of `stop_after`
+    consecutive items that were already present last time. Sections list
+    the newest items first, so everything after such a run is old.
+    """
+    if not seen_keys or stop_after <= 0:
+        return records
+    consecutive = 0
+    for i, record in enumerate(records):
+        if record_key(record) in seen_keys:
+            consecutive += 1
+            if consecutive >= stop_after:
+                return records[:i + 1 - consecutive]
+        else:
+            consecutive = 0
+    return records
+
+
+def save_fingerprints(entries: Dict[str, Dict], existing: Optional[Dict[str, ScrapeFingerprint]] = None) -> int:
+    """
+    Upserts fingerprints and commits. entries maps key -> dict with
+    'fingerprint' and optionally 'item_keys'. Returns the number of keys
+    whose fingerprint changed.
+    """
+    if not entries:
+        return 0
+    existing = existing if existing is not None else load_fingerprints(entries)
+    now = datetime.utcnow()
+    changed = 0
+    try:
+        for key, entry in entries.items():
+            item_keys = entry.get("item_keys")
+            row = existing.get(key)
+            if row is None:
+                row = ScrapeFingerprint(key=key, changed_at=now)
+                db.session.add(row)
+                changed += 1
+            elif row.fingerprint != entry["fingerprint"]:
+                row.changed_at = now
+                changed += 1
+            row.fingerprint = entry["fingerprint"]
+            row.seen_at = now
+            if item_keys is not None:
+                row.item_keys = json.dumps(item_keys)
+                row.item_count = len(item_keys)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return changed
+
+
+class IncrementalReport:
+    """
+    Counts the work an incremental scrape avoided
+    """
+
+    def __init__(self):
+        self.sections = 0
+        self.sections_not_due = 0
+        self.sections_unchanged = 0
+        self.items = 0
+        self.items_unchanged = 0
+        self.items_early_stopped = 0
+        self.details_fetched = 0
+        self.details_skipped = 0
+        self.details_changed = 0
+        self.pages_fetched = 0
+
+    def summary(self) -> str:
+        if not self.sections and not self.pages_fetched:
+            return f"no sections scraped ({self.sections_not_due} not due)"
+        processed = self.items - self.items_unchanged - self.items_early_stopped
+        return (
+            f"{self.sections_not_due} sections not due, "
+            f"{self.sections_unchanged}/{self.sections} sections unchanged, "
+            f"{processed}/{self.items} items processed "
+            f"({self.items_unchanged} in unchanged sections, {self.items_early_stopped} after early stop), "
+            f"{self.details_fetched} detail pages fetched ({self.details_changed} changed), "
+            f"{self.details_skipped} skipped, {self.pages_fetched} frontier pages fetched"
+        )
@@ -0,0 +1,196 @@
+# app/frontier.py
+import io
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from lxml import etree
+
+from app.models import Article, CrawlUrl, db, normalize_url
+
+logger = logging.getLogger('app.frontier')
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def _parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """
+    W3C datetime from <lastmod> as naive UTC, like the model timestamps
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_sitemap(source) -> Tuple[List[Tuple[str, Optional[datetime]]], List[str]]:
+    """
+    Streams a sitemap (file path or binary file-like object).
+    Returns ([(url, lastmod)], [nested sitemap urls]) - the second list is
+    filled for sitemap index files.
+    """
+    urls, sitemaps = [], []
+    context = etree.iterparse(source, events=("end",),
+                              tag=(f"{{{SITEMAP_NS}}}url", f"{{{SITEMAP_NS}}}sitemap", "url", "sitemap"),
+                              resolve_entities=False, no_network=True)
+    for _, element in context:
+        loc = element.findtext(f"{{{SITEMAP_NS}}}loc") or element.findtext("loc")
+        if loc and loc.strip():
+            if etree.QName(element).localname == "sitemap":
+                sitemaps.append(loc.strip())
+            else:
+                lastmod = element.findtext(f"{{{SITEMAP_NS}}}lastmod") or element.findtext("lastmod")
+                urls.append((loc.strip(), _parse_lastmod(lastmod)))
+        element.clear()
+    return urls, sitemaps
+
+
+def read_sitemap(url: str, fetch, max_depth: int = 2) -> List[Tuple[str, Optional[datetime]]]:
+    """
+    URLs of a sitemap, following sitemap index files up to max_depth.
+    fetch(url) must return the response body as bytes.
+    """
+    found = []
+    pending = [(url, 0)]
+    while pending:
+        sitemap_url, depth = pending.pop(0)
+        try:
+            urls, nested = parse_sitemap(io.BytesIO(fetch(sitemap_url)))
+        except Exception as e:
+            logger.warning(f"Could not read sitemap {sitemap_url}: {e}")
+            continue
+        found.extend(urls)
+        if depth < max_depth:
+            pending.extend((nested_url, depth + 1) for nested_url in nested)
+    return found
+
+
+class Frontier:
+    """
+    Persistent, deduplicated URL queue with per-URL revisit intervals.
+
+    A URL that changed when fetched is revisited twice as often (down to
+    min_hours), an unchanged one half as often (up to max_hours). URLs are
+    due when next_fetch_at falls before now + slack, so a daily job does
+    not miss a URL that became due a few seconds after it started.
+    """
+
+    def __init__(self, default_hours: float = 24, min_hours: float = 6, max_hours: float = 168,
+                 slack_minutes: float = 60):
+        self.default_hours = default_hours
+        self.min_hours = min_hours
+        self.max_hours = max_hours
+        self.slack = timedelta(minutes=slack_minutes)
+
+    @classmethod
+    def from_config(cls, config) -> 'Frontier':
+        return cls(
+            default_hours=config.get('FRONTIER_DEFAULT_HOURS', 24),
+            min_hours=config.get('FRONTIER_MIN_HOURS', 6),
+            max_hours=config.get('FRONTIER_MAX_HOURS', 168),
+            slack_minutes=config.get('FRONTIER_SLACK_MINUTES', 60),
+        )
+
+    def add(self, urls: Iterable, kind: str = "detail", priority: int = 0, source: str = "link") -> int:
+        """
+        Adds urls (strings or (url, lastmod) pairs) to the frontier and
+        refreshes last_seen_at of known ones. A lastmod newer than the last
+        fetch makes the URL due immediately. Does not commit.
+        Returns the number of new URLs.
+        """
+        now = datetime.utcnow()
+        entries: Dict[str, Tuple[str, Optional[datetime]]] = {}
+        for item in urls:
+            url, lastmod = item if isinstance(item, tuple) else (item, None)
+            url_key = normalize_url(url)
+            if url_key:
+                entries.setdefault(url_key, (url[:500], lastmod))
+        if not entries:
+            return 0
+
+        existing = self._rows(entries)
+
+        added = 0
+        for url_key, (url, lastmod) in entries.items():
+            row = existing.get(url_key)
+            if row is None:
+                db.session.add(CrawlUrl(url_key=url_key, url=url, kind=kind, priority=priority, source=source,
+                                        first_seen_at=now, last_seen_at=now,
+                                        revisit_hours=self.default_hours, next_fetch_at=now))
+                added += 1
+                continue
+            row.last_seen_at = now
+            if priority > row.priority:
+                row.priority = priority
+            if lastmod and (row.last_fetched_at is None or lastmod > row.last_fetched_at):
+                row.next_fetch_at = min(row.next_fetch_at or now, now)
+        return added
+
+    def due(self, kind: str, limit: Optional[int] = None, exclude_articles: bool = False) -> List[CrawlUrl]:
+        """
+        URLs of `kind` whose revisit time has come, highest priority first.
+        With exclude_articles URLs already stored as articles are left out.
+        """
+        query = CrawlUrl.query.filter(CrawlUrl.kind == kind,
+                                      CrawlUrl.next_fetch_at <= datetime.utcnow() + self.slack)
+        if exclude_articles:
+            query = query.filter(~CrawlUrl.url_key.in_(
+                db.session.query(Article.url_key).filter(Article.url_key.isnot(None))))
+        query = query.order_by(CrawlUrl.priority.desc(), CrawlUrl.next_fetch_at)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    def _rows(self, urls: Iterable[str]) -> Dict[str, CrawlUrl]:
+        """
+        Known frontier rows of urls by url_key, loaded in batches of 500
+        """
+        keys = sorted({normalize_url(url) for url in urls} - {None, ""})
+        rows = {}
+        for i in range(0, len(keys), 500):
+            for row in CrawlUrl.query.filter(CrawlUrl.url_key.in_(keys[i:i + 500])):
+                rows[row.url_key] = row
+        return rows
+
+    def postpone(self, urls: Iterable[str]) -> None:
+        """
+        Moves urls max_hours ahead without fetching them (URLs that are
+        not worth a visit now). Does not commit.
+        """
+        next_fetch_at = datetime.utcnow() + timedelta(hours=self.max_hours)
+        for row in self._rows(urls).values():
+            row.next_fetch_at = next_fetch_at
+
+    def mark_fetched(self, url: str, changed: Optional[bool]) -> None:
+        self.mark_fetched_many({url: changed})
+
+    def mark_fetched_many(self, changes: Dict[str, Optional[bool]]) -> None:
+        """
+        Reschedules fetched URLs ({url: changed}). changed=None means the
+        fetch failed: the URL is retried after min_hours without touching
+        its interval. Does not commit.
+        """
+        rows = self._rows(changes)
+        now = datetime.utcnow()
+        for url, changed in changes.items():
+            row = rows.get(normalize_url(url))
+            if row is None:
+                continue
+            if changed is None:
+                row.next_fetch_at = now + timedelta(hours=self.min_hours)
+                continue
+            first_fetch = row.last_fetched_at is None
+            row.last_fetched_at = now
+            if changed:
+                row.last_changed_at = now
+            # Первая загрузка ничего не говорит о частоте изменений
+            if changed and not first_fetch:
+                row.revisit_hours = max(self.min_hours, row.revisit_hours / 2)
+            elif not changed:
+                row.revisit_hours = min(self.max_hours, row.revisit_hours * 2)
+            row.next_fetch_at = now + timedelta(hours=row.revisit_hours)
@@ -0,0 +1,248 @@
+# app/http_cache.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger('app.http_cache')
+
+
+def parse_ttls(value) -> Dict[str, float]:
+    """
+    "/api/tours=3600,/api/news=600" -> {"/api/tours": 3600.0, "/api/news": 600.0}
+    """
+    if isinstance(value, dict):
+        return {k: float(v) for k, v in value.items()}
+    ttls = {}
+    for part in (value or "").split(","):
+        if "=" in part:
+            pattern, seconds = part.rsplit("=", 1)
+            try:
+                ttls[pattern.strip()] = float(seconds)
+            except ValueError:
+                logger.warning(f"Ignoring invalid cache TTL: {part}")
+    return ttls
+
+
+class HttpCache:
+    """
+    On-disk cache for GET requests made with requests.
+
+    A stored response younger than its TTL is served without touching the
+    network. Older entries are revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged resource costs a 304 instead of the
+    full payload. The total size is capped and the least recently used
+    entries are evicted first.
+
+    ttls maps a URL substring to a TTL in seconds; the longest matching
+    pattern wins, otherwise default_ttl applies.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 50 * 1024 * 1024,
+                 default_ttl: float = 300, ttls: Optional[Dict[str, float]] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_saved": 0}
+        self._index: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @classmethod
+    def from_config(cls, config) -> Optional['HttpCache']:
+        if not config.get('HTTP_CACHE_ENABLED', True):
+            return None
+        return cls(
+            directory=config.get('HTTP_CACHE_DIR', 'cache/http'),
+            max_bytes=int(config.get('HTTP_CACHE_MAX_MB', 50) * 1024 * 1024),
+            default_ttl=config.get('HTTP_CACHE_TTL', 300),
+            ttls=parse_ttls(config.get('HTTP_CACHE_TTLS', "")),
+        )
+
+    # --- storage ---
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def _load_index(self):
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    meta = json.load(f)
+                self._index[name[:-5]] = meta
+            except (OSError, ValueError):
+                continue
+
+    def _write(self, key: str, meta: dict, body: Optional[bytes] = None):
+        meta_path, body_path = self._paths(key)
+        if body is not None:
+            tmp = body_path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, body_path)
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        total = sum(meta.get("size", 0) for meta in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, meta in sorted(self._index.items(), key=lambda item: item[1].get("last_access", 0)):
+            if total <= self.max_bytes:
+                break
+            total -= meta.get("size", 0)
+            self._remove(key)
+            self.stats["evictions"] += 1
+
+    def _response(self, meta: dict, key: str) -> Optional[requests.Response]:
+        try:
+            with open(self._paths(key)[1], "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        if len(body) != meta.get("size", len(body)):
+            return None  # недописанное или испорченное тело
+        response = requests.Response()
+        response.status_code = meta["status"]
+        response.url = meta["url"]
+        response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+        response._content = body
+        response.encoding = meta.get("encoding")
+        response.from_cache = True
+        return response
+
+    def ttl_for(self, url: str) -> float:
+        matches = [pattern for pattern in self.ttls if pattern in url]
+        if matches:
+            return self.ttls[max(matches, key=len)]
+        return self.default_ttl
+
+    # --- public API ---
+
+    def get(self, url: str, session: Optional[requests.Session] = None,
+            headers: Optional[Dict[str, str]] = None, timeout: float = 10) -> requests.Response:
+        """
+        Cached replacement for session.get(url, headers=headers, timeout=timeout)
+        """
+        session = session or requests
+        key = self._key(url)
+        now = time.time()
+
+        with self._lock:
+            meta = self._index.get(key)
+
+        if meta is not None and now - meta["stored_at"] < self.ttl_for(url):
+            cached = self._response(meta, key)
+            if cached is not None:
+                with self._lock:
+                    meta["last_access"] = now
+                    self.stats["hits"] += 1
+                    self.stats["bytes_saved"] += meta.get("size", 0)
+                    try:
+                        # Время доступа сохраняется, чтобы LRU работал и после перезапуска
+                        self._write(key, meta)
+                    except OSError as e:
+                        logger.warning(f"Could not update cache entry of {url}: {e}")
+                return cached
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get("etag"):
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = session.get(url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and meta is not None:
+            cached = self._response(meta, key)
+            if cached is not None:
+                with self._lock:
+                    meta["stored_at"] = meta["last_access"] = time.time()
+                    self.stats["revalidated"] += 1
+                    self.stats["bytes_saved"] += meta.get("size", 0)
+                    try:
+                        self._write(key, meta)
+                    except OSError as e:
+                        logger.warning(f"Could not update cache entry of {url}: {e}")
+                return cached
+            # 304 без тела в кэше бесполезен - запрашиваем ресурс целиком
+            logger.warning(f"Cached body of {url} is missing, fetching it again")
+            with self._lock:
+                self._remove(key)
+            response = session.get(url, headers=dict(headers or {}), timeout=timeout)
+
+        with self._lock:
+            self.stats["misses"] += 1
+
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if response.status_code == 200 and "no-store" not in cache_control:
+            body = response.content
+            meta = {
+                "url": url,
+                "status": response.status_code,
+                "headers": dict(response.headers),
+                "encoding": response.encoding,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "stored_at": time.time(),
+                "last_access": time.time(),
+                "size": len(body),
+            }
+            with self._lock:
+                try:
+                    self._write(key, meta, body)
+                    self._index[key] = meta
+                    self.stats["stores"] += 1
+                    self._evict()
+                except OSError as e:
+                    logger.warning(f"Could not store {url} in cache: {e}")
+        return response
+
+    def summary(self) -> str:
+        s = self.stats
+        lookups = s["hits"] + s["revalidated"] + s["misses"]
+        hit_rate = (s["hits"] + s["revalidated"]) / lookups if lookups else 0.0
+        return (
+            f"{s['hits']} hits, {s['revalidated']} revalidated (304), {s['misses']} misses, "
+            f"hit rate {hit_rate:.0%}, {s['bytes_saved'] // 1024} KB saved, {s['evictions']} evictions"
+        )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache(config) -> Optional[HttpCache]:
+    """
+    Process-wide cache instance built from the app config
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache.from_config(config)
+        return _cache
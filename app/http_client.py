@@ -0,0 +1,118 @@
+# app/http_client.py
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger('app.http_client')
+
+ProbeResult = namedtuple('ProbeResult', ['url', 'status', 'elapsed', 'response', 'error'])
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that waits for the shared per-host rate limiter before each
+    request and reports the response status back to it
+    """
+
+    def __init__(self, limiter=None, **kwargs):
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        limiter = self.limiter or get_rate_limiter()
+        limiter.acquire(request.url)
+        response = super().send(request, **kwargs)
+        limiter.feedback(request.url, response.status_code, response.headers.get("Retry-After"))
+        return response
+
+
+def create_session(pool_maxsize: int = 10, limiter=None) -> requests.Session:
+    """
+    requests.Session with a keep-alive connection pool sized for concurrent
+    use; every request goes through the per-host rate limiter
+    """
+    session = requests.Session()
+    adapter = RateLimitedAdapter(limiter=limiter, pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """
+    Process-wide session shared by the scraper's HTTP fetchers
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def probe_endpoints(urls: List[str], headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+                    deadline: float = 15, max_per_host: int = 4,
+                    session: Optional[requests.Session] = None, cache=None) -> List[ProbeResult]:
+    """
+    GETs all urls concurrently over one connection pool.
+
+    At most max_per_host requests run against the same host at a time, and
+    the whole probe is bounded by `deadline` seconds: requests that have not
+    finished by then are reported with error 'deadline exceeded'.
+    Results are returned in the order of urls.
+
+    With an HttpCache, fresh responses are served from disk and stale ones
+    are revalidated with a conditional GET.
+    """
+    session = session or get_http_session()
+    started = time.monotonic()
+    host_limits: Dict[str, threading.Semaphore] = {}
+    for url in urls:
+        host_limits.setdefault(urlsplit(url).netloc, threading.Semaphore(max_per_host))
+
+    def fetch(url):
+        with host_limits[urlsplit(url).netloc]:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                return ProbeResult(url, None, 0.0, None, "deadline exceeded")
+            t0 = time.monotonic()
+            try:
+                if cache is not None:
+                    response = cache.get(url, session=session, headers=headers, timeout=min(timeout, remaining))
+                else:
+                    response = session.get(url, headers=headers, timeout=min(timeout, remaining))
+                return ProbeResult(url, response.status_code, time.monotonic() - t0, response, None)
+            except requests.RequestException as e:
+                return ProbeResult(url, None, time.monotonic() - t0, None, str(e))
+
+    if not urls:
+        return []
+
+    executor = ThreadPoolExecutor(max_workers=min(len(urls), max_per_host * len(host_limits)))
+    futures = [executor.submit(fetch, url) for url in urls]
+    wait(futures, timeout=deadline)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for url, future in zip(urls, futures):
+        if future.done() and not future.cancelled():
+            results.append(future.result())
+        else:
+            results.append(ProbeResult(url, None, time.monotonic() - started, None, "deadline exceeded"))
+
+    for result in results:
+        outcome = result.status if result.status is not None else result.error
+        logger.info(f"Probe {result.url}: {outcome} in {result.elapsed * 1000:.0f} ms")
+    logger.info(f"Probed {len(urls)} endpoints in {time.monotonic() - started:.2f}s")
+    return results
@@ -3,6 +3,7 @@ import openai
 import requests
 import logging
 from flask import current_app
+from app.http_client import get_http_session
 import os
 import time
 import re
@@ -120,7 +121,8 @@ def process_image_from_prompt(article_text: str, save_path: str, max_retries: in
         
         # Download the generated image
         try:
-            image_response = requests.get(image_url, timeout=30)
+            # Общая сессия: загрузка проходит через ограничитель частоты запросов
+            image_response = get_http_session().get(image_url, timeout=30)
             image_response.raise_for_status()  # Raise exception for 4XX/5XX responses
             image_data = image_response.content
             
@@ -0,0 +1,187 @@
+# app/ingest.py
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+import pytz
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import Article, ArticleSimhashBand, db, normalize_url, title_hash
+from app.near_duplicates import band_keys, clamp_distance, hamming, simhash
+
+logger = logging.getLogger('app.ingest')
+
+# SQLite ограничивает число параметров в одном запросе
+CHUNK_SIZE = 500
+
+
+def _chunks(values: List[str], size: int = CHUNK_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _existing(column, values: Iterable[str]) -> set:
+    """
+    Values of column that are already stored, one IN query per chunk
+    """
+    values = sorted({v for v in values if v})
+    found = set()
+    for chunk in _chunks(values):
+        found.update(row[0] for row in db.session.query(column).filter(column.in_(chunk)))
+    return found
+
+
+def filter_new_candidates(candidates: Iterable[Dict], log_prefix: str = "[ingest]") -> List[Dict]:
+    """
+    Drops candidates whose url or title is already in the database or
+    appeared earlier in the same batch. Uses set-based queries on the
+    indexed url_key/title_hash columns instead of two lookups per candidate.
+
+    Candidates are dicts with at least 'title' and optionally 'url'.
+    """
+    keyed = [(c, normalize_url(c.get("url")), title_hash(c.get("title"))) for c in candidates]
+    existing_urls = _existing(Article.url_key, (url_key for _, url_key, _ in keyed))
+    existing_titles = _existing(Article.title_hash, (t_hash for _, _, t_hash in keyed))
+
+    survivors = []
+    for candidate, url_key, t_hash in keyed:
+        if url_key and url_key in existing_urls:
+            logger.info(f"{log_prefix} Skipping duplicate URL: {candidate.get('url')}")
+            continue
+        if t_hash and t_hash in existing_titles:
+            logger.info(f"{log_prefix} Skipping duplicate title: {candidate.get('title')}")
+            continue
+        # Дубликаты внутри одной партии
+        if url_key:
+            existing_urls.add(url_key)
+        if t_hash:
+            existing_titles.add(t_hash)
+        survivors.append(candidate)
+    return survivors
+
+
+def filter_near_duplicates(candidates: Iterable[Dict], max_distance: int = 6,
+                           log_prefix: str = "[ingest]") -> List[Dict]:
+    """
+    Drops candidates whose original_text is within max_distance bits (SimHash
+    Hamming distance) of a stored article or of an earlier candidate in the
+    same batch. Stored articles are looked up through the band index, so
+    only articles sharing at least one band are compared.
+    """
+    max_distance = clamp_distance(max_distance)
+    hashed = [(c, simhash(c.get("original_text"))) for c in candidates]
+    keys = {key for _, value in hashed for key in band_keys(value)}
+
+    known: Dict[int, List] = {}
+    for chunk in _chunks(sorted(keys)):
+        rows = (
+            db.session.query(ArticleSimhashBand.band_key, Article.id, Article.simhash, Article.title)
+            .join(Article, Article.id == ArticleSimhashBand.article_id)
+            .filter(ArticleSimhashBand.band_key.in_(chunk))
+        )
+        for band_key, article_id, value, title in rows:
+            known.setdefault(band_key, []).append((article_id, value, title))
+
+    survivors = []
+    for candidate, value in hashed:
+        match = None
+        for key in band_keys(value):
+            match = next((entry for entry in known.get(key, ())
+                          if entry[1] is not None and hamming(value, entry[1]) <= max_distance), None)
+            if match:
+                break
+        if match:
+            source = f"article {match[0]}" if match[0] is not None else "an earlier item"
+            logger.info(f"{log_prefix} Skipping near-duplicate of {source} ({match[2]}): {candidate.get('title')}")
+            continue
+        for key in band_keys(value):
+            known.setdefault(key, []).append((None, value, candidate.get("title")))
+        survivors.append(candidate)
+    return survivors
+
+
+def index_simhash_bands(articles) -> int:
+    """
+    Adds band index rows for (id, simhash) pairs. Does not commit.
+    """
+    rows = [{"article_id": article_id, "band_key": key}
+            for article_id, value in articles for key in band_keys(value)]
+    if rows:
+        db.session.execute(insert(ArticleSimhashBand.__table__), rows)
+    return len(rows)
+
+
+def _insert_statement():
+    dialect = db.engine.dialect.name
+    table = Article.__table__
+    if dialect == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing()
+    return insert(table)
+
+
+def insert_articles(candidates: Iterable[Dict], source_name: str = "levitin.de") -> int:
+    """
+    Inserts candidates in one batched statement and commits.
+
+    Near-duplicates of stored articles are dropped first (NEAR_DUP_ENABLED,
+    NEAR_DUP_MAX_DISTANCE). On SQLite and PostgreSQL rows that hit the
+    unique url_key index are ignored instead of failing the whole batch.
+    Returns the number of rows inserted.
+    """
+    if current_app.config.get('NEAR_DUP_ENABLED', True):
+        candidates = filter_near_duplicates(candidates, current_app.config.get('NEAR_DUP_MAX_DISTANCE', 6))
+
+    tz = pytz.timezone("Europe/Berlin")
+    now = datetime.now(tz)
+    rows = [
+        {
+            "original_text": c["original_text"],
+            "source_name": source_name,
+            "title": c["title"],
+            "summary": c.get("summary") or "",
+            "url": c.get("url") or "",
+            "url_key": normalize_url(c.get("url")),
+            "title_hash": title_hash(c["title"]),
+            "simhash": simhash(c["original_text"]),
+            "publish_at": now,
+        }
+        for c in candidates
+    ]
+    if not rows:
+        return 0
+
+    table = Article.__table__
+    try:
+        if db.engine.dialect.insert_executemany_returning:
+            result = db.session.execute(_insert_statement().returning(table.c.id, table.c.simhash), rows)
+            inserted = result.all()
+        else:
+            db.session.execute(_insert_statement(), rows)
+            # Без RETURNING находим вставленные строки по title_hash
+            hashes = [row["title_hash"] for row in rows if row["title_hash"]]
+            indexed = db.session.query(ArticleSimhashBand.article_id)
+            inserted = (
+                db.session.query(Article.id, Article.simhash)
+                .filter(Article.title_hash.in_(hashes), ~Article.id.in_(indexed))
+                .all()
+            )
+        index_simhash_bands(inserted)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return len(inserted)
+
+
+def ingest_articles(candidates: Iterable[Dict], source_name: str = "levitin.de",
+                    log_prefix: str = "[ingest]") -> int:
+    """
+    Deduplicates a batch of scraped candidates and inserts the new ones
+    """
+    survivors = filter_new_candidates(candidates, log_prefix=log_prefix)
+    return insert_articles(survivors, source_name=source_name)
@@ -16,6 +16,10 @@ def create_app():
     db.init_app(app)
     migrate.init_app(app, db)
 
+    # Общий ограничитель запросов настраивается здесь: потоки скрапера работают без контекста приложения
+    from app.rate_limiter import configure_rate_limiter
+    configure_rate_limiter(app.config)
+
     # Регистрируем модели
     with app.app_context():
         from . import models
@@ -1,62 +1,94 @@
 # levitin_scraper.py
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import WebDriverException
 from bs4 import BeautifulSoup
-from datetime import datetime
-import pytz
-import time
+from concurrent.futures import ThreadPoolExecutor
 import logging
-import os
-import requests
-import json
+import queue
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+from flask import current_app
 
-# если у вас есть своя модель Article и сессия SQLAlchemy
-from app.models import Article, db
+from app.page_readiness import wait_for_page_ready, WaitTimings
+from app.browser import get_browser_pool, load_url
+from app.rate_limiter import get_rate_limiter
+from app.resource_filter import ResourceFilter, ResourceReport
+from app.browser_extract import extract_items_in_browser
+from app.fast_extractor import extract_records
+from app.content_extractor import extract_main_content, extract_page_title
+from app.ingest import filter_new_candidates, insert_articles
+from app.http_client import get_http_session, probe_endpoints
+from app.http_cache import get_http_cache
+from app.fingerprints import (IncrementalReport, detail_key, fingerprint_records, fingerprint_text,
+                              load_fingerprints, previous_item_keys, record_key, save_fingerprints,
+                              section_key, take_until_seen)
+from app.frontier import Frontier, read_sitemap
+from app.artifacts import get_artifact_store
+from app.replay import ReplayPool
+from app.section_stats import adaptive_timeouts, low_yield_sections, record_section_runs
+from app.models import db, normalize_url
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def scrape_angular_section(driver, url, section_url, selector):
+def collect_page_resources(driver, url, resources):
+    """
+    Record the page's network statistics and report its status to the rate limiter
+    """
+    page = resources.collect(driver)
+    if page is not None:
+        get_rate_limiter().feedback(url, page.status)
+    return page
+
+def load_angular_section(driver, url, section_url, selector, timeout=45, quiet_ms=500, timings=None, resources=None):
+    """
+    Open a section and wait until it is rendered.
+    Returns False if the page has no usable content.
+    """
+    full_url = f"{url.rstrip('/')}/{section_url.lstrip('/')}"
+    logger.info(f"[levitin_scraper] Scraping section: {full_url}")
+    load_url(driver, full_url)
+    
+    # Ждём, пока Angular закончит загрузку, вместо фиксированной паузы
+    wait = wait_for_page_ready(driver, selector, timeout=timeout, quiet_ms=quiet_ms)
+    if timings is not None:
+        timings.record(wait)
+    if resources is not None:
+        collect_page_resources(driver, full_url, resources)
+    
+    if wait.reason != "selector":
+        logger.warning(f"[levitin_scraper] Selector not matched in section {section_url} ({wait.reason} after {wait.elapsed:.1f}s)")
+        # Попробуем проверить наличие любого контента на странице
+        try:
+            body_content = driver.find_element(By.TAG_NAME, 'body').text
+            if len(body_content) > 100:  # Если на странице есть хоть какой-то контент
+                logger.info(f"[levitin_scraper] Found some content despite selector timeout, trying to parse anyway")
+            else:
+                return False
+        except:
+            return False
+    return True
+
+def parse_section_items(driver, selector):
+    """
+    Parse the rendered page with BeautifulSoup and return the matched elements
+    """
+    # Execute JavaScript to get fully rendered HTML
+    html = driver.execute_script("return document.documentElement.outerHTML;")
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.select(selector)
+
+def scrape_angular_section(driver, url, section_url, selector, timeout=45, quiet_ms=500, timings=None, resources=None):
     """
     Scrape a specific section of the Angular website
     """
     try:
-        full_url = f"{url.rstrip('/')}/{section_url.lstrip('/')}"
-        logger.info(f"[levitin_scraper] Scraping section: {full_url}")
-        driver.get(full_url)
-        
-        # Give Angular time to load and render
-        time.sleep(10)  # Увеличено с 5 до 10 секунд
-        
-        # Wait for content to load
-        try:
-            # Увеличено время ожидания с 20 до 45 секунд
-            WebDriverWait(driver, 45).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-            )
-        except TimeoutException:
-            logger.warning(f"[levitin_scraper] Timeout waiting for content in section: {section_url}")
-            # Попробуем проверить наличие любого контента на странице
-            try:
-                body_content = driver.find_element(By.TAG_NAME, 'body').text
-                if len(body_content) > 100:  # Если на странице есть хоть какой-то контент
-                    logger.info(f"[levitin_scraper] Found some content despite selector timeout, trying to parse anyway")
-                else:
-                    return []
-            except:
-                return []
-            
-        # Execute JavaScript to get fully rendered HTML
-        html = driver.execute_script("return document.documentElement.outerHTML;")
-        soup = BeautifulSoup(html, "html.parser")
-        items = soup.select(selector)
+        if not load_angular_section(driver, url, section_url, selector, timeout=timeout, quiet_ms=quiet_ms,
+                                    timings=timings, resources=resources):
+            return []
+        items = parse_section_items(driver, selector)
         
         logger.info(f"[levitin_scraper] Found {len(items)} items in section {section_url}")
         return items
@@ -64,6 +96,37 @@ def scrape_angular_section(driver, url, section_url, selector):
         logger.error(f"[levitin_scraper] Error scraping section {section_url}: {e}")
         return []
 
+def scrape_section_records(driver, url, section_url, selector, browser_extract=True, artifacts=None, **wait_kwargs):
+    """
+    Scrape a section and return extracted article records instead of elements.
+    With browser_extract the extraction runs inside the page; the lxml
+    extractor over the rendered HTML is used when it is disabled or fails.
+    With artifacts the rendered HTML is saved as a "section" snapshot.
+    """
+    try:
+        if not load_angular_section(driver, url, section_url, selector, **wait_kwargs):
+            return []
+        html = None
+        if artifacts is not None:
+            html = driver.execute_script("return document.documentElement.outerHTML;")
+            artifacts.save(f"{url.rstrip('/')}/{section_url.lstrip('/')}", html, kind="section")
+        records = None
+        if browser_extract:
+            try:
+                records = extract_items_in_browser(driver, selector, url)
+            except WebDriverException as e:
+                logger.warning(f"[levitin_scraper] Browser-side extraction failed in {section_url}, parsing HTML: {e}")
+        if records is None:
+            if html is None:
+                html = driver.execute_script("return document.documentElement.outerHTML;")
+            records = extract_records(html, selector, url)
+        
+        logger.info(f"[levitin_scraper] Extracted {len(records)} records in section {section_url}")
+        return records
+    except Exception as e:
+        logger.error(f"[levitin_scraper] Error scraping section {section_url}: {e}")
+        return []
+
 def extract_article_data(item, base_url):
     """
     Extract title, URL, and summary from an article element
@@ -140,175 +203,514 @@ def extract_article_data(item, base_url):
         "summary": summary
     }
 
+# Разделы сайта и селекторы карточек в них
+SECTIONS = [
+    {"url": "/", "selector": ".tour-card, .main-slider, .popular-tours .card, .card, article, .news-item, .tour-item"},
+    {"url": "/tours", "selector": ".tour-card, .category-section-tours article, .tour-item, .card, .list-item"},
+    {"url": "/news", "selector": ".news article, .news-item, article, .card, .post"},
+    {"url": "/blog", "selector": ".blog-list-item, .blog-item, article, .post, .card"},
+    {"url": "/destinations", "selector": ".destination-card, .card, article, .item"},
+    {"url": "/activities", "selector": ".activity-card, .card, article, .item"},
+    {"url": "/about-us", "selector": ".content, article, .text-content, p, section"},
+    {"url": "/contact", "selector": ".contact-info, .content, p, article"},
+    {"url": "/services", "selector": ".service-item, .card, article, .item"}
+]
+
+# Разделы, под которыми лежат статьи (туры, новости, записи блога)
+ARTICLE_SECTIONS = ("/tours", "/news", "/blog", "/destinations", "/activities")
+# Приоритет URL, найденных в карточках разделов (см. Frontier.add)
+LINK_PRIORITY = 2
+
+def is_article_url(url):
+    """
+    True for URLs below one of the ARTICLE_SECTIONS (/news/<slug>, ...)
+    """
+    path = urlparse(url).path.rstrip("/")
+    return any(path.startswith(prefix + "/") for prefix in ARTICLE_SECTIONS)
+
+# Look for content in common article containers
+CONTENT_SELECTORS = [
+    ".article-content", ".post-content", ".tour-description", 
+    ".main-content-directive", ".main-content", "article", 
+    ".text-content", ".description", ".content", "main", 
+    ".article", ".post", ".blog-post", ".entry-content",
+    ".tour-content", ".page-content", "div[role='main']",
+    ".cms-content", ".rich-text", ".news-content",
+    ".content-wrapper", "section", ".section-content",
+    "div.container"
+]
+
+def select_detail_content(detail_html):
+    """
+    Previous detail-page extraction: first content container from
+    CONTENT_SELECTORS that has paragraphs
+    """
+    detail_soup = BeautifulSoup(detail_html, "html.parser")
+    for selector in CONTENT_SELECTORS:
+        content_elem = detail_soup.select_one(selector)
+        if content_elem:
+            # Extract all paragraphs
+            paragraphs = content_elem.select("p")
+            if paragraphs:
+                texts = [p.get_text(strip=True) for p in paragraphs]
+                return "\n\n".join([text for text in texts if text])
+    return ""
+
+def load_detail_html(driver, href, timeout=15, quiet_ms=500, timings=None, resources=None, artifacts=None):
+    """
+    Open a detail page and return its rendered HTML
+    """
+    logger.info(f"[levitin_scraper] Fetching detailed content from: {href}")
+    load_url(driver, href)
+    wait = wait_for_page_ready(driver, timeout=timeout, quiet_ms=quiet_ms)
+    if timings is not None:
+        timings.record(wait)
+    if resources is not None:
+        collect_page_resources(driver, href, resources)
+    html = driver.execute_script("return document.documentElement.outerHTML;")
+    if artifacts is not None:
+        artifacts.save(href, html, kind="detail")
+    return html
+
+def fetch_detail_content(driver, href, timeout=15, quiet_ms=500, timings=None, resources=None, artifacts=None):
+    """
+    Fetch the main text of an article detail page
+    """
+    detailed_content = ""
+    try:
+        detail_html = load_detail_html(driver, href, timeout=timeout, quiet_ms=quiet_ms,
+                                       timings=timings, resources=resources, artifacts=artifacts)
+        # Оценка блоков за один проход; каскад селекторов остаётся запасным вариантом
+        detailed_content = extract_main_content(detail_html) or select_detail_content(detail_html)
+                    
+        if detailed_content:
+            logger.info(f"[levitin_scraper] Found detailed content ({len(detailed_content)} chars)")
+    except Exception as e:
+        logger.error(f"[levitin_scraper] Error fetching detailed content: {e}")
+    return detailed_content
+
+def fetch_detail_page(driver, href, timeout=15, quiet_ms=500, timings=None, resources=None, artifacts=None):
+    """
+    Candidate article from a page known only by its URL (sitemap or a
+    discovered link). Returns None if the page could not be loaded.
+    """
+    try:
+        detail_html = load_detail_html(driver, href, timeout=timeout, quiet_ms=quiet_ms,
+                                       timings=timings, resources=resources, artifacts=artifacts)
+    except Exception as e:
+        logger.error(f"[levitin_scraper] Error fetching page {href}: {e}")
+        return None
+    return {
+        "title": extract_page_title(detail_html),
+        "url": href,
+        "summary": "",
+        "details": extract_main_content(detail_html) or select_detail_content(detail_html),
+    }
+
+def section_full_url(base_url, section):
+    return f"{base_url.rstrip('/')}/{section['url'].lstrip('/')}"
+
+def seed_frontier(frontier, base_url, sitemap_url=None):
+    """
+    Adds the fixed sections and the URLs listed in sitemap.xml to the
+    crawl frontier and commits. Sections get priorities in SECTIONS order.
+    """
+    section_keys = {normalize_url(section_full_url(base_url, s)) for s in SECTIONS}
+    for index, section in enumerate(SECTIONS):
+        frontier.add([section_full_url(base_url, section)], kind="section",
+                     priority=len(SECTIONS) - index, source="seed")
+    
+    if sitemap_url:
+        cache = get_http_cache(current_app.config)
+        session = get_http_session()
+        
+        def fetch(url):
+            response = cache.get(url, session=session, timeout=15) if cache else session.get(url, timeout=15)
+            response.raise_for_status()
+            return response.content
+        
+        entries = [(url, lastmod) for url, lastmod in read_sitemap(sitemap_url, fetch) if url.startswith(base_url)]
+        frontier.add([e for e in entries if normalize_url(e[0]) in section_keys], kind="section", source="sitemap")
+        added = frontier.add([e for e in entries if normalize_url(e[0]) not in section_keys],
+                             kind="detail", priority=1, source="sitemap")
+        logger.info(f"[levitin_scraper] Sitemap: {len(entries)} URLs, {added} new")
+    db.session.commit()
+
+def _run_in_pool(pool, func, jobs):
+    """
+    Runs func(driver, job) for every job on pooled drivers.
+    Results are returned in the order of jobs, not in completion order.
+    """
+    def worker(job):
+        with pool.driver() as driver:
+            return func(driver, job)
+    
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        return list(executor.map(worker, jobs))
+
+def _iter_in_pool(pool, func, jobs):
+    """
+    Runs func(driver, job) for every job on pooled drivers and yields
+    (job, result) pairs in completion order, as soon as each job finishes.
+    Results are handed over through a queue, so a consumed result is not
+    kept alive by its future.
+    """
+    results = queue.Queue()
+    
+    def worker(job):
+        try:
+            with pool.driver() as driver:
+                results.put((job, func(driver, job), None))
+        except Exception as e:
+            results.put((job, None, e))
+    
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        for job in jobs:
+            executor.submit(worker, job)
+        for _ in range(len(jobs)):
+            job, result, error = results.get()
+            if error is not None:
+                raise error
+            yield job, result
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_candidates(records):
+    """
+    Article candidates from extracted records
+    """
+    for article_data in records:
+        title = article_data["title"]
+        # Fix inconsistent key names
+        href = article_data.get("url", "") or article_data.get("href", "")
+        summary = article_data.get("summary", "")
+        
+        # Skip if title is too short (likely not a real article)
+        if len(title) < 5:
+            continue
+        candidate = {"title": title, "url": href, "summary": summary}
+        if article_data.get("details") is not None:
+            candidate["details"] = article_data["details"]
+        if article_data.get("section"):
+            candidate["section"] = article_data["section"]
+        yield candidate
+
+def iter_section_candidates(section_stream, report, fingerprints, previous, incremental=True,
+                            stop_after=3, base_url="https://www.levitin.de", linked=None):
+    """
+    Turns a stream of (section, records) pairs into article candidates one
+    section at a time. Sections unchanged since the last run are skipped,
+    changed ones stop at the first already-seen articles.
+    """
+    for section, records in section_stream:
+        key = section_key(section["url"])
+        fingerprint = fingerprint_records(records)
+        report.sections += 1
+        report.items += len(records)
+        if linked is not None:
+            linked.update(r["url"] for r in records if r.get("url") and r["url"].startswith(base_url))
+        if records:
+            fingerprints[key] = {
+                "fingerprint": fingerprint,
+                "item_keys": [k for k in (record_key(r) for r in records) if k],
+            }
+        row = previous.get(key)
+        for record in records:
+            record["section"] = section["url"]
+        if incremental and row is not None and row.fingerprint == fingerprint:
+            logger.info(f"[levitin_scraper] Section {section['url']} unchanged since last run, skipping")
+            report.sections_unchanged += 1
+            report.items_unchanged += len(records)
+            continue
+        fresh = take_until_seen(records, previous_item_keys(row), stop_after) if incremental else records
+        report.items_early_stopped += len(records) - len(fresh)
+        yield from iter_candidates(fresh)
+
+def ingest_batch(pool, batch, base_url, report, fingerprints, previous, detail_timeout=15, quiet_ms=500,
+                 timings=None, resources=None, section_yield=None, artifacts=None):
+    """
+    Deduplicates one micro-batch of candidates, fetches the detail pages of
+    the new ones and inserts them. Returns the number of rows inserted.
+    New candidates are counted per section in section_yield.
+    """
+    new_articles = filter_new_candidates(batch, log_prefix="[levitin_scraper]")
+    for article in new_articles:
+        logger.info(f"[levitin_scraper] Adding new article: {article['title']}")
+        if section_yield is not None and article.get("section"):
+            section_yield[article["section"]] = section_yield.get(article["section"], 0) + 1
+    
+    # If we found an article with URL, try to fetch more content
+    detail_jobs = [a for a in new_articles if "details" not in a and a["url"] and a["url"].startswith(base_url)]
+    details = _run_in_pool(
+        pool,
+        lambda driver, article: fetch_detail_content(driver, article["url"], timeout=detail_timeout,
+                                                     quiet_ms=quiet_ms, timings=timings,
+                                                     resources=resources, artifacts=artifacts),
+        detail_jobs
+    )
+    report.details_fetched += len(detail_jobs)
+    previous.update(load_fingerprints(detail_key(a["url"]) for a in detail_jobs))
+    for article, detailed_content in zip(detail_jobs, details):
+        article["details"] = detailed_content
+        key = detail_key(article["url"])
+        fingerprint = fingerprint_text(detailed_content)
+        if key not in previous or previous[key].fingerprint != fingerprint:
+            report.details_changed += 1
+        fingerprints[key] = {"fingerprint": fingerprint}
+    
+    for article in new_articles:
+        # Create content for rewriting
+        original_text = f"{article['title']}\n\n{article['summary']}"
+        if article.get("details"):
+            original_text = f"{original_text}\n\n{article['details']}"
+        article["original_text"] = original_text
+    
+    if not new_articles:
+        return 0
+    added = insert_articles(new_articles, source_name="levitin.de")
+    logger.info(f"[levitin_scraper] Added {added} new articles")
+    return added
+
 def fetch_levitin_updates():
     """
-    Main function to fetch updates from levitin.de
+    Main function to fetch updates from levitin.de.
+
+    Sections are scraped concurrently and streamed: each section's records
+    are deduplicated and inserted in micro-batches as soon as it is done,
+    so new articles are committed before the whole scrape finishes.
+
+    With SCRAPE_REPLAY_DIR set, pages are served from saved snapshots
+    instead of Chrome; the frontier, sitemap and new snapshots are skipped.
     """
     base_url = "https://www.levitin.de"
     
-    # Configure Chrome options
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--disable-notifications")
-    chrome_options.add_argument("--disable-extensions")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+    # Настройки ожидания готовности страниц
+    page_timeout = current_app.config.get('SCRAPE_PAGE_TIMEOUT', 45)
+    detail_timeout = current_app.config.get('SCRAPE_DETAIL_TIMEOUT', 15)
+    quiet_ms = current_app.config.get('SCRAPE_QUIET_MS', 500)
+    pool_size = current_app.config.get('SCRAPE_POOL_SIZE', 3)
+    batch_size = current_app.config.get('SCRAPE_BATCH_SIZE', 20)
+    browser_extract = current_app.config.get('SCRAPE_BROWSER_EXTRACT', True)
+    max_pages = current_app.config.get('BROWSER_MAX_PAGES', 200)
+    max_rss_mb = current_app.config.get('BROWSER_MAX_RSS_MB', 1024)
+    incremental = current_app.config.get('SCRAPE_INCREMENTAL', True)
+    stop_after = current_app.config.get('SCRAPE_EARLY_STOP_SEEN', 3)
+    use_frontier = current_app.config.get('FRONTIER_ENABLED', True)
+    max_frontier_pages = current_app.config.get('FRONTIER_MAX_PAGES', 20)
+    replay_dir = current_app.config.get('SCRAPE_REPLAY_DIR')
+    adaptive = current_app.config.get('SECTION_ADAPTIVE_TIMEOUTS', True)
+    low_yield_runs = current_app.config.get('SECTION_LOW_YIELD_RUNS', 5)
+    frontier = Frontier.from_config(current_app.config)
+    timings = WaitTimings()
+    resources = ResourceReport()
+    report = IncrementalReport()
+    # Снимки страниц пишутся в фоне, сжатыми, с ограничением по размеру и возрасту
+    store = get_artifact_store(current_app.config) if not replay_dir else None
+    artifacts = store.for_run() if store is not None else None
     
-    logger.info(f"[levitin_scraper] Starting scrape for {base_url}")
+    if replay_dir:
+        # Офлайн-режим: страницы из сохранённых снимков, без Chrome и сети
+        use_frontier = False
+        pool = ReplayPool.from_path(replay_dir, default_page=current_app.config.get('SCRAPE_REPLAY_DEFAULT_PAGE'),
+                                    size=pool_size)
+        logger.info(f"[levitin_scraper] Replaying {base_url} from {replay_dir}")
+    else:
+        logger.info(f"[levitin_scraper] Starting scrape for {base_url} with {pool_size} drivers")
+        # Браузеры остаются запущенными между запусками планировщика
+        pool = get_browser_pool(size=pool_size, max_pages=max_pages, max_rss_mb=max_rss_mb,
+                                resource_filter=ResourceFilter.from_config(current_app.config))
+    added = 0
+    inserted = True
+    section_runs = {}
+    section_yield = {}
     
-    driver = None
+    def ingest(candidates):
+        nonlocal added, inserted
+        for batch in _batched(candidates, batch_size):
+            try:
+                added += ingest_batch(pool, batch, base_url, report, fingerprints, previous,
+                                      detail_timeout=detail_timeout, quiet_ms=quiet_ms,
+                                      timings=timings, resources=resources, section_yield=section_yield,
+                                      artifacts=artifacts)
+            except Exception as e:
+                inserted = False
+                logger.error(f"[levitin_scraper] Error committing to database: {e}")
     
     try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-          # Define sections to scrape with their selectors
-        sections = [
-            {"url": "/", "selector": ".tour-card, .main-slider, .popular-tours .card, .card, article, .news-item, .tour-item"},
-            {"url": "/tours", "selector": ".tour-card, .category-section-tours article, .tour-item, .card, .list-item"},
-            {"url": "/news", "selector": ".news article, .news-item, article, .card, .post"},
-            {"url": "/blog", "selector": ".blog-list-item, .blog-item, article, .post, .card"},
-            {"url": "/destinations", "selector": ".destination-card, .card, article, .item"},
-            {"url": "/activities", "selector": ".activity-card, .card, article, .item"},
-            {"url": "/about-us", "selector": ".content, article, .text-content, p, section"},
-            {"url": "/contact", "selector": ".contact-info, .content, p, article"},
-            {"url": "/services", "selector": ".service-item, .card, article, .item"}
-        ]
+        # Рендерим только разделы, срок повторного обхода которых наступил
+        sections = SECTIONS
+        if use_frontier:
+            seed_frontier(frontier, base_url, current_app.config.get('FRONTIER_SITEMAP_URL'))
+            due = {row.url_key for row in frontier.due("section")}
+            sections = [s for s in SECTIONS if normalize_url(section_full_url(base_url, s)) in due]
+            report.sections_not_due = len(SECTIONS) - len(sections)
+            logger.info(f"[levitin_scraper] {len(sections)} of {len(SECTIONS)} sections due for a visit")
         
-        all_items = []
+        previous = load_fingerprints(section_key(section["url"]) for section in sections)
+        fingerprints = {}
+        linked = set()
+        page_changes = {}
         
-        # Scrape each section
-        for section in sections:
-            items = scrape_angular_section(driver, base_url, section["url"], section["selector"])
-            all_items.extend(items)
+        # Таймаут каждого раздела - p95 его прошлых ожиданий с запасом
+        section_timeouts = {}
+        if adaptive:
+            section_timeouts = adaptive_timeouts(
+                [section["url"] for section in sections], default=page_timeout,
+                minimum=current_app.config.get('SECTION_TIMEOUT_MIN', 10),
+                maximum=current_app.config.get('SECTION_TIMEOUT_MAX', page_timeout),
+                history=current_app.config.get('SECTION_HISTORY_RUNS', 20),
+                factor=current_app.config.get('SECTION_TIMEOUT_FACTOR', 1.5),
+            )
         
-        # Create a debug folder if it doesn't exist
-        debug_dir = "debug"
-        os.makedirs(debug_dir, exist_ok=True)
+        def scrape(driver, section):
+            timeout = section_timeouts.get(section["url"], page_timeout)
+            section_timings = WaitTimings()
+            started_at, started = datetime.utcnow(), time.monotonic()
+            records = scrape_section_records(driver, base_url, section["url"], section["selector"],
+                                             browser_extract=browser_extract, artifacts=artifacts,
+                                             timeout=timeout, quiet_ms=quiet_ms,
+                                             timings=section_timings, resources=resources)
+            wait = section_timings.waits[0] if section_timings.waits else None
+            timings.waits.extend(section_timings.waits)
+            section_runs[section["url"]] = {
+                "section": section["url"],
+                "started_at": started_at,
+                "seconds": time.monotonic() - started,
+                "wait_seconds": wait.elapsed if wait else None,
+                "wait_reason": wait.reason if wait else None,
+                "timeout": timeout,
+                "items": len(records),
+            }
+            return records
         
-        # Save the last scraped page for debugging
-        with open(os.path.join(debug_dir, "levitin_last_page.html"), "w", encoding="utf-8") as f:
-            if driver.page_source:
-                f.write(driver.page_source)
+        # Разделы обрабатываются по мере готовности, в памяти только записи текущей партии
+        section_stream = _iter_in_pool(pool, scrape, sections)
+        ingest(iter_section_candidates(section_stream, report, fingerprints, previous, incremental=incremental,
+                                       stop_after=stop_after, base_url=base_url, linked=linked))
         
-        logger.info(f"[levitin_scraper] Total found items: {len(all_items)}")
+        # История разделов пишется и при ошибке вставки: время загрузки от неё не зависит.
+        # Время воспроизведения снимков ничего не говорит о сайте
+        low_yield = set()
+        try:
+            if not replay_dir:
+                record_section_runs(dict(run, new_articles=section_yield.get(url, 0))
+                                    for url, run in section_runs.items())
+                low_yield = low_yield_sections(section_runs, runs=low_yield_runs)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"[levitin_scraper] Error saving section history: {e}")
+        if low_yield:
+            logger.info(f"[levitin_scraper] No new articles in the last {low_yield_runs} visits of: "
+                        f"{', '.join(sorted(low_yield))}")
+        
+        if use_frontier:
+            # Найденные ссылки пополняют очередь; известные по sitemap и ссылкам
+            # страницы, ещё не ставшие статьями, загружаются адресно
+            frontier.add(sorted(linked), kind="detail", priority=LINK_PRIORITY, source="link")
+            db.session.commit()
+            # Статьями становятся только ссылки из карточек и страницы разделов
+            # со статьями; прочие URL из sitemap (/datenschutz, категории)
+            # не загружаются и откладываются до следующей проверки
+            page_urls, skipped = [], []
+            for row in frontier.due("detail", limit=max_frontier_pages, exclude_articles=True):
+                is_article = row.priority >= LINK_PRIORITY or is_article_url(row.url)
+                (page_urls if is_article else skipped).append(row.url)
+            if skipped:
+                frontier.postpone(skipped)
+                db.session.commit()
+                logger.info(f"[levitin_scraper] {len(skipped)} queued URLs are not articles, postponed")
+            pages = _run_in_pool(
+                pool,
+                lambda driver, url: fetch_detail_page(driver, url, timeout=detail_timeout, quiet_ms=quiet_ms,
+                                                      timings=timings, resources=resources, artifacts=artifacts),
+                page_urls
+            )
+            report.pages_fetched = len(page_urls)
+            previous.update(load_fingerprints(detail_key(url) for url in page_urls))
+            for url, page in zip(page_urls, pages):
+                if page is None:
+                    page_changes[url] = None
+                    continue
+                key = detail_key(url)
+                fingerprint = fingerprint_text(page["details"])
+                page_changes[url] = key not in previous or previous[key].fingerprint != fingerprint
+                fingerprints[key] = {"fingerprint": fingerprint}
+            ingest(iter_candidates(page for page in pages if page is not None))
         
-        if not all_items:
+        fallback_records = []
+        logger.info(f"[levitin_scraper] Total found items: {report.items}")
+        
+        if sections and not report.items:
             logger.warning("[levitin_scraper] No items found with primary selectors. Trying alternative approach.")
-              # Try a more aggressive approach - go to homepage and look for any clickable elements
-            driver.get(base_url)
-            time.sleep(5)
-            html = driver.execute_script("return document.documentElement.outerHTML;")
-            soup = BeautifulSoup(html, "html.parser")
+            with pool.driver() as driver:
+                # Try a more aggressive approach - go to homepage and look for any clickable elements
+                load_url(driver, base_url)
+                timings.record(wait_for_page_ready(driver, timeout=page_timeout, quiet_ms=quiet_ms))
+                html = driver.execute_script("return document.documentElement.outerHTML;")
+            if artifacts is not None:
+                artifacts.save(base_url, html, kind="page")
             
             # Look for any possible tour/article elements
-            all_items = soup.select("div.card, .tour-item, article, .product-item, .item, [ng-repeat]")
-            
-        tz = pytz.timezone("Europe/Berlin")
-        added = 0
-          # Process all found items
-        for item in all_items:
-            article_data = extract_article_data(item, base_url)
-            if not article_data:
-                continue
-                
-            title = article_data["title"]
-            # Fix inconsistent key names
-            href = article_data.get("url", "") or article_data.get("href", "")
-            summary = article_data.get("summary", "")
-            
-            # Skip if title is too short (likely not a real article)
-            if len(title) < 5:
-                continue
-                
-            # Create content for rewriting
-            original_text = f"{title}\n\n{summary}"
-            
-            # Skip duplicates
-            if href and Article.query.filter_by(url=href).first():
-                logger.info(f"[levitin_scraper] Skipping duplicate URL: {href}")
-                continue
-                
-            if Article.query.filter_by(title=title).first():
-                logger.info(f"[levitin_scraper] Skipping duplicate title: {title}")
-                continue
-            
-            logger.info(f"[levitin_scraper] Adding new article: {title}")
-            
-            # If we found an article with URL, try to fetch more content
-            detailed_content = ""
-            if href and href.startswith(base_url):
-                try:
-                    logger.info(f"[levitin_scraper] Fetching detailed content from: {href}")
-                    driver.get(href)
-                    time.sleep(3)  # Give Angular time to render
-                    
-                    detail_html = driver.execute_script("return document.documentElement.outerHTML;")
-                    detail_soup = BeautifulSoup(detail_html, "html.parser")
-                      # Look for content in common article containers
-                    content_selectors = [
-                        ".article-content", ".post-content", ".tour-description", 
-                        ".main-content-directive", ".main-content", "article", 
-                        ".text-content", ".description", ".content", "main", 
-                        ".article", ".post", ".blog-post", ".entry-content",
-                        ".tour-content", ".page-content", "div[role='main']",
-                        ".cms-content", ".rich-text", ".news-content",
-                        ".content-wrapper", "section", ".section-content",
-                        "div.container"
-                    ]
-                    
-                    for selector in content_selectors:
-                        content_elem = detail_soup.select_one(selector)
-                        if content_elem:
-                            # Extract all paragraphs
-                            paragraphs = content_elem.select("p")
-                            if paragraphs:
-                                detailed_content = "\n\n".join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
-                                break
-                                
-                    if detailed_content:
-                        logger.info(f"[levitin_scraper] Found detailed content ({len(detailed_content)} chars)")
-                        original_text = f"{title}\n\n{summary}\n\n{detailed_content}"
-                except Exception as e:
-                    logger.error(f"[levitin_scraper] Error fetching detailed content: {e}")
-            
-            # Save to database
-            art = Article(
-                original_text=original_text,
-                source_name="levitin.de",
-                title=title, 
-                summary=summary,
-                url=href,
-                publish_at=datetime.now(tz)
-            )
-            db.session.add(art)
-            added += 1
+            fallback_records = extract_records(html, "div.card, .tour-item, article, .product-item, .item, [ng-repeat]", base_url)
+        
+        ingest(iter_candidates(fallback_records))
+        report.details_skipped = max(len(linked) - report.details_fetched, 0)
+        
+        if added:
+            logger.info(f"[levitin_scraper] Successfully added {added} new articles")
+        else:
+            logger.info("[levitin_scraper] No new articles to add")
         
-        if added > 0:
+        # Отпечатки сохраняются только после успешной записи, иначе
+        # не добавленные статьи были бы пропущены при следующем запуске
+        if inserted:
             try:
-                db.session.commit()
-                logger.info(f"[levitin_scraper] Successfully added {added} new articles")
+                if use_frontier:
+                    # Изменившиеся разделы посещаются чаще, неизменные и давно
+                    # не дающие новых статей - реже
+                    changes = {}
+                    for section in sections:
+                        key = section_key(section["url"])
+                        changed = None
+                        if key in fingerprints:
+                            changed = key not in previous or previous[key].fingerprint != fingerprints[key]["fingerprint"]
+                            if section["url"] in low_yield:
+                                changed = False
+                        changes[section_full_url(base_url, section)] = changed
+                    changes.update(page_changes)
+                    frontier.mark_fetched_many(changes)
+                    db.session.commit()
+                save_fingerprints(fingerprints, existing=previous)
             except Exception as e:
                 db.session.rollback()
-                logger.error(f"[levitin_scraper] Error committing to database: {e}")
-        else:
-            logger.info("[levitin_scraper] No new articles to add")
+                logger.error(f"[levitin_scraper] Error saving fingerprints: {e}")
             
     except Exception as e:
         logger.error(f"[levitin_scraper] Error: {e}", exc_info=True)
     finally:
-        if driver:
-            driver.quit()
+        logger.info(f"[levitin_scraper] Page waits: {timings.summary()}")
+        logger.info(f"[levitin_scraper] Resources: {resources.summary()}")
+        logger.info(f"[levitin_scraper] Incremental: {report.summary()}")
+        logger.info(f"[levitin_scraper] Rate limiter: {get_rate_limiter().summary()}")
+        if store is not None:
+            logger.info(f"[levitin_scraper] Debug snapshots ({artifacts.run_id}): {store.summary()}")
             
     return added
 
 
-def try_api_approach():
+def try_api_approach(base_url="https://www.levitin.de", artifacts=None):
     """
-    Alternative method that attempts to find and use the site's API endpoints
+    Alternative method that attempts to find and use the site's API endpoints.
+    Raw responses are saved as "api" snapshots in artifacts (a new run by default).
     """
-    base_url = "https://www.levitin.de"
     api_endpoints = [
         "/api/tours", 
         "/api/news",
@@ -324,35 +726,49 @@ def try_api_approach():
         "X-Requested-With": "XMLHttpRequest"
     }
     
+    logger.info(f"[levitin_scraper] Probing {len(api_endpoints)} API endpoints on {base_url}")
+    # Все эндпоинты опрашиваются параллельно через общий пул соединений
+    cache = get_http_cache(current_app.config)
+    results = probe_endpoints(
+        [f"{base_url}{endpoint}" for endpoint in api_endpoints],
+        headers=headers,
+        timeout=current_app.config.get('API_PROBE_TIMEOUT', 10),
+        deadline=current_app.config.get('API_PROBE_DEADLINE', 15),
+        max_per_host=current_app.config.get('API_PROBE_PER_HOST', 4),
+        cache=cache
+    )
+    if cache is not None:
+        logger.info(f"[levitin_scraper] HTTP cache: {cache.summary()}")
+    logger.info(f"[levitin_scraper] Rate limiter: {get_rate_limiter().summary()}")
+    
+    if artifacts is None:
+        store = get_artifact_store(current_app.config)
+        artifacts = store.for_run() if store is not None else None
+    
     all_items = []
-    for endpoint in api_endpoints:
-        url = f"{base_url}{endpoint}"
-        logger.info(f"[levitin_scraper] Trying API endpoint: {url}")
-        
+    for endpoint, result in zip(api_endpoints, results):
+        if result.error:
+            logger.warning(f"[levitin_scraper] Error accessing API endpoint {endpoint}: {result.error}")
+            continue
+        if result.status != 200:
+            continue
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    logger.info(f"[levitin_scraper] API response received: {len(str(data))} bytes")
-                    # Save the API response for debugging
-                    debug_dir = "debug"
-                    os.makedirs(debug_dir, exist_ok=True)
-                    with open(os.path.join(debug_dir, f"api_{endpoint.replace('/', '_')}.json"), "w", encoding="utf-8") as f:
-                        json.dump(data, f, indent=2, ensure_ascii=False)
-                    
-                    # Process API data based on structure
-                    if isinstance(data, list):
-                        all_items.extend(data)
-                    elif isinstance(data, dict):
-                        # Look for arrays in the response that might contain items
-                        for key, value in data.items():
-                            if isinstance(value, list) and value:
-                                all_items.extend(value)
-                except ValueError:
-                    logger.warning(f"[levitin_scraper] API endpoint returned non-JSON data: {endpoint}")
-        except Exception as e:
-            logger.warning(f"[levitin_scraper] Error accessing API endpoint {endpoint}: {e}")
+            data = result.response.json()
+            logger.info(f"[levitin_scraper] API response received: {len(result.response.content)} bytes in {result.elapsed:.2f}s")
+            # Ответ сохраняется как есть, сжатие и запись идут в фоне
+            if artifacts is not None:
+                artifacts.save(f"{base_url}{endpoint}", result.response.content, kind="api")
+            
+            # Process API data based on structure
+            if isinstance(data, list):
+                all_items.extend(data)
+            elif isinstance(data, dict):
+                # Look for arrays in the response that might contain items
+                for key, value in data.items():
+                    if isinstance(value, list) and value:
+                        all_items.extend(value)
+        except ValueError:
+            logger.warning(f"[levitin_scraper] API endpoint returned non-JSON data: {endpoint}")
     
     return all_items
 
@@ -363,8 +779,8 @@ def process_api_items(api_items):
     if not api_items:
         return 0
         
-    tz = pytz.timezone("Europe/Berlin")
     added = 0
+    candidates = []
     
     for item in api_items:
         try:
@@ -399,41 +815,30 @@ def process_api_items(api_items):
             
             if not title or len(title) < 5:
                 continue
-                
-            # Check if this article already exists
-            if url and Article.query.filter_by(url=url).first():
-                logger.info(f"[levitin_scraper] Skipping duplicate URL from API: {url}")
-                continue
-                
-            if Article.query.filter_by(title=title).first():
-                logger.info(f"[levitin_scraper] Skipping duplicate title from API: {title}")
-                continue
             
             # Create the original text combining all relevant content
             original_text_parts = [part for part in [title, summary, content] if part]
             original_text = "\n\n".join(original_text_parts)
             
-            logger.info(f"[levitin_scraper] Adding new article from API: {title}")
-            
-            art = Article(
-                original_text=original_text,
-                source_name="levitin.de",
-                title=title, 
-                summary=summary or "",
-                url=url or "",
-                publish_at=datetime.now(tz)
-            )
-            db.session.add(art)
-            added += 1
+            candidates.append({
+                "title": title,
+                "url": url or "",
+                "summary": summary or "",
+                "original_text": original_text
+            })
         except Exception as e:
             logger.error(f"[levitin_scraper] Error processing API item: {e}")
     
-    if added > 0:
+    # Check which articles already exist with one query for the whole batch
+    new_articles = filter_new_candidates(candidates, log_prefix="[levitin_scraper] (API)")
+    for article in new_articles:
+        logger.info(f"[levitin_scraper] Adding new article from API: {article['title']}")
+    
+    if new_articles:
         try:
-            db.session.commit()
+            added = insert_articles(new_articles, source_name="levitin.de")
             logger.info(f"[levitin_scraper] Successfully added {added} articles from API")
         except Exception as e:
-            db.session.rollback()
             logger.error(f"[levitin_scraper] Error committing API items to database: {e}")
     
     return added
@@ -444,7 +849,6 @@ def add_test_articles(count=3):
     Добавляет тестовые статьи, если не удалось найти настоящие
     """
     logger.info(f"[levitin_scraper] Adding {count} test articles")
-    tz = pytz.timezone("Europe/Berlin")
     added = 0
     
     test_articles = [
@@ -487,28 +891,12 @@ def add_test_articles(count=3):
     ]
     
     try:
-        for article in test_articles[:count]:
-            # Проверяем, нет ли уже такой статьи
-            if Article.query.filter_by(title=article["title"]).first():
-                logger.info(f"[levitin_scraper] Test article already exists: {article['title']}")
-                continue
-                
-            art = Article(
-                original_text=article["original_text"],
-                source_name="levitin.de",
-                title=article["title"],
-                summary=article["summary"],
-                url=article["url"],
-                publish_at=datetime.now(tz)
-            )
-            db.session.add(art)
-            added += 1
-        
-        if added > 0:
-            db.session.commit()
+        # Проверяем, нет ли уже таких статей, одним запросом
+        new_articles = filter_new_candidates(test_articles[:count], log_prefix="[levitin_scraper] (test)")
+        if new_articles:
+            added = insert_articles(new_articles, source_name="levitin.de")
             logger.info(f"[levitin_scraper] Added {added} test articles")
     except Exception as e:
-        db.session.rollback()
         logger.error(f"[levitin_scraper] Error adding test articles: {e}")
     
     return added
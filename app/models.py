@@ -1,8 +1,57 @@
 # app/models.py
 from .init import db
+from .near_duplicates import simhash
 from datetime import datetime
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+import hashlib
+import re
+
+
+def normalize_url(url: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of an article URL used for uniqueness: lower-case scheme
+    and host, no default port, fragment or trailing slash. Empty -> None.
+    """
+    if not url or not url.strip():
+        return None
+    parts = urlsplit(url.strip())
+    netloc = parts.netloc.lower()
+    if (parts.scheme == "http" and netloc.endswith(":80")) or (parts.scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), netloc, path, parts.query, ""))[:500]
+
+
+def title_hash(title: Optional[str]) -> Optional[str]:
+    """
+    SHA-1 of the whitespace-collapsed, case-folded title, for indexed title lookups
+    """
+    if not title or not title.strip():
+        return None
+    normalized = re.sub(r"\s+", " ", title.strip()).casefold()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _url_key_default(context):
+    return normalize_url(context.get_current_parameters().get("url"))
+
+
+def _title_hash_default(context):
+    return title_hash(context.get_current_parameters().get("title"))
+
+
+def _simhash_default(context):
+    return simhash(context.get_current_parameters().get("original_text"))
+
 
 class Article(db.Model):
+    __table_args__ = (
+        # Очередь публикации: filter_by(is_posted=False).order_by(created_at)
+        db.Index('ix_article_is_posted_created_at', 'is_posted', 'created_at'),
+        db.Index('uq_article_url_key', 'url_key', unique=True),
+    )
+
     id              = db.Column(db.Integer, primary_key=True)
     original_text   = db.Column(db.Text,   nullable=False)
     rewritten_text  = db.Column(db.Text,   nullable=True)
@@ -14,3 +63,74 @@ class Article(db.Model):
     title           = db.Column(db.String(300), nullable=True)
     summary         = db.Column(db.Text, nullable=True)
     url             = db.Column(db.String(500), nullable=True)
+    url_key         = db.Column(db.String(500), nullable=True, default=_url_key_default)
+    title_hash      = db.Column(db.String(40), nullable=True, index=True, default=_title_hash_default)
+    simhash         = db.Column(db.BigInteger, nullable=True, default=_simhash_default)  # для поиска почти-дубликатов
+
+
+class ArticleSimhashBand(db.Model):
+    """
+    LSH index over Article.simhash: one row per (article, band value), so
+    near-duplicate candidates are found with an indexed IN query
+    """
+    __table_args__ = (
+        db.Index('ix_article_simhash_band_band_key', 'band_key'),
+    )
+
+    article_id      = db.Column(db.Integer, db.ForeignKey('article.id', ondelete='CASCADE'), primary_key=True)
+    band_key        = db.Column(db.Integer, primary_key=True)
+
+
+class ScrapeFingerprint(db.Model):
+    """
+    Fingerprint of a scraped section or detail page from the last run,
+    used to skip work when nothing has changed
+    """
+    id              = db.Column(db.Integer, primary_key=True)
+    key             = db.Column(db.String(600), nullable=False, unique=True)  # "section:/news", "detail:<url_key>"
+    fingerprint     = db.Column(db.String(40), nullable=False)
+    item_keys       = db.Column(db.Text, nullable=True)  # JSON-список ключей статей раздела
+    item_count      = db.Column(db.Integer, default=0)
+    seen_at         = db.Column(db.DateTime, default=datetime.utcnow)
+    changed_at      = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class CrawlUrl(db.Model):
+    """
+    Crawl frontier entry: a known URL with its priority and revisit schedule
+    """
+    __table_args__ = (
+        db.Index('ix_crawl_url_kind_next_fetch_at', 'kind', 'next_fetch_at'),
+    )
+
+    id              = db.Column(db.Integer, primary_key=True)
+    url_key         = db.Column(db.String(500), nullable=False, unique=True)
+    url             = db.Column(db.String(500), nullable=False)
+    kind            = db.Column(db.String(20), nullable=False, default="detail")  # "section" или "detail"
+    priority        = db.Column(db.Integer, nullable=False, default=0)  # больше - раньше
+    source          = db.Column(db.String(20), nullable=True)  # откуда узнали: seed, sitemap, link
+    first_seen_at   = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at    = db.Column(db.DateTime, default=datetime.utcnow)  # последнее упоминание в sitemap или ссылках
+    last_fetched_at = db.Column(db.DateTime, nullable=True)
+    last_changed_at = db.Column(db.DateTime, nullable=True)
+    revisit_hours   = db.Column(db.Float, nullable=False, default=24)
+    next_fetch_at   = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class SectionRun(db.Model):
+    """
+    Cost and yield of one section visit, used for adaptive timeouts and the section report
+    """
+    __table_args__ = (
+        db.Index('ix_section_run_section_started_at', 'section', 'started_at'),
+    )
+
+    id              = db.Column(db.Integer, primary_key=True)
+    section         = db.Column(db.String(200), nullable=False)  # путь раздела, например "/news"
+    started_at      = db.Column(db.DateTime, default=datetime.utcnow)
+    seconds         = db.Column(db.Float, nullable=False)  # загрузка и извлечение
+    wait_seconds    = db.Column(db.Float, nullable=True)  # ожидание готовности страницы
+    wait_reason     = db.Column(db.String(20), nullable=True)  # selector, settled, timeout, error
+    timeout         = db.Column(db.Float, nullable=True)  # использованный таймаут ожидания
+    items           = db.Column(db.Integer, default=0)
+    new_articles    = db.Column(db.Integer, default=0)
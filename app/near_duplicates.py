@@ -0,0 +1,117 @@
+# app/near_duplicates.py
+import hashlib
+import itertools
+import logging
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger('app.near_duplicates')
+
+SIMHASH_BITS = 64
+# Хэш делится на BLOCKS блоков по BLOCK_BITS бит. Тексты на расстоянии
+# Хэмминга d отличаются не больше чем в d блоках, поэтому при
+# d <= MAX_DISTANCE = BLOCKS - 2 хотя бы два блока совпадают целиком.
+# Ключ индекса - пара блоков (28 таблиц по 16 бит): в корзине в среднем
+# N / 65536 статей, а не N / 256, как при ключе из одного блока
+BLOCKS = 8
+BLOCK_BITS = SIMHASH_BITS // BLOCKS
+BLOCK_PAIRS = list(itertools.combinations(range(BLOCKS), 2))
+MAX_DISTANCE = BLOCKS - 2
+SHINGLE_SIZE = 2
+
+_MASK = (1 << SIMHASH_BITS) - 1
+_BLOCK_MASK = (1 << BLOCK_BITS) - 1
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Counter:
+    """
+    Word n-grams of the case-folded text; short texts fall back to one shingle
+    """
+    words = _WORD_RE.findall((text or "").casefold())
+    if len(words) < size:
+        return Counter([" ".join(words)]) if words else Counter()
+    return Counter(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash over weighted word shingles, as a signed integer so it
+    fits a BIGINT column. None for texts without words.
+    """
+    features = shingles(text)
+    if not features:
+        return None
+    weights = [0] * SIMHASH_BITS
+    for feature, count in features.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if h >> bit & 1 else -count
+    value = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    return value - (1 << SIMHASH_BITS) if value >> (SIMHASH_BITS - 1) else value
+
+
+def simhash_blocks(value: Optional[int]) -> List[Optional[int]]:
+    if value is None:
+        return [None] * BLOCKS
+    value &= _MASK
+    return [(value >> (block * BLOCK_BITS)) & _BLOCK_MASK for block in range(BLOCKS)]
+
+
+def band_keys(value: Optional[int]) -> List[int]:
+    """
+    Index keys of a hash: the values of each pair of blocks, tagged with the
+    pair number, as stored in the band index
+    """
+    if value is None:
+        return []
+    blocks = simhash_blocks(value)
+    return [(table << (2 * BLOCK_BITS)) | (blocks[i] << BLOCK_BITS) | blocks[j]
+            for table, (i, j) in enumerate(BLOCK_PAIRS)]
+
+
+def clamp_distance(max_distance: int) -> int:
+    """
+    Distances above MAX_DISTANCE would miss pairs in the band index
+    """
+    if max_distance > MAX_DISTANCE:
+        logger.warning(f"Near-duplicate distance {max_distance} exceeds {MAX_DISTANCE}, "
+                       f"the band index cannot guarantee it; using {MAX_DISTANCE}")
+        return MAX_DISTANCE
+    return max_distance
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & _MASK).count("1")
+
+
+def cluster_hashes(hashes: Iterable[Tuple[Hashable, Optional[int]]], max_distance: int = 6) -> List[List[Hashable]]:
+    """
+    Groups ids whose hashes are within max_distance bits of each other
+    (transitively). Only pairs sharing a band are compared.
+    Returns clusters with more than one member.
+    """
+    max_distance = clamp_distance(max_distance)
+    hashes = [(key, value) for key, value in hashes if value is not None]
+    parent = {key: key for key, _ in hashes}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    buckets: Dict[int, List[Tuple[Hashable, int]]] = defaultdict(list)
+    for key, value in hashes:
+        for band_key in band_keys(value):
+            bucket = buckets[band_key]
+            for other_key, other_value in bucket:
+                if find(key) != find(other_key) and hamming(value, other_value) <= max_distance:
+                    parent[find(key)] = find(other_key)
+            bucket.append((key, value))
+
+    clusters = defaultdict(list)
+    for key, _ in hashes:
+        clusters[find(key)].append(key)
+    return [members for members in clusters.values() if len(members) > 1]
@@ -0,0 +1,144 @@
+# app/openai_admission.py
+import contextlib
+import logging
+import re
+import threading
+import time
+from typing import Mapping, Optional
+
+from app.rate_limiter import parse_retry_after
+
+logger = logging.getLogger('app.openai_admission')
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: Optional[str]) -> float:
+    """
+    x-ratelimit-reset-* value ("20ms", "6s", "1m30.5s") -> seconds
+    """
+    if not value:
+        return 0.0
+    parts = _DURATION_PART.findall(value.strip())
+    if not parts:
+        return parse_retry_after(value)
+    return sum(float(number) * _UNITS[unit] for number, unit in parts)
+
+
+class OpenAIAdmission:
+    """
+    Admission control for OpenAI requests made by concurrent rewrites.
+
+    A rewrite holds a slot for its whole duration; at most `limit` slots
+    are handed out, limit starting at max_concurrency. Every API response
+    is observed (see get_openai_client): a 429 halves the limit (not below
+    min_concurrency) and pauses new rewrites for Retry-After or the reset
+    time; when x-ratelimit-remaining-requests/-tokens runs out, new
+    rewrites wait for the reset instead of provoking a 429. After
+    `recover_after` successful responses in a row the limit grows by one.
+    """
+
+    def __init__(self, max_concurrency: int = 4, min_concurrency: int = 1, recover_after: int = 10,
+                 default_pause: float = 5.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.recover_after = recover_after
+        self.default_pause = default_pause
+        self.limit = self.max_concurrency
+        self.active = 0
+        self.paused_until = 0.0
+        self.successes = 0
+        # Статистика
+        self.admitted = 0
+        self.waited = 0.0
+        self.throttled = 0
+        self.preempted = 0
+        self.remaining_requests: Optional[int] = None
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config) -> 'OpenAIAdmission':
+        return cls(
+            max_concurrency=int(config.get('REWRITE_CONCURRENCY', 4)),
+            min_concurrency=int(config.get('REWRITE_MIN_CONCURRENCY', 1)),
+            recover_after=int(config.get('REWRITE_RECOVER_AFTER', 10)),
+        )
+
+    @contextlib.contextmanager
+    def slot(self):
+        """
+        Blocks until a rewrite may start, holds a slot until it finishes
+        """
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause <= 0 and self.active < self.limit:
+                    break
+                self._cond.wait(timeout=pause if pause > 0 else None)
+            self.active += 1
+            self.admitted += 1
+            self.waited += time.monotonic() - start
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.active -= 1
+                self._cond.notify_all()
+
+    def _pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def observe(self, status: int, headers: Mapping[str, str]) -> None:
+        """
+        Adapts the limit to one API response (status code and headers)
+        """
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        with self._cond:
+            # Только заголовки этого ответа: без них прежний остаток уже неизвестен
+            self.remaining_requests = int(remaining) if remaining is not None and remaining.isdigit() else None
+            if status == 429:
+                self.throttled += 1
+                self.successes = 0
+                self.limit = max(self.min_concurrency, self.limit // 2)
+                retry_after = headers.get("retry-after-ms")
+                pause = (float(retry_after) / 1000 if retry_after else parse_retry_after(headers.get("retry-after"))) \
+                    or parse_reset(headers.get("x-ratelimit-reset-requests")) or self.default_pause
+                self._pause(pause)
+                logger.warning(f"OpenAI answered 429, concurrency limit {self.limit}, pausing {pause:.1f}s")
+            elif status < 400:
+                if self.remaining_requests is not None and self.remaining_requests <= 0:
+                    self.preempted += 1
+                    self._pause(parse_reset(headers.get("x-ratelimit-reset-requests")) or self.default_pause)
+                elif remaining_tokens is not None and remaining_tokens.isdigit() and int(remaining_tokens) <= 0:
+                    self.preempted += 1
+                    self._pause(parse_reset(headers.get("x-ratelimit-reset-tokens")) or self.default_pause)
+                self.successes += 1
+                if self.limit < self.max_concurrency and self.successes >= self.recover_after:
+                    self.limit += 1
+                    self.successes = 0
+            self._cond.notify_all()
+
+    def summary(self) -> str:
+        with self._cond:
+            remaining = f", {self.remaining_requests} requests left" if self.remaining_requests is not None else ""
+            return (f"{self.admitted} rewrites admitted, waited {self.waited:.1f}s, {self.throttled} throttled (429), "
+                    f"{self.preempted} paused before the limit, concurrency {self.limit}/{self.max_concurrency}"
+                    f"{remaining}")
+
+
+_admission = None
+_admission_lock = threading.Lock()
+
+
+def get_openai_admission(config) -> OpenAIAdmission:
+    """
+    Process-wide admission control built from the app config
+    """
+    global _admission
+    with _admission_lock:
+        if _admission is None:
+            _admission = OpenAIAdmission.from_config(config)
+        return _admission
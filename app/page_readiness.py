@@ -0,0 +1,125 @@
+# app/page_readiness.py
+import time
+import logging
+from collections import namedtuple
+from typing import Optional, List
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger('app.page_readiness')
+
+# Устанавливается в страницу при первом опросе: MutationObserver запоминает время
+# последнего изменения DOM, а из инжектора AngularJS читается число незавершённых $http-запросов
+READINESS_SCRIPT = """
+var selector = arguments[0];
+if (!window.__pageReadiness) {
+    window.__pageReadiness = {lastMutation: Date.now()};
+    try {
+        new MutationObserver(function () {
+            window.__pageReadiness.lastMutation = Date.now();
+        }).observe(document.documentElement, {
+            childList: true, subtree: true, attributes: true, characterData: true
+        });
+    } catch (e) {}
+}
+var pending = null;
+try {
+    if (window.angular) {
+        var injector = window.angular.element(document.documentElement).injector();
+        if (injector) {
+            pending = injector.get('$http').pendingRequests.length;
+        }
+    }
+} catch (e) {}
+var matched = 0;
+if (selector) {
+    try { matched = document.querySelectorAll(selector).length; } catch (e) {}
+}
+return {
+    readyState: document.readyState,
+    pending: pending,
+    quietMs: Date.now() - window.__pageReadiness.lastMutation,
+    matched: matched
+};
+"""
+
+PageWait = namedtuple('PageWait', ['url', 'reason', 'elapsed', 'matched'])
+
+
+class WaitTimings:
+    """
+    Collects per-page wait timings for one scrape run
+    """
+
+    def __init__(self):
+        self.waits: List[PageWait] = []
+
+    def record(self, wait: PageWait):
+        self.waits.append(wait)
+
+    @property
+    def total(self) -> float:
+        return sum(w.elapsed for w in self.waits)
+
+    def summary(self) -> str:
+        if not self.waits:
+            return "no page waits recorded"
+        slowest = max(self.waits, key=lambda w: w.elapsed)
+        reasons = {}
+        for w in self.waits:
+            reasons[w.reason] = reasons.get(w.reason, 0) + 1
+        return (
+            f"{len(self.waits)} pages, total wait {self.total:.1f}s, "
+            f"avg {self.total / len(self.waits):.2f}s, slowest {slowest.elapsed:.1f}s ({slowest.url}), "
+            f"reasons {reasons}"
+        )
+
+
+def wait_for_page_ready(driver, selector: Optional[str] = None, timeout: float = 45,
+                        quiet_ms: int = 500, poll_interval: float = 0.1) -> PageWait:
+    """
+    Waits until the current page is ready instead of sleeping for a fixed time.
+
+    The page is ready when AngularJS has no pending $http requests and either
+    the selector matched or the DOM has been mutation-quiet for quiet_ms.
+
+    Returns:
+        PageWait with the reason: 'selector', 'settled', 'timeout' or 'error'
+    """
+    start = time.monotonic()
+    url = ""
+    matched = 0
+    reason = "timeout"
+
+    try:
+        url = driver.current_url
+    except WebDriverException:
+        pass
+
+    while True:
+        elapsed = time.monotonic() - start
+        try:
+            state = driver.execute_script(READINESS_SCRIPT, selector) or {}
+        except WebDriverException as e:
+            logger.warning(f"Readiness check failed on {url}: {e}")
+            reason = "error"
+            break
+
+        matched = state.get("matched") or 0
+        angular_idle = state.get("pending") in (None, 0)
+        loaded = state.get("readyState") == "complete"
+
+        if matched and angular_idle:
+            reason = "selector"
+            break
+        if loaded and angular_idle and (state.get("quietMs") or 0) >= quiet_ms:
+            reason = "settled"
+            break
+        if elapsed >= timeout:
+            break
+
+        time.sleep(poll_interval)
+
+    wait = PageWait(url, reason, time.monotonic() - start, matched)
+    logger.debug(f"Page {url} ready in {wait.elapsed:.2f}s ({reason}, matched {matched})")
+    return wait
@@ -0,0 +1,214 @@
+# app/rate_limiter.py
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger('app.rate_limiter')
+
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_host_rates(value) -> Dict[str, float]:
+    """
+    "www.levitin.de=1,example.org=5" -> {"www.levitin.de": 1.0, "example.org": 5.0}
+    """
+    if isinstance(value, dict):
+        return {k: float(v) for k, v in value.items()}
+    rates = {}
+    for part in (value or "").split(","):
+        if "=" in part:
+            host, rate = part.rsplit("=", 1)
+            try:
+                rates[host.strip().lower()] = float(rate)
+            except ValueError:
+                logger.warning(f"Ignoring invalid host rate: {part}")
+    return rates
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """
+    Retry-After header (seconds or HTTP date) -> seconds to wait
+    """
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Token bucket for one host. Callers reserve a token and sleep for the
+    returned time, so concurrent callers queue up instead of racing.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.successes = 0
+        # Статистика
+        self.requests = 0
+        self.waited = 0.0
+        self.throttled = 0
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        # Во время паузы updated лежит в будущем: токены копятся только после неё
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return self.updated - now + wait
+
+    def pause(self, seconds: float):
+        """
+        No requests for `seconds`, then tokens accrue from zero again, so
+        requests queued during the pause leave 1/rate apart
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.updated = max(self.updated, self.paused_until)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class HostRateLimiter:
+    """
+    Per-host token buckets shared by every fetch path (Selenium, requests,
+    image downloads).
+
+    Each host gets `rate` requests per second with bursts of up to `burst`.
+    A 429/503 response halves that host's rate (not below min_rate) and
+    honours Retry-After; after `recover_after` successful responses in a
+    row the rate grows back by 25% up to its configured value.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: int = 4, host_rates: Optional[Dict[str, float]] = None,
+                 min_rate: float = 0.2, recover_after: int = 20, enabled: bool = True):
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self.min_rate = min_rate
+        self.recover_after = recover_after
+        self.enabled = enabled
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'HostRateLimiter':
+        return cls(
+            rate=config.get('RATE_LIMIT_PER_HOST', 2.0),
+            burst=config.get('RATE_LIMIT_BURST', 4),
+            host_rates=parse_host_rates(config.get('RATE_LIMIT_HOSTS', "")),
+            min_rate=config.get('RATE_LIMIT_MIN', 0.2),
+            enabled=config.get('RATE_LIMIT_ENABLED', True),
+        )
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc.lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.host_rates.get(host, self.rate), self.burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    def acquire(self, url: str) -> float:
+        """
+        Blocks until a request to url's host is allowed. Returns the wait in seconds.
+        """
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            bucket = self._bucket(url)
+            wait = bucket.reserve()
+            bucket.requests += 1
+            bucket.waited += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def feedback(self, url: str, status: Optional[int], retry_after: Optional[str] = None) -> None:
+        """
+        Adapts the host's rate to the response status
+        """
+        if not self.enabled or status is None:
+            return
+        with self._lock:
+            bucket = self._bucket(url)
+            if status in THROTTLE_STATUSES:
+                bucket.throttled += 1
+                bucket.successes = 0
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                bucket.tokens = min(bucket.tokens, 0.0)
+                pause = parse_retry_after(retry_after)
+                if pause:
+                    bucket.pause(pause)
+                logger.warning(f"{urlsplit(url).netloc} answered {status}, slowing down to {bucket.rate:.2f} req/s"
+                               + (f" and pausing {pause:.0f}s" if pause else ""))
+            elif status < 500:
+                bucket.successes += 1
+                if bucket.rate < bucket.base_rate and bucket.successes >= self.recover_after:
+                    bucket.rate = min(bucket.base_rate, bucket.rate * 1.25)
+                    bucket.successes = 0
+
+    def summary(self) -> str:
+        with self._lock:
+            if not self._buckets:
+                return "no requests"
+            return "; ".join(
+                f"{host}: {b.requests} requests, waited {b.waited:.1f}s, {b.throttled} throttled, "
+                f"{b.rate:.2f} req/s"
+                for host, b in sorted(self._buckets.items())
+            )
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def configure_rate_limiter(config) -> HostRateLimiter:
+    """
+    Builds the process-wide limiter from the app config. Called by
+    create_app on the main thread, since most requests are made by worker
+    threads without an app context.
+    """
+    global _limiter
+    with _limiter_lock:
+        _limiter = HostRateLimiter.from_config(config)
+        return _limiter
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """
+    Process-wide limiter (see configure_rate_limiter)
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            if has_app_context():
+                config = current_app.config
+            else:
+                # Без приложения - те же настройки из окружения, что и у Config
+                from app.config import Config
+                config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+                logger.warning("Rate limiter used outside an app before configure_rate_limiter(), "
+                               "configured from the environment")
+            _limiter = HostRateLimiter.from_config(config)
+        return _limiter
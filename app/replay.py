@@ -0,0 +1,129 @@
+# app/replay.py
+import contextlib
+import glob
+import logging
+import os
+from typing import Dict, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from app.artifacts import MANIFEST, ArtifactStore
+from app.fast_extractor import parse_html, select_items
+from app.models import normalize_url
+from app.page_readiness import READINESS_SCRIPT
+
+logger = logging.getLogger('app.replay')
+
+OUTER_HTML_SCRIPT = "return document.documentElement.outerHTML;"
+BLANK_PAGE = "<html><head></head><body></body></html>"
+
+
+def load_snapshots(path: str) -> Dict[str, str]:
+    """
+    Rendered pages by normalized URL from an artifact store directory (all
+    runs, the newest snapshot of a URL wins) or from a single run directory
+    """
+    path = path.rstrip(os.sep)
+    if os.path.isfile(os.path.join(path, MANIFEST)):
+        store, run_ids = ArtifactStore(os.path.dirname(path)), [os.path.basename(path)]
+    else:
+        store = ArtifactStore(path)
+        run_ids = store.runs()
+    pages = {}
+    for run_id in run_ids:
+        for entry, content in store.iter_snapshots(run_id):
+            if entry["kind"] in ("section", "detail", "page") and isinstance(content, str):
+                pages[normalize_url(entry["url"])] = content
+    return pages
+
+
+class _Element:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ReplayDriver:
+    """
+    Stand-in for a Chrome WebDriver that serves saved snapshots.
+
+    It answers the readiness probe, returns the page HTML and body text,
+    and refuses any other script, so in-page extraction falls back to the
+    lxml extractor. URLs without a snapshot get `default` (or a blank page).
+    """
+    # load_url() skips the rate limiter for drivers that never touch the network
+    offline = True
+
+    def __init__(self, pages: Dict[str, str], default: Optional[str] = None):
+        self.pages = pages
+        self.default = default
+        self.current_url = ""
+        self.page_source = BLANK_PAGE
+        self._tree = None
+        self.misses = 0
+
+    def get(self, url: str):
+        html = self.pages.get(normalize_url(url))
+        if html is None:
+            self.misses += 1
+            logger.debug(f"No snapshot for {url}")
+            html = self.default or BLANK_PAGE
+        self.current_url = url
+        self.page_source = html
+        self._tree = None
+
+    def _parsed(self):
+        if self._tree is None:
+            self._tree = parse_html(self.page_source)
+        return self._tree
+
+    def execute_script(self, script: str, *args):
+        if script == OUTER_HTML_SCRIPT:
+            return self.page_source
+        if script == READINESS_SCRIPT:
+            selector = args[0] if args else None
+            matched = len(select_items(self._parsed(), selector)) if selector else 0
+            return {"readyState": "complete", "pending": None, "quietMs": 10 ** 9, "matched": matched}
+        raise WebDriverException("Scripts are not available in replay mode")
+
+    def find_element(self, by, value):
+        nodes = self._parsed().xpath(f"//{value}") if value else []
+        return _Element(nodes[0].text_content() if nodes else "")
+
+    def get_log(self, log_type: str):
+        return []
+
+
+class ReplayPool:
+    """
+    Drop-in for DriverPool that hands out ReplayDrivers
+    """
+
+    def __init__(self, pages: Dict[str, str], default: Optional[str] = None, size: int = 1):
+        self.pages = pages
+        self.default = default
+        self.size = max(1, int(size))
+
+    @classmethod
+    def from_path(cls, path: str, default_page: Optional[str] = None, size: int = 1) -> 'ReplayPool':
+        """
+        Pool over a snapshot directory (see load_snapshots) or a single HTML
+        file. default_page is an HTML file served for URLs without a snapshot;
+        a single HTML file is served for every URL.
+        """
+        default = None
+        if os.path.isfile(path):
+            pages, default_page = {}, path
+        else:
+            pages = load_snapshots(path)
+            # Плоские *.html (например, старые дампы debug/) не привязаны к URL
+            if not pages and not default_page:
+                default_page = next(iter(sorted(glob.glob(os.path.join(path, "*.html")))), None)
+        if default_page:
+            with open(default_page, encoding="utf-8") as f:
+                default = f.read()
+        logger.info(f"Replaying {len(pages)} snapshots from {path}" + (f", default page {default_page}" if default else ""))
+        return cls(pages, default=default, size=size)
+
+    @contextlib.contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        yield ReplayDriver(self.pages, self.default)
@@ -0,0 +1,187 @@
+# app/resource_filter.py
+import json
+import logging
+import threading
+from collections import namedtuple
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger('app.resource_filter')
+
+# Домены аналитики, карт, платёжных и социальных виджетов, не нужные для извлечения текста
+TRACKER_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "mc.yandex.ru", "connect.facebook.net", "facebook.com",
+    "maps.google.com", "maps.googleapis.com", "maps.gstatic.com",
+    "secure.pay1.de", "code.jivosite.com", "npmcdn.com",
+    "youtube.com", "vk.com", "ok.ru", "twitter.com",
+]
+
+# Расширения файлов по типам ресурсов
+RESOURCE_TYPE_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "bmp"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "media": ["mp4", "webm", "mp3", "ogg", "wav", "avi", "mov", "m3u8"],
+}
+
+# Примерный размер заблокированного ответа по типу CDP, для оценки сэкономленного трафика
+TYPICAL_BYTES = {
+    "Image": 40 * 1024,
+    "Font": 60 * 1024,
+    "Media": 500 * 1024,
+    "Script": 80 * 1024,
+    "Stylesheet": 30 * 1024,
+    "XHR": 5 * 1024,
+    "Fetch": 5 * 1024,
+}
+DEFAULT_TYPICAL_BYTES = 10 * 1024
+
+PageResources = namedtuple('PageResources', ['url', 'requests', 'blocked', 'bytes_loaded', 'bytes_saved', 'status'])
+
+
+def _split(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [v.strip().lower() for v in value if v and v.strip()]
+
+
+def enable_performance_log(chrome_options):
+    """
+    Turns on Chrome's performance log, the source of read_page_resources
+    (request counts and the page status the rate limiter reacts to)
+    """
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return chrome_options
+
+
+class ResourceFilter:
+    """
+    Blocks third-party and heavy resources in Chrome through the DevTools
+    protocol (Network.setBlockedURLs).
+
+    block_types: any of 'image', 'font', 'media', 'tracker'
+    deny_domains: extra domains to block
+    allow_domains: domains that are never blocked by the domain rules
+    """
+
+    def __init__(self, block_types: Iterable[str] = ("image", "font", "media", "tracker"),
+                 deny_domains: Iterable[str] = (), allow_domains: Iterable[str] = ()):
+        self.block_types = set(_split(block_types))
+        self.allow_domains = set(_split(allow_domains))
+
+        domains = list(_split(deny_domains))
+        if "tracker" in self.block_types:
+            domains.extend(TRACKER_DOMAINS)
+        self.deny_domains = sorted({d for d in domains if not self._is_allowed(d)})
+
+    def _is_allowed(self, domain: str) -> bool:
+        return any(domain == a or domain.endswith("." + a) for a in self.allow_domains)
+
+    @classmethod
+    def from_config(cls, config) -> Optional['ResourceFilter']:
+        if not config.get('BROWSER_BLOCK_RESOURCES', True):
+            return None
+        return cls(
+            block_types=config.get('BROWSER_BLOCK_TYPES', "image,font,media,tracker"),
+            deny_domains=config.get('BROWSER_DENY_DOMAINS', ""),
+            allow_domains=config.get('BROWSER_ALLOW_DOMAINS', ""),
+        )
+
+    def url_patterns(self) -> List[str]:
+        patterns = [f"*://{d}/*" for d in self.deny_domains]
+        patterns += [f"*://*.{d}/*" for d in self.deny_domains]
+        for resource_type, extensions in RESOURCE_TYPE_EXTENSIONS.items():
+            if resource_type in self.block_types:
+                for ext in extensions:
+                    patterns.append(f"*.{ext}")
+                    patterns.append(f"*.{ext}?*")
+        return patterns
+
+    def prepare_options(self, chrome_options):
+        """
+        Enables the performance log so blocked requests can be counted per page
+        """
+        return enable_performance_log(chrome_options)
+
+    def apply(self, driver):
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.url_patterns()})
+        logger.info(f"Blocking {len(self.deny_domains)} domains and types {sorted(self.block_types)}")
+
+
+def read_page_resources(driver) -> Optional[PageResources]:
+    """
+    Drains the performance log of the driver and summarises network activity
+    since the previous call: requests made, requests blocked by the filter,
+    bytes actually loaded, an estimate of the bytes saved and the HTTP
+    status of the main frame's document.
+    """
+    try:
+        entries = driver.get_log('performance')
+        url = driver.current_url
+    except Exception:
+        return None
+
+    requests_seen = set()
+    blocked = 0
+    bytes_loaded = 0
+    bytes_saved = 0
+    main_frame = None
+    documents = []
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            requests_seen.add(params.get('requestId'))
+        elif method == 'Page.frameNavigated' and not params.get('frame', {}).get('parentId'):
+            main_frame = params['frame'].get('id')
+        elif method == 'Network.responseReceived' and params.get('type') == 'Document':
+            # Документы iframe тоже имеют тип Document
+            documents.append((params.get('frameId'), params.get('response', {}).get('status')))
+        elif method == 'Network.loadingFinished':
+            bytes_loaded += int(params.get('encodedDataLength') or 0)
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            blocked += 1
+            bytes_saved += TYPICAL_BYTES.get(params.get('type'), DEFAULT_TYPICAL_BYTES)
+
+    # Статус страницы - ответ главного фрейма, без событий Page - первый документ
+    status = next((s for frame, s in documents if frame == main_frame),
+                  documents[0][1] if documents else None)
+    return PageResources(url, len(requests_seen), blocked, bytes_loaded, bytes_saved, status)
+
+
+class ResourceReport:
+    """
+    Per-page resource statistics for one scrape run
+    """
+
+    def __init__(self):
+        self.pages: List[PageResources] = []
+        self._lock = threading.Lock()
+
+    def collect(self, driver):
+        page = read_page_resources(driver)
+        if page is None:
+            return None
+        with self._lock:
+            self.pages.append(page)
+        logger.debug(f"{page.url}: {page.blocked}/{page.requests} requests blocked, "
+                     f"~{page.bytes_saved // 1024} KB saved, {page.bytes_loaded // 1024} KB loaded")
+        return page
+
+    def summary(self) -> str:
+        if not self.pages:
+            return "no resource statistics"
+        blocked = sum(p.blocked for p in self.pages)
+        requests_total = sum(p.requests for p in self.pages)
+        saved = sum(p.bytes_saved for p in self.pages)
+        loaded = sum(p.bytes_loaded for p in self.pages)
+        return (
+            f"{len(self.pages)} pages, {blocked}/{requests_total} requests blocked, "
+            f"~{saved / 1024 / 1024:.1f} MB saved, {loaded / 1024 / 1024:.1f} MB loaded"
+        )
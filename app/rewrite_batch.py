@@ -0,0 +1,147 @@
+# app/rewrite_batch.py
+import contextlib
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Set
+
+from flask import current_app
+
+from app.models import Article, db
+from app.openai_admission import get_openai_admission
+from app.rewrite_cache import get_rewrite_cache, is_cacheable
+from app.rewriter import rewrite_text
+
+logger = logging.getLogger('app.rewrite_batch')
+
+# Тексты короче этого публикатор помечает как опубликованные без переписывания
+MIN_TEXT_LENGTH = 50
+
+BatchResult = namedtuple('BatchResult', ['selected', 'rewritten', 'failed', 'seconds'])
+
+# Статьи, которые сейчас переписываются (пакетом или публикатором), чтобы не платить дважды
+_claimed: Set[int] = set()
+_claimed_cond = threading.Condition()
+
+
+def claim_articles(article_ids: Iterable[int]) -> Set[int]:
+    """
+    Claims the articles nobody is rewriting; returns the claimed ids
+    """
+    with _claimed_cond:
+        claimed = {article_id for article_id in article_ids if article_id not in _claimed}
+        _claimed.update(claimed)
+        return claimed
+
+
+def release_article(article_id: int) -> None:
+    with _claimed_cond:
+        _claimed.discard(article_id)
+        _claimed_cond.notify_all()
+
+
+@contextlib.contextmanager
+def rewrite_claim(article_id: int, timeout: Optional[float] = None):
+    """
+    Claims one article for an inline rewrite. While a running batch holds
+    it, waits until the batch releases it (its rewrite is then stored).
+    Yields False if the article is still claimed after timeout seconds.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    with _claimed_cond:
+        while article_id in _claimed:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                break
+            _claimed_cond.wait(remaining)
+        claimed = article_id not in _claimed
+        if claimed:
+            _claimed.add(article_id)
+    try:
+        yield claimed
+    finally:
+        if claimed:
+            release_article(article_id)
+
+
+def pending_rewrites(limit: int) -> List[Article]:
+    """
+    Oldest unpublished articles without a rewrite, in publishing order
+    """
+    return (Article.query
+            .filter(Article.is_posted.is_(False), Article.rewritten_text.is_(None),
+                    db.func.length(Article.original_text) >= MIN_TEXT_LENGTH)
+            .order_by(Article.created_at).limit(limit).all())
+
+
+def rewrite_pending(limit: Optional[int] = None, concurrency: Optional[int] = None) -> BatchResult:
+    """
+    Rewrites up to `limit` pending articles concurrently.
+
+    Rewrites run on up to `concurrency` threads; the OpenAI admission
+    control narrows that down while the API reports rate limits. Each
+    result is committed as soon as it arrives. Failed rewrites are left
+    empty, so the next batch (or the publish job) tries them again.
+    Articles are claimed until their result is stored, so the publish job
+    waits for them instead of rewriting them a second time.
+    """
+    app = current_app._get_current_object()
+    limit = limit if limit is not None else app.config.get('REWRITE_BATCH_SIZE', 20)
+    concurrency = concurrency or get_openai_admission(app.config).max_concurrency
+    start = time.monotonic()
+
+    articles = pending_rewrites(limit)
+    claimed = claim_articles(article.id for article in articles)
+    jobs = [(article.id, article.original_text) for article in articles if article.id in claimed]
+    if not jobs:
+        return BatchResult(0, 0, 0, 0.0)
+    logger.info(f"Rewriting {len(jobs)} pending articles, up to {concurrency} at a time")
+
+    results = queue.Queue()
+
+    def worker(job):
+        article_id, text = job
+        try:
+            with app.app_context():
+                results.put((article_id, rewrite_text(text), None))
+        except Exception as e:
+            results.put((article_id, None, e))
+
+    rewritten = failed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(jobs))) as executor:
+            for job in jobs:
+                executor.submit(worker, job)
+            for _ in range(len(jobs)):
+                article_id, result, error = results.get()
+                try:
+                    if error is not None or not is_cacheable(result):
+                        failed += 1
+                        logger.warning(f"Rewrite of article ID={article_id} failed, will retry later: "
+                                       f"{error or (result or '')[:200]}")
+                        continue
+                    # Публикатор мог переписать статью сам до начала пакета
+                    updated = (Article.query.filter_by(id=article_id, rewritten_text=None)
+                               .update({"rewritten_text": result}, synchronize_session=False))
+                    db.session.commit()
+                    rewritten += updated
+                except Exception as e:
+                    db.session.rollback()
+                    failed += 1
+                    logger.error(f"Could not store rewrite of article ID={article_id}: {e}")
+                finally:
+                    release_article(article_id)
+    finally:
+        for article_id, _ in jobs:
+            release_article(article_id)
+
+    seconds = time.monotonic() - start
+    logger.info(f"Batch rewrite: {rewritten}/{len(jobs)} rewritten in {seconds:.1f}s, {failed} failed; "
+                f"admission: {get_openai_admission(app.config).summary()}")
+    cache = get_rewrite_cache(app.config)
+    if cache is not None:
+        logger.info(f"Rewrite cache: {cache.summary()}")
+    return BatchResult(len(jobs), rewritten, failed, seconds)
@@ -0,0 +1,216 @@
+# app/rewrite_cache.py
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional
+
+logger = logging.getLogger('app.rewrite_cache')
+
+# Результаты вида "[Error ...]" / "[Rewriting timed out. Original: ...]" не кэшируются
+_ERROR_RESULT = re.compile(r"^\[(Error\b|.*\bOriginal: )", re.DOTALL)
+
+
+def normalize_text(text: str) -> str:
+    """
+    NFC, collapsed whitespace and stripped ends: re-scrapes that differ only
+    in formatting map to the same cache key
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def cache_key(text: str, identity: str) -> str:
+    """
+    SHA-256 of the backend identity (assistant or model) and the normalized text
+    """
+    payload = identity + "\0" + normalize_text(text)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(result: Optional[str]) -> bool:
+    return bool(result and result.strip()) and not _ERROR_RESULT.match(result)
+
+
+class RewriteCache:
+    """
+    On-disk cache of rewrite results, one JSON file per entry.
+
+    Entries are addressed by cache_key(text, identity), so a changed
+    assistant, model or instructions never serves an old rewrite. Entries
+    older than ttl seconds (0 = never) expire; beyond max_bytes or
+    max_entries the least recently used entries are evicted first. Error
+    results are never stored.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 20 * 1024 * 1024,
+                 max_entries: int = 5000, ttl: float = 90 * 86400):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "rejected": 0, "expired": 0, "evictions": 0}
+        self._index: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @classmethod
+    def from_config(cls, config) -> Optional['RewriteCache']:
+        if not config.get('REWRITE_CACHE_ENABLED', True):
+            return None
+        return cls(
+            directory=config.get('REWRITE_CACHE_DIR', 'cache/rewrites'),
+            max_bytes=int(config.get('REWRITE_CACHE_MAX_MB', 20) * 1024 * 1024),
+            max_entries=int(config.get('REWRITE_CACHE_MAX_ENTRIES', 5000)),
+            ttl=config.get('REWRITE_CACHE_TTL_DAYS', 90) * 86400,
+        )
+
+    # --- storage ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _load_index(self):
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    entry = json.load(f)
+                # Текст хранится только на диске, в памяти - метаданные
+                entry.pop("text", None)
+                self._index[name[:-5]] = entry
+            except (OSError, ValueError):
+                continue
+
+    def _write(self, key: str, entry: dict, text: str):
+        path = self._path(key)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(entry, text=text), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _read(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f).get("text")
+        except (OSError, ValueError):
+            return None
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _expired(self, entry: dict, now: float) -> bool:
+        return bool(self.ttl) and now - entry["stored_at"] >= self.ttl
+
+    def _evict(self, now: float):
+        for key in [key for key, entry in self._index.items() if self._expired(entry, now)]:
+            self._remove(key)
+            self.stats["expired"] += 1
+        total = sum(entry.get("size", 0) for entry in self._index.values())
+        if total <= self.max_bytes and len(self._index) <= self.max_entries:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1].get("last_access", 0)):
+            if total <= self.max_bytes and len(self._index) <= self.max_entries:
+                break
+            total -= entry.get("size", 0)
+            self._remove(key)
+            self.stats["evictions"] += 1
+
+    # --- public API ---
+
+    def get(self, text: str, identity: str) -> Optional[str]:
+        key = cache_key(text, identity)
+        now = time.time()
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(key)
+                self.stats["expired"] += 1
+                entry = None
+            result = self._read(key) if entry is not None else None
+            if result is None:
+                self.stats["misses"] += 1
+                return None
+            entry["last_access"] = now
+            entry["hits"] = entry.get("hits", 0) + 1
+            self.stats["hits"] += 1
+            try:
+                # Время доступа сохраняется, чтобы LRU работал и после перезапуска
+                self._write(key, entry, result)
+            except OSError as e:
+                logger.debug(f"Could not update cache entry {key}: {e}")
+            return result
+
+    def put(self, text: str, identity: str, result: str) -> bool:
+        """
+        Stores a rewrite; returns False for error results, which are never cached
+        """
+        if not is_cacheable(result):
+            with self._lock:
+                self.stats["rejected"] += 1
+            return False
+        key = cache_key(text, identity)
+        now = time.time()
+        entry = {"identity": identity, "stored_at": now, "last_access": now, "hits": 0,
+                 "size": len(result.encode("utf-8")) + len(text.encode("utf-8"))}
+        with self._lock:
+            try:
+                self._write(key, entry, result)
+            except OSError as e:
+                logger.warning(f"Could not store rewrite in cache: {e}")
+                return False
+            self._index[key] = entry
+            self.stats["stores"] += 1
+            self._evict(now)
+        return True
+
+    def clear(self) -> int:
+        with self._lock:
+            keys = list(self._index)
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def usage(self) -> dict:
+        """
+        Stored entries, bytes and lifetime hits (persisted per entry)
+        """
+        with self._lock:
+            entries = list(self._index.values())
+        return {"entries": len(entries), "bytes": sum(e.get("size", 0) for e in entries),
+                "hits": sum(e.get("hits", 0) for e in entries)}
+
+    def summary(self) -> str:
+        s = self.stats
+        lookups = s["hits"] + s["misses"]
+        hit_rate = s["hits"] / lookups if lookups else 0.0
+        usage = self.usage()
+        return (
+            f"{s['hits']} hits, {s['misses']} misses, hit rate {hit_rate:.0%}, {s['stores']} stored, "
+            f"{s['rejected']} errors not cached, {s['expired']} expired, {s['evictions']} evictions; "
+            f"{usage['entries']} entries, {usage['bytes'] // 1024} KB"
+        )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_rewrite_cache(config) -> Optional[RewriteCache]:
+    """
+    Process-wide cache instance built from the app config
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RewriteCache.from_config(config)
+        return _cache
@@ -1,110 +1,349 @@
 # app/rewriter.py
-import openai
 import time
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
 from flask import current_app
 
+from app.openai_admission import get_openai_admission
+from app.rewrite_cache import get_rewrite_cache
+from app.run_completion import complete_run, get_openai_client
+from app.text_chunks import chunk_prompt, estimate_tokens, fit_budget, paragraphs, split_chunks, stitch
+
 logger = logging.getLogger('app.rewriter')
 
-def rewrite_text(original_text: str, max_retries=3, delay=2) -> str:
+_BACKENDS: Dict[str, type] = {}
+
+
+def register_backend(name: str):
     """
-    Rewrites text using OpenAI's assistant API
-    
-    Args:
-        original_text: The text to rewrite
-        max_retries: Maximum number of retry attempts
-        delay: Delay between retries
-        
-    Returns:
-        Rewritten text or error message
+    Class decorator adding a rewriter backend to the registry under `name`
     """
-    if not original_text or len(original_text.strip()) < 10:
-        logger.warning("Text too short to rewrite")
-        return "Text too short to rewrite properly."
-        
-    try:
-        openai.api_key = current_app.config.get('OPENAI_API_KEY')
-        assistant_id = current_app.config.get('OPENAI_ASSISTANT_ID')
-        
-        if not openai.api_key:
-            logger.error("OpenAI API key not configured")
-            return f"[OpenAI API key not configured. Original: {original_text[:100]}...]"
-            
-        if not assistant_id:
-            logger.error("OpenAI Assistant ID not configured")
-            return f"[OpenAI Assistant ID not configured. Original: {original_text[:100]}...]"
-            
-        logger.info(f"Rewriting text of length {len(original_text)}")
-        
+    def decorator(cls):
+        cls.name = name
+        _BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def available_backends():
+    return list(_BACKENDS)
+
+
+class RewriteError(Exception):
+    """
+    Rewrite failed; the message becomes the "[<message>. Original: ...]" result
+    """
+
+
+class RewriterBackend:
+    """
+    Base class of rewriter backends.
+
+    rewrite() returns the rewritten text or raises RewriteError. Each call
+    is counted with its latency and the number of API requests it made.
+    Keyword options of rewrite() are passed to the backend, which ignores
+    those it does not use.
+    """
+    name = ""
+
+    def __init__(self, config):
+        self.config = config
+        self.client = get_openai_client(config)
+        self.calls = 0
+        self.requests = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'RewriterBackend':
+        return cls(config)
+
+    def identity(self) -> str:
+        """
+        What the output depends on besides the input text (rewrite cache key)
+        """
+        raise NotImplementedError
+
+    def _rewrite(self, text: str, **options) -> Tuple[str, int]:
+        """
+        Returns (rewritten text, number of API requests made)
+        """
+        raise NotImplementedError
+
+    def rewrite(self, text: str, **options) -> str:
+        start = time.monotonic()
+        requests = 0
+        try:
+            result, requests = self._rewrite(text, **options)
+            return result
+        except RewriteError as e:
+            requests = getattr(e, "requests", requests)
+            raise
+        finally:
+            with self._lock:
+                self.calls += 1
+                self.requests += requests
+                self.seconds += time.monotonic() - start
+
+    def summary(self) -> str:
+        with self._lock:
+            if not self.calls:
+                return f"{self.name}: no calls"
+            return (f"{self.name}: {self.calls} calls, avg {self.seconds / self.calls:.2f}s, "
+                    f"{self.requests / self.calls:.1f} requests per call")
+
+
+def _failed(message: str, requests: int) -> RewriteError:
+    error = RewriteError(message)
+    error.requests = requests
+    return error
+
+
+@register_backend("assistants")
+class AssistantsBackend(RewriterBackend):
+    """
+    Thread + message + run of the configured assistant (at least three
+    requests per rewrite, the thread stays on the account)
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.assistant_id = config.get('OPENAI_ASSISTANT_ID')
+        if not self.assistant_id:
+            raise RewriteError("OpenAI Assistant ID not configured")
+
+    def identity(self):
+        return f"assistants:{self.assistant_id}"
+
+    def _rewrite(self, text, max_retries=3, delay=2, **options):
+        requests = 0
         # Create a new thread with retry logic
         thread = None
-        run = None
-        
         for attempt in range(max_retries):
             try:
-                thread = openai.beta.threads.create()
-                openai.beta.threads.messages.create(
+                requests += 1
+                thread = self.client.beta.threads.create()
+                requests += 1
+                self.client.beta.threads.messages.create(
                     thread_id=thread.id,
                     role="user",
-                    content=original_text
-                )
-                run = openai.beta.threads.runs.create(
-                    thread_id=thread.id,
-                    assistant_id=assistant_id
+                    content=text
                 )
                 break
             except Exception as e:
                 if attempt == max_retries - 1:
-                    raise
+                    raise _failed(f"Error during rewriting: {str(e)}", requests)
                 logger.warning(f"Retry {attempt+1}/{max_retries} after error: {e}")
                 time.sleep(delay)
-        
-        # Wait for completion with timeout
-        max_wait_time = 120  # 2 minutes
-        start_time = time.time()
-        poll_interval = 2  # seconds
-        
-        logger.info(f"Waiting for OpenAI processing to complete")
-        
-        while True:
-            try:
-                run = openai.beta.threads.runs.retrieve(thread_id=thread.id, run_id=run.id)
-                
-                if run.status == "completed":
-                    logger.info("Rewriting completed successfully")
-                    break
-                    
-                if run.status in ["failed", "cancelled", "expired"]:
-                    logger.error(f"Rewrite failed with status: {run.status}")
-                    return f"[Rewriting failed with status: {run.status}. Original: {original_text[:100]}...]"
-                    
-                # Check for timeout
-                if time.time() - start_time > max_wait_time:
-                    logger.error(f"Rewrite timed out after {max_wait_time} seconds")
-                    return f"[Rewriting timed out. Original: {original_text[:100]}...]"
-                    
-                time.sleep(poll_interval)
-            except Exception as e:
-                logger.error(f"Error while checking run status: {e}")
-                return f"[Error during rewriting: {str(e)}. Original: {original_text[:100]}...]"
 
-        # Get the assistant's response
+        # Ответ приходит потоком событий run; при ошибке потока - опрос с нарастающим интервалом
+        max_wait_time = self.config.get('OPENAI_RUN_TIMEOUT', 120)
+        logger.info(f"Waiting for OpenAI processing to complete")
         try:
-            messages = openai.beta.threads.messages.list(thread_id=thread.id)
-            reply = next((m for m in reversed(messages.data) if m.role == "assistant"), None)
-            
-            if reply and hasattr(reply, 'content') and reply.content:
-                content_text = reply.content[0].text.value if reply.content[0].type == 'text' else None
-                if content_text:
-                    logger.info(f"Successfully retrieved rewritten content of length {len(content_text)}")
-                    return content_text
-                    
+            result = complete_run(
+                self.client, thread.id, self.assistant_id,
+                mode=self.config.get('OPENAI_RUN_MODE', 'stream'),
+                timeout=max_wait_time,
+                poll_initial=self.config.get('OPENAI_POLL_INITIAL', 0.25),
+                poll_max=self.config.get('OPENAI_POLL_MAX', 2.0),
+            )
+        except Exception as e:
+            logger.error(f"Error while waiting for the run: {e}")
+            raise _failed(f"Error during rewriting: {str(e)}", requests)
+
+        requests += result.metrics.requests
+        logger.info(f"Run finished with status {result.status} ({result.metrics})")
+        if result.status == "timeout":
+            logger.error(f"Rewrite timed out after {max_wait_time} seconds")
+            raise _failed("Rewriting timed out", requests)
+        if result.status != "completed":
+            logger.error(f"Rewrite failed with status: {result.status}")
+            raise _failed(f"Rewriting failed with status: {result.status}", requests)
+        if not result.text:
             logger.error("No valid content found in the assistant's response")
-            return f"[No valid content in response. Original: {original_text[:100]}...]"
+            raise _failed("No valid content in response", requests)
+        return result.text, requests
+
+
+@register_backend("chat")
+class ChatBackend(RewriterBackend):
+    """
+    One chat-completions request per rewrite with the assistant's
+    instructions as the system message. The instructions come from
+    OPENAI_REWRITE_INSTRUCTIONS(_FILE), otherwise they are read once from
+    the configured assistant, together with its model.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.model = config.get('OPENAI_CHAT_MODEL') or None
+        self.instructions = self._configured_instructions(config)
+        self.timeout = config.get('OPENAI_RUN_TIMEOUT', 120)
+        if self.instructions is None or self.model is None:
+            self._load_assistant(config.get('OPENAI_ASSISTANT_ID'))
+
+    @staticmethod
+    def _configured_instructions(config) -> Optional[str]:
+        if config.get('OPENAI_REWRITE_INSTRUCTIONS'):
+            return config['OPENAI_REWRITE_INSTRUCTIONS']
+        path = config.get('OPENAI_REWRITE_INSTRUCTIONS_FILE')
+        if path:
+            with open(path, encoding="utf-8") as f:
+                return f.read().strip()
+        return None
+
+    def _load_assistant(self, assistant_id: Optional[str]):
+        if not assistant_id:
+            raise RewriteError("OpenAI Assistant ID or OPENAI_REWRITE_INSTRUCTIONS not configured")
+        assistant = self.client.beta.assistants.retrieve(assistant_id)
+        self.instructions = self.instructions if self.instructions is not None else (assistant.instructions or "")
+        self.model = self.model or assistant.model
+        logger.info(f"Loaded instructions ({len(self.instructions)} chars) and model {self.model} "
+                    f"of assistant {assistant_id}")
+
+    def identity(self):
+        instructions = hashlib.sha1(self.instructions.encode("utf-8")).hexdigest()[:12]
+        return f"chat:{self.model}:{instructions}"
+
+    def _rewrite(self, text, **options):
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self.instructions},
+                    {"role": "user", "content": text},
+                ],
+                timeout=self.timeout,
+            )
         except Exception as e:
-            logger.error(f"Error retrieving message content: {e}")
-            return f"[Error retrieving content: {str(e)}. Original: {original_text[:100]}...]"
-        
+            logger.error(f"Chat completion failed: {e}")
+            raise _failed(f"Error during rewriting: {str(e)}", 1)
+        choice = response.choices[0] if response.choices else None
+        if choice is None or not choice.message.content:
+            logger.error("No valid content found in the chat completion")
+            raise _failed("No valid content in response", 1)
+        if choice.finish_reason == "length":
+            logger.warning("Chat completion was cut off by the token limit")
+        return choice.message.content, 1
+
+
+_backends: Dict[tuple, RewriterBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_rewriter_backend(config, name: Optional[str] = None) -> RewriterBackend:
+    """
+    Shared backend instance selected by OPENAI_REWRITE_BACKEND (or `name`),
+    so the chat backend loads the assistant instructions only once
+    """
+    name = name or config.get('OPENAI_REWRITE_BACKEND', 'assistants')
+    cls = _BACKENDS.get(name)
+    if cls is None:
+        raise RewriteError(f"Unknown rewriter backend '{name}', available: {', '.join(available_backends())}")
+    key = (name, config.get('OPENAI_API_KEY'), config.get('OPENAI_BASE_URL'), config.get('OPENAI_ASSISTANT_ID'))
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            backend = cls.from_config(config)
+            _backends[key] = backend
+        return backend
+
+
+def rewrite_chunks(rewriter: RewriterBackend, chunks: List[str], config, **options) -> str:
+    """
+    Map-reduce rewrite of a long text: every chunk is rewritten in parallel
+    (each holding its own admission slot) with its position in the article,
+    then the parts are stitched together. Any failed chunk fails the whole
+    rewrite, since a partial article is not publishable.
+    """
+    title = (paragraphs(chunks[0]) or [""])[0][:200]
+    admission = get_openai_admission(config)
+
+    def rewrite_chunk(index):
+        with admission.slot():
+            return rewriter.rewrite(chunk_prompt(chunks[index], index, len(chunks), title), **options)
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        parts = list(executor.map(rewrite_chunk, range(len(chunks))))
+    return stitch(parts)
+
+
+def rewrite_identity(rewriter: RewriterBackend, config) -> str:
+    """
+    Rewrite cache identity: the backend plus the settings that decide how a
+    long text is shortened and split, since they change the result
+    """
+    return (f"{rewriter.identity()}:in{int(config.get('REWRITE_MAX_INPUT_TOKENS', 8000))}"
+            f":{config.get('REWRITE_OVERFLOW', 'summarize')}:chunk{int(config.get('REWRITE_CHUNK_TOKENS', 1500))}"
+            f"x{get_openai_admission(config).max_concurrency}")
+
+
+def rewrite_text(original_text: str, max_retries=3, delay=2, backend: Optional[str] = None,
+                 use_cache: bool = True) -> str:
+    """
+    Rewrites text with the configured backend (OPENAI_REWRITE_BACKEND).
+    Successful rewrites are kept in the rewrite cache, so unchanged text is
+    not sent to OpenAI again. Text over REWRITE_MAX_INPUT_TOKENS is first
+    shortened, text over REWRITE_CHUNK_TOKENS is rewritten in parallel
+    chunks (see rewrite_chunks). There are at most REWRITE_CONCURRENCY
+    chunks, larger than REWRITE_CHUNK_TOKENS if need be: further chunks
+    would wait for a free slot and double the latency.
+
+    Args:
+        original_text: The text to rewrite
+        max_retries: Maximum number of retry attempts
+        delay: Delay between retries
+        backend: Backend name overriding the configuration
+        use_cache: False forces a fresh rewrite (the result is still stored)
+
+    Returns:
+        Rewritten text or error message
+    """
+    if not original_text or len(original_text.strip()) < 10:
+        logger.warning("Text too short to rewrite")
+        return "Text too short to rewrite properly."
+
+    try:
+        if not current_app.config.get('OPENAI_API_KEY'):
+            logger.error("OpenAI API key not configured")
+            return f"[OpenAI API key not configured. Original: {original_text[:100]}...]"
+
+        config = current_app.config
+        rewriter = get_rewriter_backend(config, backend)
+        identity = rewrite_identity(rewriter, config)
+        cache = get_rewrite_cache(config)
+        if cache is not None and use_cache:
+            cached = cache.get(original_text, identity)
+            if cached is not None:
+                logger.info(f"Rewrite cache hit for text of length {len(original_text)}")
+                return cached
+
+        model = getattr(rewriter, "model", None)
+        text = fit_budget(original_text, int(config.get('REWRITE_MAX_INPUT_TOKENS', 8000)),
+                          strategy=config.get('REWRITE_OVERFLOW', 'summarize'), model=model)
+        # Частей не больше, чем одновременных переписываний: все идут одной волной
+        chunks = split_chunks(text, int(config.get('REWRITE_CHUNK_TOKENS', 1500)), model=model,
+                              max_chunks=get_openai_admission(config).max_concurrency)
+        logger.info(f"Rewriting text of length {len(original_text)} (~{estimate_tokens(text, model)} tokens, "
+                    f"{len(chunks)} chunks) with the {rewriter.name} backend")
+        if len(chunks) > 1:
+            result = rewrite_chunks(rewriter, chunks, config, max_retries=max_retries, delay=delay)
+        else:
+            # Слот ограничивает число одновременных переписываний (см. openai_admission)
+            with get_openai_admission(config).slot():
+                result = rewriter.rewrite(text, max_retries=max_retries, delay=delay)
+        logger.info(f"Successfully retrieved rewritten content of length {len(result)}")
+        if cache is not None:
+            cache.put(original_text, identity, result)
+        return result
+
+    except RewriteError as e:
+        logger.error(f"Rewriting failed: {e}")
+        return f"[{e}. Original: {original_text[:100]}...]"
     except Exception as e:
         logger.error(f"Unexpected error during text rewriting: {e}", exc_info=True)
         return f"[Error in rewriting process: {str(e)}. Original: {original_text[:100]}...]"
@@ -0,0 +1,106 @@
+# app/rss_reader.py
+import html
+import logging
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import lxml.html
+import requests
+from lxml import etree
+
+logger = logging.getLogger('app.rss_reader')
+
+FeedEntry = namedtuple('FeedEntry', ['title', 'url', 'summary', 'content', 'published'])
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RSS1_NS = "http://purl.org/rss/1.0/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+
+# RSS 2.0 <item>, RSS 1.0 <rss:item>, Atom <entry>
+ENTRY_TAGS = ("item", f"{{{RSS1_NS}}}item", f"{{{ATOM_NS}}}entry")
+
+
+def _plain_text(value: Optional[str]) -> str:
+    """
+    Feed summaries are often escaped HTML; reduce them to text
+    """
+    if not value or not value.strip():
+        return ""
+    if "<" not in value:
+        # Дважды экранированные сущности ("&amp;amp;") приходят как "&amp;"
+        return html.unescape(value).strip()
+    try:
+        return lxml.html.fromstring(value).text_content().strip()
+    except (etree.ParserError, ValueError):
+        return value.strip()
+
+
+def _child_text(entry, *tags) -> str:
+    for tag in tags:
+        child = entry.find(tag)
+        if child is not None and child.text and child.text.strip():
+            return child.text.strip()
+    return ""
+
+
+def _entry_link(entry) -> str:
+    link = _child_text(entry, "link", f"{{{RSS1_NS}}}link")
+    if link:
+        return link
+    # Atom: <link rel="alternate" href="..."/>
+    for child in entry.iterfind(f"{{{ATOM_NS}}}link"):
+        if child.get("rel", "alternate") == "alternate" and child.get("href"):
+            return child.get("href")
+    return _child_text(entry, "guid")
+
+
+def parse_entry(entry) -> FeedEntry:
+    title = _plain_text(_child_text(entry, "title", f"{{{RSS1_NS}}}title", f"{{{ATOM_NS}}}title"))
+    summary = _plain_text(_child_text(entry, "description", f"{{{RSS1_NS}}}description", f"{{{ATOM_NS}}}summary"))
+    content = _plain_text(_child_text(entry, f"{{{CONTENT_NS}}}encoded", f"{{{ATOM_NS}}}content"))
+    published = _child_text(entry, "pubDate", f"{{{DC_NS}}}date", f"{{{ATOM_NS}}}published", f"{{{ATOM_NS}}}updated")
+    return FeedEntry(title, _entry_link(entry), summary, content, published)
+
+
+def iter_feed_entries(source) -> Iterator[FeedEntry]:
+    """
+    Streams entries of an RSS 2.0, RSS 1.0 or Atom feed.
+
+    source is a file path or a binary file-like object. Each entry is
+    parsed as soon as its closing tag arrives and then removed from the
+    tree, so memory stays flat however long the feed is.
+    """
+    context = etree.iterparse(source, events=("end",), tag=ENTRY_TAGS,
+                              resolve_entities=False, no_network=True, huge_tree=False)
+    for _, entry in context:
+        try:
+            yield parse_entry(entry)
+        finally:
+            entry.clear()
+            # Уже разобранные соседние элементы тоже освобождаем
+            parent = entry.getparent()
+            while parent is not None and entry.getprevious() is not None:
+                del parent[0]
+
+
+@contextmanager
+def open_feed(url: str, session: Optional[requests.Session] = None, timeout: float = 15):
+    """
+    Binary stream of a feed: http(s) URLs are streamed from the network,
+    anything else (a path or file:// URL) is opened from disk
+    """
+    if url.startswith(("http://", "https://")):
+        response = (session or requests).get(url, stream=True, timeout=timeout)
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield response.raw
+        finally:
+            response.close()
+    else:
+        path = url[len("file://"):] if url.startswith("file://") else url
+        with open(os.path.expanduser(path), "rb") as f:
+            yield f
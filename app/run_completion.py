@@ -0,0 +1,267 @@
+# app/run_completion.py
+import logging
+import threading
+import time
+from collections import namedtuple
+from typing import Iterator, Optional
+
+import openai
+
+from app.openai_admission import get_openai_admission
+
+logger = logging.getLogger('app.run_completion')
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled", "expired", "incomplete"}
+
+RunResult = namedtuple('RunResult', ['text', 'status', 'metrics'])
+
+
+class RunMetrics:
+    """
+    Timing of one Assistants run. ttft is the time to the first text delta
+    (streaming) or to the first poll that saw the finished run (polling).
+    """
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.started = time.monotonic()
+        self.ttft: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.polls = 0
+        self.requests = 0
+
+    def first_token(self):
+        if self.ttft is None:
+            self.ttft = time.monotonic() - self.started
+
+    def finish(self):
+        self.latency = time.monotonic() - self.started
+        if self.ttft is None:
+            self.ttft = self.latency
+
+    def __repr__(self):
+        ttft = f"{self.ttft:.2f}s" if self.ttft is not None else "-"
+        latency = f"{self.latency:.2f}s" if self.latency is not None else "-"
+        return f"{self.mode}: ttft {ttft}, latency {latency}, {self.polls} polls, {self.requests} requests"
+
+
+class RunStats:
+    """
+    Aggregated run metrics of the process, for log summaries
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = []
+
+    def record(self, metrics: RunMetrics):
+        with self._lock:
+            self.runs.append(metrics)
+
+    def summary(self) -> str:
+        with self._lock:
+            runs = list(self.runs)
+        if not runs:
+            return "no runs"
+        parts = []
+        for mode in sorted({m.mode for m in runs}):
+            group = [m for m in runs if m.mode == mode and m.latency is not None]
+            if not group:
+                continue
+            parts.append(
+                f"{mode}: {len(group)} runs, avg ttft {sum(m.ttft for m in group) / len(group):.2f}s, "
+                f"avg latency {sum(m.latency for m in group) / len(group):.2f}s, "
+                f"{sum(m.polls for m in group)} polls, {sum(m.requests for m in group)} requests"
+            )
+        return "; ".join(parts)
+
+
+_stats = RunStats()
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_run_stats() -> RunStats:
+    return _stats
+
+
+def get_openai_client(config) -> openai.OpenAI:
+    """
+    Shared client for the configured key and base URL. OPENAI_BASE_URL
+    points the app at a local fake of the API (see fake_openai.py). Every
+    response is reported to the admission control, which adapts rewrite
+    concurrency to the rate-limit headers and 429s.
+    """
+    key = (config.get('OPENAI_API_KEY'), config.get('OPENAI_BASE_URL') or None)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            def observe(response):
+                get_openai_admission(config).observe(response.status_code, response.headers)
+
+            http_client = openai.DefaultHttpxClient(event_hooks={"response": [observe]})
+            client = openai.OpenAI(api_key=key[0], base_url=key[1], http_client=http_client)
+            _clients[key] = client
+        return client
+
+
+def backoff_intervals(initial: float = 0.25, factor: float = 1.5, maximum: float = 2.0) -> Iterator[float]:
+    """
+    0.25, 0.375, 0.56, ... up to maximum: frequent polls while a short run
+    may already be done, fewer once it is clearly a long one
+    """
+    interval = initial
+    while True:
+        yield interval
+        interval = min(maximum, interval * factor)
+
+
+def _message_text(message) -> Optional[str]:
+    for part in getattr(message, "content", None) or []:
+        if getattr(part, "type", None) == "text" and part.text and part.text.value:
+            return part.text.value
+    return None
+
+
+def fetch_reply(client: openai.OpenAI, thread_id: str, metrics: Optional[RunMetrics] = None) -> Optional[str]:
+    """
+    Text of the newest assistant message of the thread
+    """
+    messages = client.beta.threads.messages.list(thread_id=thread_id, order="desc", limit=10)
+    if metrics is not None:
+        metrics.requests += 1
+    reply = next((m for m in messages.data if m.role == "assistant"), None)
+    return _message_text(reply) if reply is not None else None
+
+
+def poll_run(client: openai.OpenAI, thread_id: str, run_id: str, timeout: float = 120,
+             initial: float = 0.25, factor: float = 1.5, maximum: float = 2.0,
+             metrics: Optional[RunMetrics] = None) -> RunResult:
+    """
+    Waits for a run by polling with adaptive backoff, then reads the reply.
+    Status is 'timeout' if the run did not finish within timeout seconds.
+    """
+    metrics = metrics or RunMetrics("poll")
+    intervals = backoff_intervals(initial, factor, maximum)
+    deadline = time.monotonic() + timeout
+    status = "timeout"
+    while True:
+        run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
+        metrics.polls += 1
+        metrics.requests += 1
+        if run.status in TERMINAL_STATUSES:
+            status = run.status
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(next(intervals), remaining))
+
+    text = None
+    if status == "completed":
+        metrics.first_token()
+        text = fetch_reply(client, thread_id, metrics)
+    metrics.finish()
+    _stats.record(metrics)
+    return RunResult(text, status, metrics)
+
+
+def stream_run(client: openai.OpenAI, thread_id: str, assistant_id: str, timeout: float = 120,
+               metrics: Optional[RunMetrics] = None) -> RunResult:
+    """
+    Creates a run with stream=True and assembles the reply from the events,
+    so the text is available the moment the run completes and no status or
+    message-list requests are needed.
+
+    If the stream breaks, ends without a final run event or runs out of
+    time after the run was created, the run is polled for the rest of the
+    timeout instead; the mode of the metrics then becomes 'stream+poll'.
+    """
+    metrics = metrics or RunMetrics("stream")
+    deadline = metrics.started + timeout
+    run_id = None
+    parts = []
+    text = None
+    status = "timeout"
+    try:
+        stream = client.beta.threads.runs.create(thread_id=thread_id, assistant_id=assistant_id,
+                                                 stream=True, timeout=timeout)
+        metrics.requests += 1
+        with stream:
+            for event in stream:
+                name = event.event
+                if name == "thread.run.created":
+                    run_id = event.data.id
+                elif name == "thread.message.delta":
+                    for part in event.data.delta.content or []:
+                        if getattr(part, "type", None) == "text" and part.text and part.text.value:
+                            metrics.first_token()
+                            parts.append(part.text.value)
+                elif name == "thread.message.completed":
+                    text = _message_text(event.data) or text
+                elif name.startswith("thread.run.") and name.rsplit(".", 1)[1] in TERMINAL_STATUSES:
+                    status = name.rsplit(".", 1)[1]
+                    break
+                elif name == "error":
+                    raise RuntimeError(f"Stream error event: {event.data}")
+                if time.monotonic() > deadline:
+                    break
+    except Exception as e:
+        if run_id is None:
+            raise
+        logger.warning(f"Run stream of {run_id} broke ({e}), polling it instead")
+        metrics.mode = "stream+poll"
+        return poll_run(client, thread_id, run_id, timeout=max(0.0, deadline - time.monotonic()), metrics=metrics)
+
+    if status == "timeout" and run_id is not None:
+        logger.warning(f"Run stream of {run_id} ended without a final status, polling it instead")
+        metrics.mode = "stream+poll"
+        return poll_run(client, thread_id, run_id, timeout=max(0.0, deadline - time.monotonic()), metrics=metrics)
+
+    if status == "completed" and text is None:
+        text = "".join(parts) or None
+    metrics.finish()
+    _stats.record(metrics)
+    return RunResult(text, status, metrics)
+
+
+def active_run(client: openai.OpenAI, thread_id: str, metrics: Optional[RunMetrics] = None) -> Optional[str]:
+    """
+    Id of the thread's newest run if it has not finished yet, e.g. a run
+    the server created although the streaming request failed
+    """
+    runs = client.beta.threads.runs.list(thread_id=thread_id, order="desc", limit=1)
+    if metrics is not None:
+        metrics.requests += 1
+    run = next(iter(runs.data), None)
+    return run.id if run is not None and run.status not in TERMINAL_STATUSES else None
+
+
+def complete_run(client: openai.OpenAI, thread_id: str, assistant_id: str, mode: str = "stream",
+                 timeout: float = 120, poll_initial: float = 0.25, poll_max: float = 2.0) -> RunResult:
+    """
+    Runs the assistant on the thread and waits for its reply, streaming
+    events (mode 'stream') or polling with adaptive backoff (mode 'poll').
+    A stream that cannot be opened falls back to polling: the run the
+    server may have created anyway, otherwise a new one (a thread accepts
+    only one active run).
+    """
+    metrics = RunMetrics("poll")
+    run_id = None
+    if mode == "stream":
+        try:
+            return stream_run(client, thread_id, assistant_id, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Streaming run failed to start ({e}), falling back to polling")
+        try:
+            run_id = active_run(client, thread_id, metrics)
+        except Exception as e:
+            logger.warning(f"Could not list the runs of thread {thread_id}: {e}")
+        if run_id is not None:
+            logger.info(f"Polling run {run_id} started by the failed stream")
+    if run_id is None:
+        run = client.beta.threads.runs.create(thread_id=thread_id, assistant_id=assistant_id)
+        metrics.requests += 1
+        run_id = run.id
+    return poll_run(client, thread_id, run_id, timeout=timeout, initial=poll_initial,
+                    maximum=poll_max, metrics=metrics)
@@ -0,0 +1,101 @@
+# app/section_stats.py
+import logging
+import math
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from app.models import SectionRun, db
+
+logger = logging.getLogger('app.section_stats')
+
+SectionCost = namedtuple('SectionCost', ['section', 'runs', 'avg_seconds', 'p95_seconds', 'items',
+                                         'new_articles', 'seconds_per_article'])
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """
+    Nearest-rank percentile, q in [0, 100]
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def record_section_runs(runs: Iterable[Dict]) -> int:
+    """
+    Stores section visits (dicts with the SectionRun columns) and commits
+    """
+    rows = [SectionRun(**run) for run in runs]
+    if not rows:
+        return 0
+    try:
+        db.session.add_all(rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
+
+
+def recent_runs(section: str, limit: int) -> List[SectionRun]:
+    return (SectionRun.query.filter_by(section=section)
+            .order_by(SectionRun.started_at.desc()).limit(limit).all())
+
+
+def adaptive_timeouts(sections: Iterable[str], default: float, minimum: float = 10, maximum: Optional[float] = None,
+                      history: int = 20, factor: float = 1.5, min_samples: int = 3) -> Dict[str, float]:
+    """
+    Per-section readiness timeout: p95 of the recent readiness waits times
+    `factor`, clamped to [minimum, maximum]. Sections with fewer than
+    min_samples recorded waits keep the default.
+    """
+    maximum = maximum or default
+    timeouts = {}
+    for section in sections:
+        waits = [run.wait_seconds for run in recent_runs(section, history) if run.wait_seconds is not None]
+        p95 = percentile(waits, 95) if len(waits) >= min_samples else None
+        timeouts[section] = default if p95 is None else min(maximum, max(minimum, p95 * factor))
+    return timeouts
+
+
+def low_yield_sections(sections: Iterable[str], runs: int = 5) -> set:
+    """
+    Sections that produced no new articles in each of their last `runs` visits
+    """
+    low = set()
+    if runs <= 0:
+        return low
+    for section in sections:
+        recent = recent_runs(section, runs)
+        if len(recent) >= runs and not any(run.new_articles for run in recent):
+            low.add(section)
+    return low
+
+
+def section_costs(days: int = 30) -> List[SectionCost]:
+    """
+    Cost against yield per section over the last `days` days, most
+    expensive per new article first
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    by_section: Dict[str, List[SectionRun]] = {}
+    for run in SectionRun.query.filter(SectionRun.started_at >= since):
+        by_section.setdefault(run.section, []).append(run)
+
+    costs = []
+    for section, runs in by_section.items():
+        seconds = [run.seconds for run in runs]
+        new_articles = sum(run.new_articles or 0 for run in runs)
+        costs.append(SectionCost(
+            section=section,
+            runs=len(runs),
+            avg_seconds=sum(seconds) / len(seconds),
+            p95_seconds=percentile(seconds, 95),
+            items=sum(run.items or 0 for run in runs),
+            new_articles=new_articles,
+            seconds_per_article=sum(seconds) / new_articles if new_articles else None,
+        ))
+    return sorted(costs, key=lambda c: (c.seconds_per_article is not None, -(c.seconds_per_article or 0)))
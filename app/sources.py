@@ -0,0 +1,192 @@
+# app/sources.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from app.http_client import get_http_session
+from app.ingest import filter_new_candidates, insert_articles
+from app.rss_reader import iter_feed_entries, open_feed
+
+logger = logging.getLogger('app.sources')
+
+_REGISTRY: Dict[str, type] = {}
+
+
+def register_source(name: str):
+    """
+    Class decorator adding a source adapter to the registry under `name`
+    """
+    def decorator(cls):
+        cls.name = name
+        _REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def available_sources() -> List[str]:
+    return list(_REGISTRY)
+
+
+class Source:
+    """
+    Base class of ingestion sources.
+
+    fetch() stores new articles and returns how many were added.
+    Sources with needs_browser = False never touch the Chrome pool.
+    interval_minutes = None means the source runs in the daily scrape job.
+    """
+    name = ""
+    needs_browser = False
+
+    def __init__(self, config, concurrency: int = 1, interval_minutes: Optional[float] = None):
+        self.config = config
+        self.concurrency = concurrency
+        self.interval_minutes = interval_minutes
+
+    @classmethod
+    def from_config(cls, config, interval_minutes: Optional[float] = None) -> Optional['Source']:
+        """
+        Builds the source, or returns None if it is not configured
+        """
+        return cls(config, interval_minutes=interval_minutes)
+
+    def fetch(self) -> int:
+        raise NotImplementedError
+
+
+@register_source("levitin_api")
+class LevitinApiSource(Source):
+    @classmethod
+    def from_config(cls, config, interval_minutes=None):
+        return cls(config, concurrency=config.get('API_PROBE_PER_HOST', 4), interval_minutes=interval_minutes)
+
+    def fetch(self) -> int:
+        from app.levitin_scraper import process_api_items, try_api_approach
+        return process_api_items(try_api_approach())
+
+
+@register_source("levitin_selenium")
+class LevitinSeleniumSource(Source):
+    needs_browser = True
+
+    @classmethod
+    def from_config(cls, config, interval_minutes=None):
+        return cls(config, concurrency=config.get('SCRAPE_POOL_SIZE', 3), interval_minutes=interval_minutes)
+
+    def fetch(self) -> int:
+        # Selenium загружается только для источников, которым нужен браузер
+        from app.levitin_scraper import fetch_levitin_updates
+        return fetch_levitin_updates()
+
+
+@register_source("rss")
+class RssSource(Source):
+    """
+    RSS/Atom feeds from RSS_FEED_URL (comma-separated URLs or local paths),
+    read as streams without a browser
+    """
+
+    def __init__(self, config, feed_urls: List[str], concurrency: int = 4, interval_minutes=None):
+        super().__init__(config, concurrency=concurrency, interval_minutes=interval_minutes)
+        self.feed_urls = feed_urls
+
+    @classmethod
+    def from_config(cls, config, interval_minutes=None):
+        feed_urls = [u.strip() for u in (config.get('RSS_FEED_URL') or "").split(",") if u.strip()]
+        if not feed_urls:
+            return None
+        return cls(config, feed_urls, concurrency=config.get('RSS_CONCURRENCY', 4),
+                   interval_minutes=interval_minutes)
+
+    def read_feed(self, url: str) -> List[Dict]:
+        """
+        Candidates from one feed; entries are parsed one at a time
+        """
+        candidates = []
+        try:
+            with open_feed(url, session=get_http_session(), timeout=self.config.get('RSS_TIMEOUT', 15)) as stream:
+                for entry in iter_feed_entries(stream):
+                    if len(entry.title) < 5:
+                        continue
+                    parts = [part for part in (entry.title, entry.summary, entry.content) if part]
+                    candidates.append({
+                        "title": entry.title,
+                        "url": entry.url,
+                        "summary": entry.summary,
+                        "original_text": "\n\n".join(parts),
+                    })
+        except Exception as e:
+            logger.error(f"[rss] Error reading feed {url}: {e}")
+        logger.info(f"[rss] {len(candidates)} entries in {url}")
+        return candidates
+
+    def fetch(self) -> int:
+        # Ленты читаются параллельно, запись в БД идёт в текущем потоке
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(self.feed_urls)))) as executor:
+            feeds = list(executor.map(self.read_feed, self.feed_urls))
+
+        added = 0
+        for url, candidates in zip(self.feed_urls, feeds):
+            new_articles = filter_new_candidates(candidates, log_prefix="[rss]")
+            if not new_articles:
+                continue
+            source_name = urlsplit(url).netloc or "rss"
+            try:
+                added += insert_articles(new_articles, source_name=source_name)
+            except Exception as e:
+                logger.error(f"[rss] Error committing entries from {url}: {e}")
+        return added
+
+
+def _parse_intervals(value: str) -> Dict[str, float]:
+    """
+    "rss=30,levitin_api=720" -> {"rss": 30.0, "levitin_api": 720.0}
+    """
+    intervals = {}
+    for part in (value or "").split(","):
+        if "=" in part:
+            name, minutes = part.split("=", 1)
+            try:
+                intervals[name.strip()] = float(minutes)
+            except ValueError:
+                logger.warning(f"Ignoring invalid source interval: {part}")
+    return intervals
+
+
+def build_sources(config, names: Optional[List[str]] = None) -> List[Source]:
+    """
+    Instantiates the sources listed in INGEST_SOURCES (or `names`), in order.
+    Unknown and unconfigured sources are skipped with a log message.
+    """
+    if names is None:
+        names = [n.strip() for n in config.get('INGEST_SOURCES', "levitin_api,levitin_selenium,rss").split(",")]
+    intervals = _parse_intervals(config.get('SOURCE_INTERVALS', ""))
+    sources = []
+    for name in filter(None, names):
+        cls = _REGISTRY.get(name)
+        if cls is None:
+            logger.warning(f"Unknown source '{name}', available: {', '.join(available_sources())}")
+            continue
+        source = cls.from_config(config, interval_minutes=intervals.get(name))
+        if source is None:
+            logger.info(f"Source '{name}' is not configured, skipping")
+            continue
+        sources.append(source)
+    return sources
+
+
+def run_sources(sources: List[Source]) -> Dict[str, int]:
+    """
+    Runs sources one after another; a failing source does not stop the rest.
+    Returns the number of added articles per source.
+    """
+    results = {}
+    for source in sources:
+        try:
+            results[source.name] = source.fetch() or 0
+        except Exception as e:
+            logger.error(f"Source '{source.name}' failed: {e}", exc_info=True)
+            results[source.name] = 0
+        logger.info(f"Source '{source.name}': {results[source.name]} new articles")
+    return results
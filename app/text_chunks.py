@@ -0,0 +1,217 @@
+# app/text_chunks.py
+import logging
+import math
+import re
+from typing import List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken необязателен, без него токены оцениваются по символам
+    tiktoken = None
+
+logger = logging.getLogger('app.text_chunks')
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+_encodings = {}
+
+
+def _encoding(model: Optional[str]):
+    if tiktoken is None:
+        return None
+    key = model or ""
+    if key not in _encodings:
+        try:
+            _encodings[key] = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("o200k_base")
+        except (KeyError, ValueError):
+            _encodings[key] = tiktoken.get_encoding("o200k_base")
+    return _encodings[key]
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Token count of text: exact with tiktoken, otherwise a conservative
+    estimate (4 characters per token for ASCII, 2 for other scripts)
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 2)
+
+
+def paragraphs(text: str) -> List[str]:
+    return [p.strip() for p in re.split(r"\n\s*\n", text or "") if p.strip()]
+
+
+def sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_END.split(text.strip()) if s]
+
+
+def _truncate(text: str, budget: int, model: Optional[str]) -> str:
+    """
+    Longest sentence prefix of text within budget tokens (a character cut if
+    even the first sentence does not fit)
+    """
+    kept, used = [], 0
+    for sentence in sentences(text):
+        cost = estimate_tokens(sentence, model) + 1
+        if used + cost > budget:
+            break
+        kept.append(sentence)
+        used += cost
+    if kept:
+        return " ".join(kept)
+    # Одно огромное предложение: режем по доле символов
+    return text[:max(1, len(text) * budget // max(1, estimate_tokens(text, model)))]
+
+
+def fit_budget(text: str, max_tokens: int, strategy: str = "summarize", lead: int = 2,
+               model: Optional[str] = None) -> str:
+    """
+    Shortens text to about max_tokens before it is chunked.
+
+    The first `lead` paragraphs (title and summary of a scraped article)
+    are always kept. "truncate" then keeps whole paragraphs until the
+    budget is used up; "summarize" first reduces later paragraphs to their
+    first sentence, starting from the last one and only as many as needed,
+    so all sections stay represented, and truncates only if that is still
+    too long.
+    """
+    if max_tokens <= 0 or estimate_tokens(text, model) <= max_tokens:
+        return text
+    parts = paragraphs(text)
+    head, body = parts[:lead], parts[lead:]
+    if strategy == "summarize":
+        costs = [estimate_tokens(part, model) for part in body]
+        # + один токен на разделитель абзацев
+        excess = estimate_tokens("\n\n".join(head), model) + sum(costs) + len(body) - max_tokens
+        for index in reversed(range(len(body))):
+            if excess <= 0:
+                break
+            first = (sentences(body[index]) or [body[index]])[0]
+            excess -= costs[index] - estimate_tokens(first, model)
+            body[index] = first
+
+    kept = []
+    used = estimate_tokens("\n\n".join(head), model)
+    for part in body:
+        cost = estimate_tokens(part, model)
+        if used + cost > max_tokens:
+            break
+        kept.append(part)
+        used += cost
+    result = "\n\n".join(head + kept)
+    if estimate_tokens(result, model) > max_tokens:
+        result = _truncate(result, max_tokens, model)
+    logger.info(f"Text of ~{estimate_tokens(text, model)} tokens reduced to ~{estimate_tokens(result, model)} "
+                f"({strategy}, budget {max_tokens})")
+    return result
+
+
+def _bounded(parts: List[str], limit: int, model: Optional[str]) -> List[str]:
+    """
+    Sentences with any sentence longer than limit tokens split between words
+    """
+    bounded = []
+    for part in parts:
+        if estimate_tokens(part, model) <= limit:
+            bounded.append(part)
+            continue
+        words, used = [], 0
+        for word in part.split():
+            cost = estimate_tokens(word, model) + 1
+            if words and used + cost > limit:
+                bounded.append(" ".join(words))
+                words, used = [], 0
+            words.append(word)
+            used += cost
+        if words:
+            bounded.append(" ".join(words))
+    return bounded
+
+
+def split_chunks(text: str, chunk_tokens: int, model: Optional[str] = None,
+                 max_chunks: Optional[int] = None) -> List[str]:
+    """
+    Splits text into chunks of at most about chunk_tokens tokens along
+    paragraph boundaries; an oversized paragraph is split between sentences
+    (and an oversized sentence between words). Chunks are balanced to the
+    same size, since the slowest chunk decides the latency of the rewrite.
+    With max_chunks there are no more chunks than that, each of them then
+    larger than chunk_tokens if need be.
+    """
+    if chunk_tokens <= 0 or estimate_tokens(text, model) <= chunk_tokens:
+        return [text]
+    pieces = []
+    for paragraph in paragraphs(text):
+        if estimate_tokens(paragraph, model) <= chunk_tokens:
+            pieces.append(paragraph)
+            continue
+        current, used = [], 0
+        for sentence in _bounded(sentences(paragraph), chunk_tokens, model):
+            cost = estimate_tokens(sentence, model) + 1
+            if current and used + cost > chunk_tokens:
+                pieces.append(" ".join(current))
+                current, used = [], 0
+            current.append(sentence)
+            used += cost
+        if current:
+            pieces.append(" ".join(current))
+
+    costs = [estimate_tokens(piece, model) for piece in pieces]
+    count = math.ceil(sum(costs) / chunk_tokens)
+    if max_chunks:
+        count = min(count, max_chunks)
+    while True:
+        target = sum(costs) / count
+        chunks, sizes = [[] for _ in range(count)], [0] * count
+        position = 0
+        for piece, cost in zip(pieces, costs):
+            # Абзац попадает в ту часть, на которую приходится его середина
+            index = min(count - 1, int((position + cost / 2) // target))
+            chunks[index].append(piece)
+            sizes[index] += cost
+            position += cost
+        if max(sizes) <= chunk_tokens or count >= len(pieces) or count == max_chunks:
+            return ["\n\n".join(chunk) for chunk in chunks if chunk]
+        count += 1
+
+
+def chunk_prompt(chunk: str, index: int, total: int, title: str) -> str:
+    """
+    User message for one chunk: the position in the article tells the
+    model which parts may have a headline or an ending
+    """
+    if index == 0:
+        role = "Rewrite this opening part, with the headline. Do not write a conclusion or hashtags."
+    elif index == total - 1:
+        role = "Rewrite this final part as a continuation, without a headline, and end the article."
+    else:
+        role = "Rewrite this middle part as a continuation, without a headline, conclusion or hashtags."
+    return f'[Part {index + 1} of {total} of the article "{title}". {role}]\n\n{chunk}'
+
+
+def _first_line(text: str) -> str:
+    return text.strip().split("\n", 1)[0].strip().strip("*#_ ").casefold()
+
+
+def stitch(parts: List[str]) -> str:
+    """
+    Joins rewritten chunks: a later chunk repeating the headline of the
+    first loses that line, hashtag lines are kept only at the very end
+    """
+    headline = _first_line(parts[0]) if parts else ""
+    cleaned = []
+    for index, part in enumerate(parts):
+        lines = part.strip().split("\n")
+        if index and lines and _first_line(lines[0]) == headline:
+            lines = lines[1:]
+        if index < len(parts) - 1:
+            # "#отдых #крит" - хэштеги, "# Заголовок" - нет
+            while lines and (not lines[-1].strip() or (lines[-1].lstrip().startswith("#")
+                                                       and not lines[-1].lstrip().startswith("# "))):
+                lines.pop()
+        cleaned.append("\n".join(lines).strip())
+    return "\n\n".join(part for part in cleaned if part)
@@ -0,0 +1,699 @@
+#!/usr/bin/env python
+# benchmark.py - Offline benchmarks for the scraper and processing pipeline
+
+import os
+import sys
+import glob
+import math
+import time
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+BASE_URL = "https://www.levitin.de"
+DEFAULT_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levitin_page.html")
+DEBUG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug")
+ARTIFACTS_DIR = os.path.join(DEBUG_DIR, "artifacts")
+# Отрендеренные страницы туров и новостей; рядом в <имя>.txt - их основной текст
+DETAIL_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures", "pages")
+
+
+def snapshot_pages(directory):
+    """
+    (name, html) pairs of the HTML snapshots in an artifact store directory
+    or in one of its run directories
+    """
+    from app.artifacts import ArtifactStore, MANIFEST
+
+    directory = directory.rstrip(os.sep)
+    if os.path.isfile(os.path.join(directory, MANIFEST)):
+        store, run_id = ArtifactStore(os.path.dirname(directory)), os.path.basename(directory)
+    else:
+        store, run_id = ArtifactStore(directory), None
+    pages = []
+    for entry, content in store.iter_snapshots(run_id):
+        if entry["kind"] in ("section", "detail", "page") and isinstance(content, str):
+            pages.append((f"{entry['run_id']}:{entry['kind']}:{entry['url']}", content))
+    return pages
+
+
+def load_corpus(paths):
+    """
+    HTML fixtures to benchmark as (name, html): explicit files and
+    directories (*.html files and artifact-store snapshots), or the shipped
+    page, the detail-page fixtures and every saved page in debug/ and
+    debug/artifacts/
+    """
+    if not paths:
+        paths = [DEFAULT_PAGE, DETAIL_PAGES_DIR, DEBUG_DIR, ARTIFACTS_DIR]
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            for file_path in sorted(glob.glob(os.path.join(path, "*.html"))):
+                with open(file_path, encoding="utf-8") as f:
+                    pages.append((os.path.basename(file_path), f.read()))
+            if path != DEBUG_DIR:
+                pages.extend(snapshot_pages(path))
+        elif os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def timed(func, repeat):
+    """
+    Runs func `repeat` times and returns (best seconds per call, last result)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_extract(args):
+    """
+    extract_article_data (BeautifulSoup) vs the single-pass lxml extractor
+    """
+    from bs4 import BeautifulSoup
+    from app.levitin_scraper import extract_article_data, SECTIONS
+    from app.fast_extractor import parse_html, select_items, extract_article_data_fast
+
+    with open(args.page, encoding="utf-8") as f:
+        html = f.read()
+
+    selectors = [s["selector"] for s in SECTIONS]
+
+    def reference():
+        soup = BeautifulSoup(html, "html.parser")
+        return [[d for d in (extract_article_data(i, BASE_URL) for i in soup.select(sel)) if d] for sel in selectors]
+
+    def fast():
+        tree = parse_html(html)
+        return [[d for d in (extract_article_data_fast(i, BASE_URL) for i in select_items(tree, sel)) if d] for sel in selectors]
+
+    soup = BeautifulSoup(html, "html.parser")
+    tree = parse_html(html)
+
+    def reference_extract_only():
+        return [[extract_article_data(i, BASE_URL) for i in soup.select(sel)] for sel in selectors]
+
+    def fast_extract_only():
+        return [[extract_article_data_fast(i, BASE_URL) for i in select_items(tree, sel)] for sel in selectors]
+
+    ref_time, ref_result = timed(reference, args.repeat)
+    fast_time, fast_result = timed(fast, args.repeat)
+    ref_only, _ = timed(reference_extract_only, args.repeat)
+    fast_only, _ = timed(fast_extract_only, args.repeat)
+
+    records = sum(len(r) for r in ref_result)
+    print(f"Page: {args.page} ({len(html) // 1024} KB), {len(selectors)} section selectors, {records} records")
+    print(f"Identical output: {ref_result == fast_result}")
+    print(f"{'stage':<28}{'bs4 ms':>10}{'lxml ms':>10}{'speedup':>10}")
+    print(f"{'parse + select + extract':<28}{ref_time * 1000:>10.1f}{fast_time * 1000:>10.1f}{ref_time / fast_time:>9.1f}x")
+    print(f"{'select + extract':<28}{ref_only * 1000:>10.1f}{fast_only * 1000:>10.1f}{ref_only / fast_only:>9.1f}x")
+    return ref_result == fast_result
+
+
+def reference_paragraphs(name):
+    """
+    Expected main-text paragraphs of a detail-page fixture, None without a
+    reference file
+    """
+    path = os.path.join(DETAIL_PAGES_DIR, os.path.splitext(name)[0] + ".txt")
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return set(p.strip() for p in f.read().split("\n\n") if p.strip())
+
+
+def bench_content(args):
+    """
+    Detail-page content: CONTENT_SELECTORS cascade vs single-pass block
+    scoring. Fixtures with a reference text also report recall (share of
+    the expected paragraphs found) and precision (share of the returned
+    paragraphs that are expected) of both methods.
+    """
+    from app.levitin_scraper import select_detail_content
+    from app.content_extractor import extract_main_content
+
+    pages = load_corpus(args.pages)
+    if not pages:
+        print("No HTML fixtures found")
+        return False
+
+    def quality(paras, reference):
+        if reference is None:
+            return "-"
+        recall = len(paras & reference) / len(reference)
+        precision = len(paras & reference) / len(paras) if paras else 0.0
+        return f"{recall:.0%}/{precision:.0%}"
+
+    print(f"{'fixture':<32}{'cascade ms':>11}{'scored ms':>11}{'speedup':>9}"
+          f"{'cascade chars/p':>17}{'scored chars/p':>16}{'overlap':>9}{'cascade r/p':>13}{'scored r/p':>12}")
+    total_cascade = total_scored = 0.0
+    detail = []
+    for name, html in pages:
+        cascade_time, cascade = timed(lambda: select_detail_content(html), args.repeat)
+        scored_time, scored = timed(lambda: extract_main_content(html), args.repeat)
+        total_cascade += cascade_time
+        total_scored += scored_time
+
+        # Качество: насколько совпадают абзацы двух методов
+        cascade_paras = set(p for p in cascade.split("\n\n") if p)
+        scored_paras = set(p for p in scored.split("\n\n") if p)
+        union = cascade_paras | scored_paras
+        overlap = len(cascade_paras & scored_paras) / len(union) if union else 1.0
+        reference = reference_paragraphs(name)
+        if reference is not None:
+            detail.append((len(cascade), len(scored), overlap,
+                           len(cascade_paras & reference), len(scored_paras & reference), len(reference)))
+
+        print(f"{name[-31:]:<32}{cascade_time * 1000:>11.1f}{scored_time * 1000:>11.1f}"
+              f"{cascade_time / scored_time:>8.1f}x"
+              f"{f'{len(cascade)}/{len(cascade_paras)}':>17}{f'{len(scored)}/{len(scored_paras)}':>16}{overlap:>8.0%}"
+              f"{quality(cascade_paras, reference):>13}{quality(scored_paras, reference):>12}")
+
+    print(f"Total: cascade {total_cascade * 1000:.1f} ms, scored {total_scored * 1000:.1f} ms "
+          f"({total_cascade / total_scored:.1f}x)")
+    if detail:
+        expected = sum(d[5] for d in detail)
+        print(f"Detail pages ({len(detail)}): cascade {sum(d[0] for d in detail)} chars, "
+              f"scored {sum(d[1] for d in detail)} chars, avg overlap {sum(d[2] for d in detail) / len(detail):.0%}, "
+              f"expected paragraphs found: cascade {sum(d[3] for d in detail)}/{expected}, "
+              f"scored {sum(d[4] for d in detail)}/{expected}")
+    return True
+
+
+def measure(func, repeat, memory=True):
+    """
+    (best seconds per call, peak traced memory in MB, last result); memory
+    is traced in one extra run so it does not distort the timings
+    """
+    import tracemalloc
+
+    seconds, result = timed(func, repeat)
+    if not memory:
+        return seconds, None, result
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak / 1024 / 1024, result
+
+
+def scale_html(html, selector, target):
+    """
+    Copies the items matched by selector until the page holds at least
+    `target` of them; links of the copies get a ?copy=N suffix
+    """
+    import copy
+    import lxml.html
+    from app.fast_extractor import parse_html, select_items
+
+    tree = parse_html(html)
+    items = select_items(tree, selector)
+    if not items or len(items) >= target:
+        return html
+    for n in range(target - len(items)):
+        clone = copy.deepcopy(items[n % len(items)])
+        for link in clone.iter("a"):
+            link.set("href", f"{link.get('href', '')}?copy={n}")
+        items[-1].addnext(clone)
+    return lxml.html.tostring(tree, encoding="unicode")
+
+
+def scale_records(records, target, seed=42):
+    """
+    Synthetic candidates built from real records: unique URLs and titles,
+    original_text mixed from the corpus vocabulary so SimHashes differ
+    """
+    import random
+
+    rng = random.Random(seed)
+    vocabulary = sorted({w for r in records for w in f"{r['title']} {r.get('summary', '')}".split() if len(w) > 3})
+    vocabulary = vocabulary or ["reise", "tour", "stadt", "museum", "natur"]
+    scaled = []
+    for n in range(target):
+        record = records[n % len(records)]
+        title = f"{record['title']} #{n}"
+        text = " ".join(rng.choice(vocabulary) for _ in range(60))
+        scaled.append({"title": title, "url": f"{record.get('url') or BASE_URL}?copy={n}",
+                       "summary": record.get("summary", ""), "original_text": f"{title}\n\n{text}"})
+    return scaled
+
+
+def bench_suite(args):
+    """
+    Per-stage throughput and peak memory over the snapshot corpus scaled to
+    at least --scale items: section extraction, detail content extraction
+    and deduplication against a temporary SQLite database
+    """
+    import logging
+    import tempfile
+
+    logging.disable(logging.INFO)
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from bs4 import BeautifulSoup
+    from app.levitin_scraper import SECTIONS, extract_article_data, select_detail_content
+    from app.fast_extractor import parse_html, select_items, extract_article_data_fast
+    from app.content_extractor import extract_main_content
+
+    pages = load_corpus(args.pages)
+    if not pages:
+        print("No HTML fixtures found")
+        return False
+
+    # Каждая страница умножается, пока все разделы вместе не дадут >= scale элементов
+    selector = ", ".join(s["selector"] for s in SECTIONS)
+    counts = [len(select_items(parse_html(html), selector)) for _, html in pages]
+    total = sum(counts) or 1
+    scaled_pages = [scale_html(html, selector, max(count, args.scale * count // total + 1))
+                    for (_, html), count in zip(pages, counts)]
+    soups = [BeautifulSoup(html, "html.parser") for html in scaled_pages]
+    trees = [parse_html(html) for html in scaled_pages]
+    items = sum(len(select_items(tree, selector)) for tree in trees)
+
+    results = []
+
+    def stage(name, count, func, repeat=args.repeat):
+        seconds, peak_mb, result = measure(func, repeat, memory=not args.no_memory)
+        results.append((name, count, seconds, peak_mb))
+        return result
+
+    stage("extract bs4", items, lambda: [extract_article_data(i, BASE_URL) for soup in soups for i in soup.select(selector)])
+    records = stage("extract lxml", items, lambda: [d for tree in trees for d in
+                                                     (extract_article_data_fast(i, BASE_URL) for i in select_items(tree, selector)) if d])
+    stage("content cascade", len(pages), lambda: [select_detail_content(html) for _, html in pages])
+    stage("content scored", len(pages), lambda: [extract_main_content(html) for _, html in pages])
+
+    from app.init import create_app, db
+    from app.ingest import filter_near_duplicates, filter_new_candidates, insert_articles
+
+    candidates = scale_records(records or [{"title": "Synthetic tour", "url": BASE_URL}], max(args.scale, items))
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        # Половина кандидатов уже в базе, как при повторном обходе
+        insert_articles(candidates[::2])
+        stage("dedup exact", len(candidates), lambda: filter_new_candidates(candidates))
+        stage("dedup near (simhash)", len(candidates), lambda: filter_near_duplicates(candidates))
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(db_path)
+
+    print(f"Corpus: {len(pages)} pages, {items} section items after scaling, {len(candidates)} dedup candidates")
+    print(f"{'stage':<24}{'items':>9}{'ms':>11}{'ops/sec':>12}{'peak MB':>10}")
+    for name, count, seconds, peak_mb in results:
+        memory = f"{peak_mb:.1f}" if peak_mb is not None else "-"
+        print(f"{name:<24}{count:>9}{seconds * 1000:>11.1f}{count / seconds:>12.0f}{memory:>10}")
+    return True
+
+
+def bench_replay(args):
+    """
+    Runs the whole Selenium scrape against saved snapshots and a temporary
+    SQLite database
+    """
+    import tempfile
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ.update({"DATABASE_URL": f"sqlite:///{db_path}", "SCRAPE_REPLAY_DIR": args.snapshots,
+                       "SCRAPE_REPLAY_DEFAULT_PAGE": args.default_page or "", "ARTIFACTS_ENABLED": "false"})
+
+    from app.init import create_app, db
+    from app.levitin_scraper import fetch_levitin_updates
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seconds, added = timed(fetch_levitin_updates, 1)
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(db_path)
+    print(f"Replay of {args.snapshots}: {added} articles added in {seconds:.2f}s")
+    return True
+
+
+def bench_waits(args):
+    """
+    Fixed sleeps (the scraper's former 10s per section and 3s per detail
+    page) vs. wait_for_page_ready over replayed pages that finish rendering
+    after a random, log-normally distributed time. Times are scaled by
+    --time-scale while running and reported unscaled.
+    """
+    import random
+    from app.levitin_scraper import SECTIONS
+    from app.page_readiness import READINESS_SCRIPT, wait_for_page_ready
+    from app.replay import ReplayDriver, ReplayPool
+
+    scale = args.time_scale
+    pool = ReplayPool.from_path(args.snapshots, default_page=args.default_page)
+
+    class RenderingDriver(ReplayDriver):
+        """
+        Replay driver whose page reports pending $http requests and no
+        matches until its render time has passed
+        """
+
+        def __init__(self, render):
+            super().__init__(pool.pages, pool.default)
+            self.render = render
+            self.loaded_at = 0.0
+
+        def get(self, url):
+            super().get(url)
+            self.loaded_at = time.monotonic()
+
+        def rendered(self):
+            return time.monotonic() - self.loaded_at >= self.render
+
+        def execute_script(self, script, *args):
+            if script == READINESS_SCRIPT and not self.rendered():
+                return {"readyState": "interactive", "pending": 1, "quietMs": 0, "matched": 0}
+            state = super().execute_script(script, *args)
+            if script == READINESS_SCRIPT:
+                state["quietMs"] = (time.monotonic() - self.loaded_at - self.render) / scale * 1000
+            return state
+
+    rng = random.Random(args.seed)
+    pages = [(f"{BASE_URL}{s['url']}", s["selector"], args.section_render, 10.0) for s in SECTIONS]
+    pages += [(f"{BASE_URL}/news/{i}", None, args.detail_render, 3.0) for i in range(args.details)]
+    jobs = [(url, selector, min(45.0, rng.lognormvariate(math.log(median), 0.6)), fixed)
+            for url, selector, median, fixed in pages]
+
+    print(f"{len(SECTIONS)} sections (median render {args.section_render}s), {args.details} detail pages "
+          f"(median {args.detail_render}s), time scale {scale}")
+    print(f"{'strategy':<12}{'pages':>6}{'total s':>9}{'avg s':>8}{'p95 s':>8}{'not ready':>11}")
+    for strategy in ("fixed", "readiness"):
+        waits, not_ready = [], 0
+        for url, selector, render, fixed in jobs:
+            driver = RenderingDriver(render * scale)
+            driver.get(url)
+            start = time.monotonic()
+            if strategy == "fixed":
+                time.sleep(fixed * scale)
+            else:
+                wait_for_page_ready(driver, selector, timeout=45 * scale, quiet_ms=int(500 * scale) or 1,
+                                    poll_interval=0.1 * scale)
+            waits.append((time.monotonic() - start) / scale)
+            not_ready += not driver.rendered()
+        waits.sort()
+        print(f"{strategy:<12}{len(waits):>6}{sum(waits):>9.1f}{sum(waits) / len(waits):>8.2f}"
+              f"{waits[int(0.95 * (len(waits) - 1))]:>8.2f}{not_ready:>11}")
+    return True
+
+
+def bench_rewrite(args):
+    """
+    Latency and API requests per rewrite of each rewriter backend, against
+    the local fake_openai.py server (default) or the configured API (--live).
+    With --paragraphs the sample is a long article, and --chunk-tokens
+    compares rewriting it whole (0) with chunked rewriting.
+    """
+    import statistics
+
+    sentence = ("Der Sommerflugplan bringt neue Direktverbindungen nach Kreta, Rhodos und Mallorca. "
+                "Reisende sollten frueh buchen, da die Nachfrage in den Ferien stark steigt. ")
+    if args.paragraphs:
+        sample = "\n\n".join(["Neue Flugverbindungen im Sommer", sentence]
+                              + [f"Abschnitt {i + 1}. " + sentence * 4 for i in range(args.paragraphs)])
+    else:
+        sample = sentence * 3
+    fake = None
+    if not args.live:
+        from fake_openai import start_fake_openai
+        server, fake, base_url = start_fake_openai(latency=args.latency, ttft=min(args.ttft, args.latency),
+                                                   rtt=args.rtt, per_kchar=args.per_kchar)
+        os.environ.update({"OPENAI_BASE_URL": base_url, "OPENAI_API_KEY": "fake",
+                           "OPENAI_ASSISTANT_ID": os.getenv("OPENAI_ASSISTANT_ID") or "asst_fake"})
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ["REWRITE_CACHE_ENABLED"] = "false"
+
+    from app.init import create_app
+    from app.rewrite_cache import is_cacheable
+    from app.rewriter import RewriteError, get_rewriter_backend, rewrite_text
+    from app.text_chunks import estimate_tokens
+
+    app = create_app()
+    print(f"Sample: {len(sample)} characters, ~{estimate_tokens(sample)} tokens")
+    print(f"{'backend':<12}{'chunk tok':>10}{'rewrites':>9}{'avg s':>8}{'p95 s':>8}{'requests':>10}{'errors':>8}")
+    with app.app_context():
+        for name in args.backends.split(","):
+            name = name.strip()
+            before = sum(fake.requests.values()) if fake else 0
+            try:
+                backend = get_rewriter_backend(app.config, name)
+            except RewriteError as e:
+                print(f"{name:<12} {e}")
+                continue
+            setup = (sum(fake.requests.values()) - before) if fake else 0
+            for chunk_tokens in [int(c) for c in args.chunk_tokens.split(",")]:
+                app.config['REWRITE_CHUNK_TOKENS'] = chunk_tokens
+                requests = backend.requests
+                durations, errors = [], 0
+                for _ in range(args.count):
+                    start = time.perf_counter()
+                    if not is_cacheable(rewrite_text(sample, backend=name, use_cache=False)):
+                        errors += 1
+                    durations.append(time.perf_counter() - start)
+                p95 = sorted(durations)[max(0, -(-len(durations) * 95 // 100) - 1)]
+                print(f"{name:<12}{chunk_tokens or 'whole':>10}{args.count:>9}{statistics.mean(durations):>8.2f}"
+                      f"{p95:>8.2f}{(backend.requests - requests) / args.count:>10.1f}{errors:>8}"
+                      + (f"   (+{setup} setup request)" if setup else ""))
+                setup = 0
+    if fake:
+        print(f"Fake API requests: {', '.join(f'{k} {v}' for k, v in sorted(fake.requests.items()))}")
+        server.shutdown()
+    return True
+
+
+def bench_rewrite_batch(args):
+    """
+    Batch rewrite throughput for each concurrency level against the local
+    fake_openai.py server, optionally rate limited (--rpm)
+    """
+    import tempfile
+    from datetime import datetime, timedelta
+    from fake_openai import start_fake_openai
+
+    server, fake, base_url = start_fake_openai(latency=args.latency, ttft=min(0.3, args.latency), rtt=args.rtt,
+                                               rpm=args.rpm, window=args.window)
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ.update({"DATABASE_URL": f"sqlite:///{db_path}", "OPENAI_BASE_URL": base_url, "OPENAI_API_KEY": "fake",
+                       "OPENAI_ASSISTANT_ID": "asst_fake", "REWRITE_CACHE_ENABLED": "false"})
+
+    import app.openai_admission as openai_admission
+    from app.init import create_app, db
+    from app.models import Article
+    from app.rewrite_batch import rewrite_pending
+
+    app = create_app()
+    print(f"{'concurrency':<12}{'articles':>9}{'seconds':>9}{'per min':>9}{'failed':>8}{'429s':>6}")
+    with app.app_context():
+        db.create_all()
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            Article.query.delete()
+            now = datetime.utcnow()
+            db.session.add_all(Article(original_text=f"Artikel {i}: Neue Flugverbindungen und Hotels fuer den Sommer.",
+                                       created_at=now + timedelta(seconds=i)) for i in range(args.count))
+            db.session.commit()
+            openai_admission._admission = openai_admission.OpenAIAdmission(max_concurrency=concurrency)
+            throttled = fake.requests.get("429", 0)
+            result = rewrite_pending(args.count, concurrency)
+            print(f"{concurrency:<12}{result.rewritten:>9}{result.seconds:>9.2f}"
+                  f"{result.rewritten / result.seconds * 60:>9.0f}{result.failed:>8}"
+                  f"{fake.requests.get('429', 0) - throttled:>6}")
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(db_path)
+    server.shutdown()
+    return True
+
+
+def bench_queries(args):
+    """
+    Seeds a large article table and times the hot queries without and with
+    the indexes added in migration 59c96ad749f2
+    """
+    import random
+    import statistics
+    import tempfile
+    from datetime import datetime, timedelta
+    from sqlalchemy import create_engine, select, text
+    from app.models import Article, normalize_url, title_hash
+
+    database_url = args.database
+    if not database_url:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{path}"
+    engine = create_engine(database_url)
+    table = Article.__table__
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+    index_names = ["ix_article_is_posted_created_at", "uq_article_url_key", "ix_article_title_hash"]
+    indexes = [i for i in table.indexes if i.name in index_names]
+    for index in indexes:
+        index.drop(engine)
+
+    print(f"Seeding {args.rows} rows into {database_url}")
+    start = datetime.utcnow() - timedelta(days=365)
+    with engine.begin() as conn:
+        batch = []
+        for i in range(args.rows):
+            url = f"https://www.levitin.de/tours/{i}"
+            title = f"Tour number {i} through Germany"
+            batch.append({
+                "original_text": title, "title": title, "url": url,
+                "url_key": normalize_url(url), "title_hash": title_hash(title),
+                "is_posted": i < args.rows * 0.95, "created_at": start + timedelta(seconds=i),
+            })
+            if len(batch) == 5000:
+                conn.execute(table.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(table.insert(), batch)
+
+    sample = random.Random(42).sample(range(args.rows * 2), 500)
+    url_keys = [normalize_url(f"https://www.levitin.de/tours/{i}") for i in sample]
+    title_hashes = [title_hash(f"Tour number {i} through Germany") for i in sample]
+    queries = {
+        "pending queue (limit 1)": select(table.c.id).where(table.c.is_posted == False)
+                                   .order_by(table.c.created_at).limit(1),
+        "url_key IN (500)": select(table.c.url_key).where(table.c.url_key.in_(url_keys)),
+        "title_hash IN (500)": select(table.c.title_hash).where(table.c.title_hash.in_(title_hashes)),
+    }
+
+    def run_all():
+        results = {}
+        with engine.connect() as conn:
+            for name, query in queries.items():
+                times = []
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    conn.execute(query).fetchall()
+                    times.append(time.perf_counter() - t0)
+                results[name] = statistics.median(times)
+        return results
+
+    before = run_all()
+    for index in indexes:
+        index.create(engine)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    after = run_all()
+
+    print(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in queries:
+        print(f"{name:<28}{before[name] * 1000:>12.2f}{after[name] * 1000:>12.2f}"
+              f"{before[name] / after[name]:>9.0f}x")
+
+    if not args.database:
+        engine.dispose()
+        os.remove(database_url[len("sqlite:///"):])
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks')
+    subparsers = parser.add_subparsers(dest='command', help='Benchmark to run')
+
+    extract_parser = subparsers.add_parser('extract', help='Compare article extraction implementations')
+    extract_parser.add_argument('--page', default=DEFAULT_PAGE, help='Saved HTML page to parse')
+    extract_parser.add_argument('--repeat', type=int, default=5, help='Repetitions, best time is reported')
+
+    content_parser = subparsers.add_parser('content', help='Compare detail-page content extraction')
+    content_parser.add_argument('pages', nargs='*', help='HTML files, directories or snapshot runs (default: levitin_page.html, debug/ and debug/artifacts/)')
+    content_parser.add_argument('--repeat', type=int, default=5, help='Repetitions, best time is reported')
+
+    queries_parser = subparsers.add_parser('queries', help='Article table query latency before/after indexes')
+    queries_parser.add_argument('--rows', type=int, default=200000, help='Rows to seed')
+    queries_parser.add_argument('--repeat', type=int, default=20, help='Repetitions, median time is reported')
+    queries_parser.add_argument('--database', help='Database URL (default: temporary SQLite file). The article table is recreated!')
+
+    suite_parser = subparsers.add_parser('suite', help='Per-stage ops/sec and memory over the scaled snapshot corpus')
+    suite_parser.add_argument('pages', nargs='*', help='HTML files, directories or snapshot runs (default: as for content)')
+    suite_parser.add_argument('--scale', type=int, default=10000, help='Minimum number of items after scaling')
+    suite_parser.add_argument('--repeat', type=int, default=3, help='Repetitions, best time is reported')
+    suite_parser.add_argument('--no-memory', action='store_true', help='Skip the traced run that measures peak memory')
+
+    replay_parser = subparsers.add_parser('replay', help='Run the scraper offline against saved snapshots')
+    replay_parser.add_argument('snapshots', nargs='?', default=ARTIFACTS_DIR,
+                               help='Artifact store, snapshot run directory or HTML file (default: debug/artifacts)')
+    replay_parser.add_argument('--default-page', default=DEFAULT_PAGE,
+                               help='HTML served for URLs without a snapshot (default: levitin_page.html)')
+
+    waits_parser = subparsers.add_parser('waits', help='Fixed sleeps vs. readiness-driven page waits (replayed pages)')
+    waits_parser.add_argument('snapshots', nargs='?', default=DEFAULT_PAGE,
+                              help='Artifact store, snapshot run directory or HTML file (default: levitin_page.html)')
+    waits_parser.add_argument('--default-page', default=None, help='HTML served for URLs without a snapshot')
+    waits_parser.add_argument('--details', type=int, default=20, help='Detail pages after the sections')
+    waits_parser.add_argument('--section-render', type=float, default=2.0, help='Median section render time, seconds')
+    waits_parser.add_argument('--detail-render', type=float, default=1.0, help='Median detail page render time, seconds')
+    waits_parser.add_argument('--time-scale', type=float, default=0.1, help='Run this much faster than real time')
+    waits_parser.add_argument('--seed', type=int, default=42, help='Seed of the render times')
+
+    rewrite_parser = subparsers.add_parser('rewrite', help='Compare rewriter backends: latency and API requests per rewrite')
+    rewrite_parser.add_argument('--backends', default='assistants,chat', help='Comma-separated backend names')
+    rewrite_parser.add_argument('--count', type=int, default=5, help='Rewrites per backend')
+    rewrite_parser.add_argument('--live', action='store_true', help='Use the configured OpenAI API instead of fake_openai.py (costs tokens)')
+    rewrite_parser.add_argument('--latency', type=float, default=1.0, help='Fake: seconds of model time per reply')
+    rewrite_parser.add_argument('--ttft', type=float, default=0.3, help='Fake: seconds to the first streamed delta')
+    rewrite_parser.add_argument('--rtt', type=float, default=0.05, help='Fake: network round trip per request, seconds')
+    rewrite_parser.add_argument('--per-kchar', type=float, default=0.0, help='Fake: extra reply seconds per 1000 input characters')
+    rewrite_parser.add_argument('--paragraphs', type=int, default=0, help='Rewrite a long article with this many paragraphs')
+    rewrite_parser.add_argument('--chunk-tokens', default='1500', help='Comma-separated REWRITE_CHUNK_TOKENS values, 0 = whole text')
+
+    batch_parser = subparsers.add_parser('rewrite-batch', help='Batch rewrite throughput per concurrency level (fake API)')
+    batch_parser.add_argument('--count', type=int, default=20, help='Pending articles to rewrite')
+    batch_parser.add_argument('--concurrency', default='1,4,8', help='Comma-separated concurrency levels')
+    batch_parser.add_argument('--latency', type=float, default=1.0, help='Fake: seconds of model time per reply')
+    batch_parser.add_argument('--rtt', type=float, default=0.05, help='Fake: network round trip per request, seconds')
+    batch_parser.add_argument('--rpm', type=int, default=0, help='Fake: requests accepted per window, 0 = unlimited')
+    batch_parser.add_argument('--window', type=float, default=60.0, help='Fake: rate-limit window, seconds')
+
+    args = parser.parse_args()
+
+    if args.command == 'extract':
+        ok = bench_extract(args)
+        sys.exit(0 if ok else 1)
+    elif args.command == 'content':
+        ok = bench_content(args)
+        sys.exit(0 if ok else 1)
+    elif args.command == 'queries':
+        ok = bench_queries(args)
+        sys.exit(0 if ok else 1)
+    elif args.command == 'suite':
+        ok = bench_suite(args)
+        sys.exit(0 if ok else 1)
+    elif args.command == 'replay':
+        ok = bench_replay(args)
+        sys.exit(0 if ok else 1)
+    elif args.command == 'waits':
+        ok = bench_waits(args)
+        sys.exit(0 if ok else 1)
+    elif args.command == 'rewrite':
+        ok = bench_rewrite(args)
+        sys.exit(0 if ok else 1)
+    elif args.command == 'rewrite-batch':
+        ok = bench_rewrite_batch(args)
+        sys.exit(0 if ok else 1)
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# fake_openai.py - Local stand-in for the OpenAI endpoints used by the rewriter
+
+import argparse
+import itertools
+import json
+import math
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAI:
+    """
+    In-memory threads, messages and runs. A run completes `latency` seconds
+    after it is created; streamed runs send the reply in `chunks` text
+    deltas, the first one after `ttft` seconds. A chat completion answers
+    after `latency` seconds. Replies take `per_kchar` seconds longer per
+    1000 characters of the user message. Every request additionally costs `rtt` seconds
+    of simulated network round trip. The reply is the user message
+    prefixed with "Rewritten: ".
+
+    With rpm set, at most rpm requests are accepted per `window` seconds;
+    responses carry x-ratelimit-* headers like the real API and excess
+    requests get a 429 with Retry-After.
+    """
+
+    def __init__(self, latency: float = 1.0, ttft: float = 0.5, chunks: int = 5, rtt: float = 0.0,
+                 instructions: str = "Rewrite the text for a travel channel.", model: str = "gpt-4o-mini",
+                 rpm: int = 0, window: float = 60.0, per_kchar: float = 0.0):
+        self.latency = latency
+        self.per_kchar = per_kchar
+        self.rpm = rpm
+        self.window = window
+        self._accepted = deque()
+        self.rtt = rtt
+        self.instructions = instructions
+        self.model = model
+        self.ttft = min(ttft, latency)
+        self.chunks = max(1, chunks)
+        self.threads = {}
+        self.runs = {}
+        self.requests = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def new_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._ids)}"
+
+    def count(self, endpoint: str):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def admit(self):
+        """
+        Returns (accepted, rate-limit headers) for a new request
+        """
+        if not self.rpm:
+            return True, {}
+        with self._lock:
+            now = time.monotonic()
+            while self._accepted and now - self._accepted[0] >= self.window:
+                self._accepted.popleft()
+            accepted = len(self._accepted) < self.rpm
+            if accepted:
+                self._accepted.append(now)
+            else:
+                self.requests["429"] = self.requests.get("429", 0) + 1
+            reset = self.window - (now - self._accepted[0]) if self._accepted else 0.0
+            headers = {
+                "x-ratelimit-limit-requests": str(self.rpm),
+                "x-ratelimit-remaining-requests": str(self.rpm - len(self._accepted)),
+                "x-ratelimit-reset-requests": f"{reset:.3f}s",
+            }
+            if not accepted:
+                headers["retry-after"] = str(max(1, math.ceil(reset)))
+            return accepted, headers
+
+    def message(self, thread_id: str, role: str, text: str, run_id=None) -> dict:
+        return {
+            "id": self.new_id("msg"), "object": "thread.message", "created_at": int(time.time()),
+            "thread_id": thread_id, "role": role, "status": "completed", "run_id": run_id,
+            "assistant_id": None, "attachments": [], "metadata": {},
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+        }
+
+    def reply_latency(self, text: str) -> float:
+        return self.latency + self.per_kchar * len(text) / 1000
+
+    def reply_for(self, thread_id: str) -> str:
+        user = [m for m in self.threads[thread_id] if m["role"] == "user"]
+        return "Rewritten: " + (user[-1]["content"][0]["text"]["value"] if user else "")
+
+    def run_object(self, run: dict) -> dict:
+        """
+        Current state of a run; the assistant message is added once it is done
+        """
+        if run["status"] != "completed" and time.monotonic() - run["started"] >= run["latency"]:
+            run["status"] = "completed"
+            self.threads[run["thread_id"]].append(
+                self.message(run["thread_id"], "assistant", self.reply_for(run["thread_id"]), run["id"]))
+        return {key: value for key, value in run.items() if key not in ("started", "latency")}
+
+    def create_run(self, thread_id: str, assistant_id: str) -> dict:
+        run = {"id": self.new_id("run"), "object": "thread.run", "created_at": int(time.time()),
+               "thread_id": thread_id, "assistant_id": assistant_id, "status": "queued",
+               "started": time.monotonic(), "latency": self.reply_latency(self.reply_for(thread_id))}
+        self.runs[run["id"]] = run
+        return run
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeOpenAI = None
+    limit_headers: dict = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in self.limit_headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _parts(self):
+        path = self.path.split("?", 1)[0]
+        return [p for p in path.split("/") if p][1:]  # без префикса /v1
+
+    def _rate_limited(self) -> bool:
+        accepted, self.limit_headers = self.fake.admit()
+        if not accepted:
+            self._json({"error": {"message": "Rate limit reached for requests", "type": "requests",
+                                  "code": "rate_limit_exceeded"}}, status=429)
+        return not accepted
+
+    def do_POST(self):
+        fake = self.fake
+        parts = self._parts()
+        body = self._body()
+        if self._rate_limited():
+            return None
+        if parts == ["threads"]:
+            fake.count("threads.create")
+            thread_id = fake.new_id("thread")
+            fake.threads[thread_id] = []
+            return self._json({"id": thread_id, "object": "thread", "created_at": int(time.time()), "metadata": {}})
+        if len(parts) == 3 and parts[0] == "threads" and parts[2] == "messages":
+            fake.count("messages.create")
+            message = fake.message(parts[1], body.get("role", "user"), body.get("content", ""))
+            fake.threads[parts[1]].append(message)
+            return self._json(message)
+        if parts == ["chat", "completions"]:
+            fake.count("chat.completions.create")
+            user = [m for m in body.get("messages", []) if m.get("role") == "user"]
+            text = "Rewritten: " + (user[-1]["content"] if user else "")
+            time.sleep(fake.reply_latency(text))
+            return self._json({
+                "id": fake.new_id("chatcmpl"), "object": "chat.completion", "created": int(time.time()),
+                "model": body.get("model") or fake.model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+        if len(parts) == 3 and parts[0] == "threads" and parts[2] == "runs":
+            run = fake.create_run(parts[1], body.get("assistant_id"))
+            if body.get("stream"):
+                fake.count("runs.create(stream)")
+                try:
+                    return self._stream_run(run)
+                except (BrokenPipeError, ConnectionResetError):
+                    return None  # клиент закрыл поток (таймаут)
+            fake.count("runs.create")
+            return self._json(fake.run_object(run))
+        self._json({"error": {"message": f"Unknown endpoint {self.path}"}}, status=404)
+
+    def do_GET(self):
+        fake = self.fake
+        parts = self._parts()
+        if parts == ["stats"]:
+            self.limit_headers = {}
+            return self._json(fake.requests)
+        if self._rate_limited():
+            return None
+        if len(parts) == 4 and parts[0] == "threads" and parts[2] == "runs":
+            fake.count("runs.retrieve")
+            return self._json(fake.run_object(fake.runs[parts[3]]))
+        if len(parts) == 3 and parts[0] == "threads" and parts[2] == "runs":
+            fake.count("runs.list")
+            data = [fake.run_object(run) for run in reversed(list(fake.runs.values())) if run["thread_id"] == parts[1]]
+            return self._json({"object": "list", "data": data[:1], "has_more": len(data) > 1,
+                               "first_id": data[0]["id"] if data else None,
+                               "last_id": data[0]["id"] if data else None})
+        if len(parts) == 3 and parts[0] == "threads" and parts[2] == "messages":
+            fake.count("messages.list")
+            data = list(reversed(fake.threads[parts[1]]))
+            return self._json({"object": "list", "data": data, "has_more": False,
+                               "first_id": data[0]["id"] if data else None,
+                               "last_id": data[-1]["id"] if data else None})
+        if len(parts) == 2 and parts[0] == "assistants":
+            fake.count("assistants.retrieve")
+            return self._json({"id": parts[1], "object": "assistant", "created_at": int(time.time()),
+                               "model": fake.model, "instructions": fake.instructions, "tools": [],
+                               "name": "fake", "description": None, "metadata": {}})
+        self._json({"error": {"message": f"Unknown endpoint {self.path}"}}, status=404)
+
+    def _event(self, name: str, data):
+        payload = data if isinstance(data, str) else json.dumps(data)
+        chunk = f"event: {name}\ndata: {payload}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+        self.wfile.flush()
+
+    def _stream_run(self, run: dict):
+        fake = self.fake
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for name, value in self.limit_headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        self._event("thread.run.created", fake.run_object(run))
+        run["status"] = "in_progress"
+        self._event("thread.run.in_progress", fake.run_object(run))
+        text = fake.reply_for(run["thread_id"])
+        message = fake.message(run["thread_id"], "assistant", "", run["id"])
+        message["status"] = "in_progress"
+        message["content"] = []
+        self._event("thread.message.created", message)
+
+        size = max(1, -(-len(text) // fake.chunks))
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        time.sleep(fake.ttft)
+        step = max(0.0, run["latency"] - fake.ttft) / max(1, len(pieces) - 1)
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(step)
+            self._event("thread.message.delta", {
+                "id": message["id"], "object": "thread.message.delta",
+                "delta": {"content": [{"index": 0, "type": "text", "text": {"value": piece, "annotations": []}}]},
+            })
+
+        completed = fake.message(run["thread_id"], "assistant", text, run["id"])
+        completed["id"] = message["id"]
+        fake.threads[run["thread_id"]].append(completed)
+        self._event("thread.message.completed", completed)
+        run["status"] = "completed"
+        self._event("thread.run.completed", fake.run_object(run))
+        self._event("done", "[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def start_fake_openai(host: str = "127.0.0.1", port: int = 0, **options):
+    """
+    Starts the fake in a background thread. Returns (server, fake, base_url);
+    pass base_url as OPENAI_BASE_URL.
+    """
+    fake = FakeOpenAI(**options)
+    handler = type("FakeHandler", (Handler,), {"fake": fake})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, fake, f"http://{host}:{server.server_port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local fake of the OpenAI Assistants and chat completions API')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=1.0, help='Seconds until a run completes')
+    parser.add_argument('--ttft', type=float, default=0.5, help='Seconds until the first streamed text delta')
+    parser.add_argument('--chunks', type=int, default=5, help='Number of streamed text deltas')
+    parser.add_argument('--rtt', type=float, default=0.0, help='Simulated network round trip per request, seconds')
+    parser.add_argument('--rpm', type=int, default=0, help='Requests accepted per minute, 0 = unlimited')
+    parser.add_argument('--per-kchar', type=float, default=0.0, help='Extra reply seconds per 1000 characters of input')
+    args = parser.parse_args()
+
+    server, _, base_url = start_fake_openai(port=args.port, latency=args.latency, ttft=args.ttft,
+                                            chunks=args.chunks, rtt=args.rtt, rpm=args.rpm,
+                                            per_kchar=args.per_kchar)
+    print(f"Fake OpenAI API on {base_url} (set OPENAI_BASE_URL={base_url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# fake_site_api.py - Local stand-in for the levitin.de JSON endpoints probed by the scraper
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class FakeSiteApi:
+    """
+    Answers every GET with a small JSON list after `latency` seconds;
+    paths listed in `delays` take their own time instead. Counts requests
+    per path and the highest number of requests in flight at once.
+    """
+
+    def __init__(self, latency: float = 0.1, delays: Optional[Dict[str, float]] = None):
+        self.latency = latency
+        self.delays = delays or {}
+        self.requests: Dict[str, int] = {}
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def begin(self, path: str):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def end(self):
+        with self._lock:
+            self.active -= 1
+
+    def delay_for(self, path: str) -> float:
+        return self.delays.get(path, self.latency)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeSiteApi = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        fake = self.fake
+        path = self.path.split("?", 1)[0]
+        if path == "/stats":
+            return self._json({"requests": fake.requests, "max_active": fake.max_active})
+        fake.begin(path)
+        try:
+            time.sleep(fake.delay_for(path))
+            items = [{"id": i, "title": f"Tour {i}", "url": f"{path}/{i}", "description": "Fake item"}
+                     for i in range(3)]
+            try:
+                self._json({"items": items})
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # клиент не дождался ответа (дедлайн)
+        finally:
+            fake.end()
+
+    def _json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_fake_site_api(host: str = "127.0.0.1", port: int = 0, **options):
+    """
+    Starts the fake in a background thread. Returns (server, fake, base_url);
+    pass base_url as the base URL of probe_endpoints / try_api_approach.
+    """
+    fake = FakeSiteApi(**options)
+    handler = type("FakeHandler", (Handler,), {"fake": fake})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, fake, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local fake of the site JSON endpoints')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0.1, help='Seconds per response')
+    parser.add_argument('--slow', action='append', default=[],
+                        help='PATH=SECONDS for an endpoint with its own latency, may be repeated')
+    args = parser.parse_args()
+
+    delays = {path: float(seconds) for path, seconds in (item.rsplit("=", 1) for item in args.slow)}
+    server, _, base_url = start_fake_site_api(port=args.port, latency=args.latency, delays=delays)
+    print(f"Fake site API on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
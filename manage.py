@@ -3,6 +3,8 @@
 Скрипт для управления приложением туристического сайта
 - Проверка состояния приложения
 - Очистка старых данных
+- Поиск почти-дубликатов статей
+- Кэш переписанных текстов
 - Принудительный запуск задач
 """
 
@@ -85,6 +87,95 @@ def truncate_logs():
         except Exception as e:
             print(f"Ошибка при обработке {log_file}: {e}")
 
+def report_near_duplicates(max_distance=None, reindex=False):
+    """Отчёт о кластерах почти-дубликатов среди сохранённых статей (без удаления)"""
+    from app.init import create_app
+    from app.models import Article, ArticleSimhashBand, db
+    from app.near_duplicates import cluster_hashes, simhash
+    from app.ingest import index_simhash_bands
+    
+    app = create_app()
+    with app.app_context():
+        if max_distance is None:
+            max_distance = app.config.get('NEAR_DUP_MAX_DISTANCE', 6)
+        
+        if reindex:
+            # Статьи без хэша или без строк в индексе полос
+            indexed = db.session.query(ArticleSimhashBand.article_id)
+            missing = Article.query.filter(~Article.id.in_(indexed)).all()
+            pairs = []
+            for article in missing:
+                article.simhash = simhash(article.original_text)
+                if article.simhash is not None:
+                    pairs.append((article.id, article.simhash))
+            index_simhash_bands(pairs)
+            db.session.commit()
+            print(f"Проиндексировано статей: {len(pairs)}")
+        
+        rows = db.session.query(Article.id, Article.simhash, Article.title, Article.is_posted).all()
+        titles = {row.id: (row.title, row.is_posted) for row in rows}
+        clusters = cluster_hashes(((row.id, row.simhash) for row in rows), max_distance=max_distance)
+        
+        print(f"\n===== Почти-дубликаты (расстояние <= {max_distance}) =====")
+        print(f"Статей: {len(rows)}, кластеров: {len(clusters)}, "
+              f"лишних статей: {sum(len(c) - 1 for c in clusters)}")
+        for number, members in enumerate(sorted(clusters, key=len, reverse=True), start=1):
+            print(f"\n----- Кластер {number} ({len(members)} статей) -----")
+            for article_id in sorted(members):
+                title, is_posted = titles[article_id]
+                status = "опубликована" if is_posted else "в очереди"
+                print(f"  #{article_id} [{status}] {title}")
+
+def report_sections(days=30):
+    """Отчёт о стоимости и пользе разделов: время загрузки против числа новых статей"""
+    from app.init import create_app
+    from app.section_stats import adaptive_timeouts, low_yield_sections, section_costs
+    
+    app = create_app()
+    with app.app_context():
+        costs = section_costs(days)
+        if not costs:
+            print(f"Нет истории разделов за последние {days} дней")
+            return
+        sections = [cost.section for cost in costs]
+        page_timeout = app.config.get('SCRAPE_PAGE_TIMEOUT', 45)
+        timeouts = adaptive_timeouts(sections, default=page_timeout,
+                                     minimum=app.config.get('SECTION_TIMEOUT_MIN', 10),
+                                     maximum=app.config.get('SECTION_TIMEOUT_MAX', page_timeout),
+                                     history=app.config.get('SECTION_HISTORY_RUNS', 20),
+                                     factor=app.config.get('SECTION_TIMEOUT_FACTOR', 1.5))
+        low_yield = low_yield_sections(sections, runs=app.config.get('SECTION_LOW_YIELD_RUNS', 5))
+        
+        print(f"\n===== Разделы за последние {days} дней =====")
+        print(f"{'Раздел':<40} {'визиты':>6} {'сред.с':>7} {'p95 с':>7} {'записи':>7} {'новые':>6} "
+              f"{'с/статья':>9} {'таймаут':>8}")
+        for cost in costs:
+            per_article = f"{cost.seconds_per_article:.1f}" if cost.seconds_per_article is not None else "-"
+            marker = "  (редко)" if cost.section in low_yield else ""
+            print(f"{cost.section:<40} {cost.runs:>6} {cost.avg_seconds:>7.1f} {cost.p95_seconds:>7.1f} "
+                  f"{cost.items:>7} {cost.new_articles:>6} {per_article:>9} {timeouts[cost.section]:>8.0f}{marker}")
+
+def report_rewrite_cache(clear=False):
+    """Состояние кэша переписанных текстов"""
+    from app.init import create_app
+    from app.rewrite_cache import get_rewrite_cache
+    
+    app = create_app()
+    cache = get_rewrite_cache(app.config)
+    if cache is None:
+        print("Кэш переписанных текстов отключён (REWRITE_CACHE_ENABLED=false)")
+        return
+    if clear:
+        print(f"Удалено записей кэша: {cache.clear()}")
+        return
+    usage = cache.usage()
+    print(f"\n===== Кэш переписанных текстов ({cache.directory}) =====")
+    print(f"Записей: {usage['entries']} из {cache.max_entries}")
+    print(f"Размер: {usage['bytes'] / 1024 / 1024:.2f} МБ из {cache.max_bytes / 1024 / 1024:.0f} МБ")
+    print(f"Повторных использований: {usage['hits']}")
+    if usage['entries'] + usage['hits']:
+        print(f"Доля запросов из кэша: {usage['hits'] / (usage['entries'] + usage['hits']):.0%}")
+
 def main():
     parser = argparse.ArgumentParser(description='Утилита управления туристическим сайтом')
     subparsers = parser.add_subparsers(dest='command', help='Команда для выполнения')
@@ -99,6 +190,23 @@ def main():
     clean_parser.add_argument('--logs', action='store_true', 
                              help='Очистить старые логи, оставив последние 1000 строк')
     
+    # Команда duplicates
+    duplicates_parser = subparsers.add_parser('duplicates', help='Показать кластеры почти-дубликатов (ничего не удаляет)')
+    duplicates_parser.add_argument('--distance', type=int, default=None,
+                                  help='Максимальное расстояние Хэмминга SimHash (по умолчанию NEAR_DUP_MAX_DISTANCE)')
+    duplicates_parser.add_argument('--reindex', action='store_true',
+                                  help='Сначала посчитать хэши для статей, которых нет в индексе')
+    
+    # Команда sections
+    sections_parser = subparsers.add_parser('sections', help='Показать стоимость и пользу разделов сайта')
+    sections_parser.add_argument('--days', type=int, default=30,
+                                help='За сколько последних дней учитывать визиты (по умолчанию 30)')
+    
+    # Команда rewrite-cache
+    cache_parser = subparsers.add_parser('rewrite-cache', help='Показать состояние кэша переписанных текстов')
+    cache_parser.add_argument('--clear', action='store_true',
+                             help='Удалить все записи кэша')
+    
     args = parser.parse_args()
     
     if args.command == 'health':
@@ -108,6 +216,12 @@ def main():
             clean_old_images(args.images)
         if args.logs:
             truncate_logs()
+    elif args.command == 'duplicates':
+        report_near_duplicates(args.distance, args.reindex)
+    elif args.command == 'sections':
+        report_sections(args.days)
+    elif args.command == 'rewrite-cache':
+        report_rewrite_cache(args.clear)
     else:
         parser.print_help()
 
@@ -0,0 +1,97 @@
+"""add simhash column and LSH band index for near-duplicate detection
+
+Revision ID: 1458af4adc9c
+Revises: 25cde79ff55e
+Create Date: 2026-10-17 21:32:41.507863
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from collections import Counter
+import hashlib
+import re
+
+
+# revision identifiers, used by Alembic.
+revision = '1458af4adc9c'
+down_revision = '25cde79ff55e'
+branch_labels = None
+depends_on = None
+
+
+# Копия simhash / band_keys из app/near_duplicates.py на момент миграции
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _simhash(text):
+    words = _WORD_RE.findall((text or "").casefold())
+    if len(words) < 2:
+        features = Counter([" ".join(words)]) if words else Counter()
+    else:
+        features = Counter(" ".join(words[i:i + 2]) for i in range(len(words) - 1))
+    if not features:
+        return None
+    weights = [0] * 64
+    for feature, count in features.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += count if h >> bit & 1 else -count
+    value = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    return value - (1 << 64) if value >> 63 else value
+
+
+def _band_keys(value):
+    value &= (1 << 64) - 1
+    return [(band << 8) | ((value >> (band * 8)) & 0xFF) for band in range(8)]
+
+
+def upgrade():
+    op.create_table('article_simhash_band',
+    sa.Column('article_id', sa.Integer(), nullable=False),
+    sa.Column('band_key', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['article.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('article_id', 'band_key')
+    )
+    op.create_index('ix_article_simhash_band_band_key', 'article_simhash_band', ['band_key'], unique=False)
+
+    with op.batch_alter_table('article') as batch_op:
+        batch_op.add_column(sa.Column('simhash', sa.BigInteger(), nullable=True))
+
+    # Backfill hashes and band index for existing articles
+    article = sa.table(
+        'article',
+        sa.column('id', sa.Integer),
+        sa.column('original_text', sa.Text),
+        sa.column('simhash', sa.BigInteger),
+    )
+    band = sa.table(
+        'article_simhash_band',
+        sa.column('article_id', sa.Integer),
+        sa.column('band_key', sa.Integer),
+    )
+    bind = op.get_bind()
+    updates = []
+    bands = []
+    for row in bind.execute(sa.select(article.c.id, article.c.original_text)):
+        value = _simhash(row.original_text)
+        if value is None:
+            continue
+        updates.append({'row_id': row.id, 'simhash': value})
+        bands.extend({'article_id': row.id, 'band_key': key} for key in _band_keys(value))
+
+    if updates:
+        bind.execute(
+            article.update()
+            .where(article.c.id == sa.bindparam('row_id'))
+            .values(simhash=sa.bindparam('simhash')),
+            updates
+        )
+        bind.execute(band.insert(), bands)
+
+
+def downgrade():
+    with op.batch_alter_table('article') as batch_op:
+        batch_op.drop_column('simhash')
+
+    op.drop_index('ix_article_simhash_band_band_key', table_name='article_simhash_band')
+    op.drop_table('article_simhash_band')
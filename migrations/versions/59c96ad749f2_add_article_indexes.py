@@ -0,0 +1,87 @@
+"""add pending-queue, url_key and title_hash indexes to Article
+
+Revision ID: 59c96ad749f2
+Revises: 825cb87626ef
+Create Date: 2026-10-17 19:05:12.418237
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from urllib.parse import urlsplit, urlunsplit
+import hashlib
+import re
+
+
+# revision identifiers, used by Alembic.
+revision = '59c96ad749f2'
+down_revision = '825cb87626ef'
+branch_labels = None
+depends_on = None
+
+
+# Копии normalize_url / title_hash из app/models.py на момент миграции,
+# чтобы миграция не зависела от дальнейших изменений кода приложения
+def _normalize_url(url):
+    if not url or not url.strip():
+        return None
+    parts = urlsplit(url.strip())
+    netloc = parts.netloc.lower()
+    if (parts.scheme == "http" and netloc.endswith(":80")) or (parts.scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), netloc, path, parts.query, ""))[:500]
+
+
+def _title_hash(title):
+    if not title or not title.strip():
+        return None
+    normalized = re.sub(r"\s+", " ", title.strip()).casefold()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def upgrade():
+    with op.batch_alter_table('article') as batch_op:
+        batch_op.add_column(sa.Column('url_key', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('title_hash', sa.String(length=40), nullable=True))
+
+    # Backfill keys; for duplicate URLs only the oldest row keeps its url_key
+    article = sa.table(
+        'article',
+        sa.column('id', sa.Integer),
+        sa.column('url', sa.String),
+        sa.column('title', sa.String),
+        sa.column('url_key', sa.String),
+        sa.column('title_hash', sa.String),
+    )
+    bind = op.get_bind()
+    seen_urls = set()
+    updates = []
+    for row in bind.execute(sa.select(article.c.id, article.c.url, article.c.title).order_by(article.c.id)):
+        url_key = _normalize_url(row.url)
+        if url_key in seen_urls:
+            url_key = None
+        elif url_key:
+            seen_urls.add(url_key)
+        updates.append({'row_id': row.id, 'url_key': url_key, 'title_hash': _title_hash(row.title)})
+
+    if updates:
+        bind.execute(
+            article.update()
+            .where(article.c.id == sa.bindparam('row_id'))
+            .values(url_key=sa.bindparam('url_key'), title_hash=sa.bindparam('title_hash')),
+            updates
+        )
+
+    op.create_index('ix_article_is_posted_created_at', 'article', ['is_posted', 'created_at'], unique=False)
+    op.create_index('uq_article_url_key', 'article', ['url_key'], unique=True)
+    op.create_index('ix_article_title_hash', 'article', ['title_hash'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_article_title_hash', table_name='article')
+    op.drop_index('uq_article_url_key', table_name='article')
+    op.drop_index('ix_article_is_posted_created_at', table_name='article')
+
+    with op.batch_alter_table('article') as batch_op:
+        batch_op.drop_column('title_hash')
+        batch_op.drop_column('url_key')
@@ -0,0 +1,66 @@
+"""rebuild the simhash band index with block-pair keys
+
+Revision ID: b7e41c2d9a05
+Revises: 8337c0775869
+Create Date: 2026-10-18 10:12:07.204511
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import itertools
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e41c2d9a05'
+down_revision = '8337c0775869'
+branch_labels = None
+depends_on = None
+
+
+# Копии band_keys из app/near_duplicates.py до и после этой миграции
+_PAIRS = list(itertools.combinations(range(8), 2))
+
+
+def _blocks(value):
+    value &= (1 << 64) - 1
+    return [(value >> (block * 8)) & 0xFF for block in range(8)]
+
+
+def _pair_keys(value):
+    blocks = _blocks(value)
+    return [(table << 16) | (blocks[i] << 8) | blocks[j] for table, (i, j) in enumerate(_PAIRS)]
+
+
+def _single_keys(value):
+    return [(band << 8) | block for band, block in enumerate(_blocks(value))]
+
+
+def _rebuild(keys):
+    article = sa.table(
+        'article',
+        sa.column('id', sa.Integer),
+        sa.column('simhash', sa.BigInteger),
+    )
+    band = sa.table(
+        'article_simhash_band',
+        sa.column('article_id', sa.Integer),
+        sa.column('band_key', sa.Integer),
+    )
+    bind = op.get_bind()
+    bind.execute(band.delete())
+    rows = []
+    for row in bind.execute(sa.select(article.c.id, article.c.simhash).where(article.c.simhash.isnot(None))).fetchall():
+        rows.extend({'article_id': row.id, 'band_key': key} for key in keys(row.simhash))
+        if len(rows) >= 10000:
+            bind.execute(band.insert(), rows)
+            rows = []
+    if rows:
+        bind.execute(band.insert(), rows)
+
+
+def upgrade():
+    _rebuild(_pair_keys)
+
+
+def downgrade():
+    _rebuild(_single_keys)
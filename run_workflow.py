@@ -14,11 +14,13 @@ from app.utils.logging_utils import setup_logging
 from app.models import Article, db
 from app.levitin_scraper import fetch_levitin_updates_comprehensive
 from app.rewriter import rewrite_text
+from app.rewrite_cache import get_rewrite_cache
+from app.rewrite_batch import rewrite_pending
 from app.image_editor import process_image_from_prompt
 from app.publisher import send_to_telegram
 import uuid
 
-def process_article(app, article_id=None):
+def process_article(app, article_id=None, use_cache=True):
     """
     Process a single article through the entire workflow
     """
@@ -44,7 +46,7 @@ def process_article(app, article_id=None):
             
             # Step 1: Rewrite text
             logger.info(f"Rewriting text for article ID={article_id}")
-            article.rewritten_text = rewrite_text(article.original_text)
+            article.rewritten_text = rewrite_text(article.original_text, use_cache=use_cache)
             
             # If rewriting failed, use original text
             if not article.rewritten_text or article.rewritten_text.startswith("[Error"):
@@ -110,6 +112,8 @@ if __name__ == "__main__":
     parser.add_argument('--scrape', action='store_true', help='Run scraping step')
     parser.add_argument('--process', action='store_true', help='Run processing step')
     parser.add_argument('--article-id', type=int, help='Process specific article by ID')
+    parser.add_argument('--no-cache', action='store_true', help='Rewrite again even if the text is in the rewrite cache')
+    parser.add_argument('--rewrite-batch', type=int, metavar='N', help='Only rewrite up to N pending articles concurrently')
     args = parser.parse_args()
     
     # Create app context
@@ -117,6 +121,12 @@ if __name__ == "__main__":
     
     # Run operations based on arguments
     with app.app_context():
+        if args.rewrite_batch:
+            result = rewrite_pending(args.rewrite_batch)
+            logger.info(f"Batch rewrite: {result.rewritten} of {result.selected} articles rewritten "
+                        f"in {result.seconds:.1f}s, {result.failed} failed")
+            sys.exit(0)
+        
         if args.scrape or not (args.scrape or args.process):  # Default to running both if no args
             logger.info("Running scraping step")
             try:
@@ -129,7 +139,7 @@ if __name__ == "__main__":
             logger.info("Running processing step")
             try:
                 if args.article_id:
-                    success = process_article(app, args.article_id)
+                    success = process_article(app, args.article_id, use_cache=not args.no_cache)
                     logger.info(f"Processing article ID={args.article_id}: {'Success' if success else 'Failed'}")
                 else:
                     # Process up to 3 articles
@@ -140,12 +150,15 @@ if __name__ == "__main__":
                             logger.info("No more unpublished articles to process")
                             break
                             
-                        success = process_article(app, article.id)
+                        success = process_article(app, article.id, use_cache=not args.no_cache)
                         if success:
                             processed += 1
                             
                     logger.info(f"Processing completed: {processed} articles processed")
             except Exception as e:
                 logger.error(f"Error during processing: {e}", exc_info=True)
+            cache = get_rewrite_cache(app.config)
+            if cache is not None:
+                logger.info(f"Rewrite cache: {cache.summary()}")
     
     logger.info(f"=== Workflow test completed at {datetime.now()} ===")
@@ -0,0 +1,57 @@
+# tests/test_browser_pool.py
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.browser import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_recycled_driver_frees_slot_for_waiter():
+    created = []
+
+    def factory():
+        created.append(FakeDriver())
+        return created[-1]
+
+    pool = DriverPool(size=1, factory=factory, max_pages=1)
+    first = pool.acquire()
+    result = {}
+
+    def waiter():
+        result["driver"] = pool.acquire()
+
+    thread = threading.Thread(target=waiter, daemon=True)
+    thread.start()
+    thread.join(0.2)
+    assert thread.is_alive()  # пул полон, второй поток ждёт
+
+    pool.release(first)  # max_pages=1: драйвер пересоздаётся, а не возвращается
+    thread.join(2)
+    assert not thread.is_alive()
+    assert first.quit_called
+    assert result["driver"] is created[1]
+
+
+def test_unhealthy_driver_frees_slot_for_waiter():
+    pool = DriverPool(size=1, factory=FakeDriver)
+    first = pool.acquire()
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(driver=pool.acquire()), daemon=True)
+    thread.start()
+    pool.release(first, broken=True)
+    thread.join(2)
+    assert not thread.is_alive()
+    assert result["driver"] is not first
@@ -0,0 +1,60 @@
+# tests/test_frontier.py
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.frontier import Frontier
+from app.levitin_scraper import is_article_url
+from app.models import CrawlUrl, db
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite://", SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def test_mark_fetched_many_reschedules_each_url(app):
+    frontier = Frontier(default_hours=24, min_hours=6, max_hours=168)
+    urls = [f"https://example.com/news/{i}" for i in range(3)]
+    frontier.add(urls)
+    db.session.commit()
+    frontier.mark_fetched_many({urls[0]: True, urls[1]: False, urls[2]: None,
+                                "https://example.com/unknown": True})
+    db.session.commit()
+
+    rows = {row.url: row for row in CrawlUrl.query}
+    assert rows[urls[0]].revisit_hours == 24  # первая загрузка интервал не сокращает
+    assert rows[urls[0]].last_changed_at is not None
+    assert rows[urls[1]].revisit_hours == 48
+    assert rows[urls[2]].last_fetched_at is None
+    assert "https://example.com/unknown" not in rows
+
+
+def test_postpone_moves_urls_out_of_due(app):
+    frontier = Frontier(max_hours=168)
+    frontier.add(["https://example.com/datenschutz", "https://example.com/news/a"])
+    db.session.commit()
+    frontier.postpone(["https://example.com/datenschutz"])
+    db.session.commit()
+
+    assert [row.url for row in frontier.due("detail")] == ["https://example.com/news/a"]
+    row = CrawlUrl.query.filter_by(url="https://example.com/datenschutz").one()
+    assert row.next_fetch_at > datetime.utcnow() + timedelta(hours=167)
+
+
+def test_article_urls_are_below_article_sections():
+    assert is_article_url("https://www.levitin.de/news/kreta-im-mai")
+    assert is_article_url("https://www.levitin.de/tours/berlin/")
+    assert not is_article_url("https://www.levitin.de/news")
+    assert not is_article_url("https://www.levitin.de/datenschutz")
+    assert not is_article_url("https://www.levitin.de/contact/form")
@@ -0,0 +1,62 @@
+# tests/test_http_cache.py
+import json
+import os
+import sys
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.http_cache import HttpCache
+
+URL = "https://example.com/api/tours"
+
+
+class FakeSession:
+    """
+    Answers 304 to conditional requests, otherwise 200 with an ETag
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        response = requests.Response()
+        response.url = url
+        if headers and headers.get("If-None-Match") == '"v1"':
+            response.status_code = 304
+            response._content = b""
+        else:
+            response.status_code = 200
+            response.headers["ETag"] = '"v1"'
+            response._content = b'{"tours": []}'
+        return response
+
+
+def test_304_without_cached_body_refetches_unconditionally(tmp_path):
+    cache = HttpCache(str(tmp_path), default_ttl=0)
+    session = FakeSession()
+    cache.get(URL, session=session)
+    os.remove(cache._paths(cache._key(URL))[1])
+
+    response = cache.get(URL, session=session)
+    assert response.status_code == 200
+    assert response.content == b'{"tours": []}'
+    assert "If-None-Match" in session.requests[1]
+    assert "If-None-Match" not in session.requests[2]
+
+
+def test_hit_persists_last_access(tmp_path):
+    cache = HttpCache(str(tmp_path), default_ttl=3600)
+    session = FakeSession()
+    cache.get(URL, session=session)
+    meta_path = cache._paths(cache._key(URL))[0]
+    with open(meta_path, encoding="utf-8") as f:
+        stored = json.load(f)["last_access"]
+
+    cache.get(URL, session=session)
+    assert len(session.requests) == 1
+    with open(meta_path, encoding="utf-8") as f:
+        assert json.load(f)["last_access"] >= stored
+    assert HttpCache(str(tmp_path))._index[cache._key(URL)]["last_access"] == cache._index[cache._key(URL)]["last_access"]
@@ -0,0 +1,43 @@
+# tests/test_http_client.py
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.http_client import create_session, probe_endpoints
+from app.rate_limiter import HostRateLimiter
+from fake_site_api import start_fake_site_api
+
+
+@pytest.fixture
+def session():
+    return create_session(limiter=HostRateLimiter(enabled=False))
+
+
+def test_probe_respects_per_host_limit(session):
+    server, fake, base_url = start_fake_site_api(latency=0.2)
+    try:
+        urls = [f"{base_url}/api/tours/{i}" for i in range(8)]
+        results = probe_endpoints(urls, deadline=5, max_per_host=2, session=session)
+    finally:
+        server.shutdown()
+    assert [r.status for r in results] == [200] * 8
+    assert [r.url for r in results] == urls
+    assert fake.max_active == 2
+
+
+def test_probe_reports_slow_endpoints_at_the_deadline(session):
+    server, fake, base_url = start_fake_site_api(latency=0.05, delays={"/api/slow": 3.0})
+    try:
+        start = time.monotonic()
+        results = probe_endpoints([f"{base_url}/api/tours", f"{base_url}/api/slow"],
+                                  timeout=10, deadline=0.5, session=session)
+        elapsed = time.monotonic() - start
+    finally:
+        server.shutdown()
+    assert elapsed < 1.5
+    assert results[0].status == 200
+    assert results[1].status is None and results[1].error
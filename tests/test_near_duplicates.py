@@ -0,0 +1,35 @@
+# tests/test_near_duplicates.py
+import os
+import random
+import sys
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.near_duplicates import MAX_DISTANCE, SIMHASH_BITS, band_keys, clamp_distance
+
+
+def _flip(value, bits):
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def test_pairs_within_max_distance_share_a_key():
+    rng = random.Random(1)
+    for _ in range(2000):
+        value = rng.getrandbits(SIMHASH_BITS)
+        other = _flip(value, rng.sample(range(SIMHASH_BITS), MAX_DISTANCE))
+        assert set(band_keys(value)) & set(band_keys(other))
+
+
+def test_buckets_stay_small():
+    rng = random.Random(2)
+    buckets = Counter(key for _ in range(20000) for key in band_keys(rng.getrandbits(SIMHASH_BITS)))
+    # 16-битные корзины: в среднем 20000 / 65536 статей на ключ
+    assert max(buckets.values()) < 10
+
+
+def test_distance_is_clamped():
+    assert clamp_distance(MAX_DISTANCE + 3) == MAX_DISTANCE
+    assert clamp_distance(3) == 3
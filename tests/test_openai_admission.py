@@ -0,0 +1,19 @@
+# tests/test_openai_admission.py
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.openai_admission import OpenAIAdmission
+
+
+def test_exhausted_requests_pause_once():
+    admission = OpenAIAdmission(default_pause=0.01)
+    admission.observe(200, {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "10ms"})
+    assert admission.preempted == 1
+
+    # Ответы без заголовков лимита (например, списки сообщений) не продлевают паузу
+    admission.observe(200, {})
+    admission.observe(200, {})
+    assert admission.preempted == 1
+    assert admission.remaining_requests is None
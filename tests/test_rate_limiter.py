@@ -0,0 +1,35 @@
+# tests/test_rate_limiter.py
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.rate_limiter as rate_limiter
+from app.rate_limiter import HostRateLimiter, configure_rate_limiter, get_rate_limiter
+
+URL = "https://example.com/api/tours"
+
+
+def test_reservations_during_pause_stay_apart():
+    limiter = HostRateLimiter(rate=1.0, burst=1, min_rate=0.1)
+    limiter.feedback(URL, 429, "5")
+    bucket = limiter._bucket(URL)
+    waits = [bucket.reserve() for _ in range(6)]
+
+    assert waits[0] >= 5.0
+    gaps = [later - earlier for earlier, later in zip(waits, waits[1:])]
+    assert all(abs(gap - 1 / bucket.rate) < 0.01 for gap in gaps)
+
+
+def test_configured_limiter_is_used_by_threads_without_app_context():
+    try:
+        configure_rate_limiter({"RATE_LIMIT_ENABLED": False, "RATE_LIMIT_HOSTS": "127.0.0.1=0.5"})
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(get_rate_limiter()))
+        thread.start()
+        thread.join()
+        assert seen[0].enabled is False
+        assert seen[0].host_rates == {"127.0.0.1": 0.5}
+    finally:
+        rate_limiter._limiter = None
@@ -0,0 +1,39 @@
+# tests/test_resource_filter.py
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.resource_filter import read_page_resources
+
+
+class LogDriver:
+    current_url = "https://example.com/news/a"
+
+    def __init__(self, events):
+        self.events = events
+
+    def get_log(self, kind):
+        assert kind == "performance"
+        return [{"message": json.dumps({"message": {"method": method, "params": params}})}
+                for method, params in self.events]
+
+
+def document(frame_id, status):
+    return ("Network.responseReceived", {"type": "Document", "frameId": frame_id, "response": {"status": status}})
+
+
+def test_status_comes_from_main_frame_not_iframe():
+    driver = LogDriver([
+        document("main", 429),
+        document("ad", 200),
+        ("Page.frameNavigated", {"frame": {"id": "ad", "parentId": "main"}}),
+        ("Page.frameNavigated", {"frame": {"id": "main"}}),
+    ])
+    assert read_page_resources(driver).status == 429
+
+
+def test_first_document_without_page_events():
+    driver = LogDriver([document("main", 503), document("ad", 200)])
+    assert read_page_resources(driver).status == 503
@@ -0,0 +1,65 @@
+# tests/test_rewrite_batch.py
+import os
+import sys
+import threading
+
+import pytest
+from flask import Flask
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.rewrite_batch as rewrite_batch
+from app.models import Article, db
+from app.rewrite_batch import claim_articles, release_article, rewrite_claim, rewrite_pending
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path}/t.db", SQLALCHEMY_TRACK_MODIFICATIONS=False,
+                      REWRITE_CACHE_ENABLED=False)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def test_claim_is_exclusive_until_released():
+    assert claim_articles([1, 2]) == {1, 2}
+    assert claim_articles([2, 3]) == {3}
+    with rewrite_claim(2, timeout=0.05) as claimed:
+        assert not claimed
+    for article_id in (1, 2, 3):
+        release_article(article_id)
+    with rewrite_claim(2, timeout=0.05) as claimed:
+        assert claimed
+
+
+def test_publish_waits_for_the_batch_instead_of_rewriting(app, monkeypatch):
+    started, finish, calls = threading.Event(), threading.Event(), []
+
+    def slow_rewrite(text):
+        calls.append(text)
+        started.set()
+        finish.wait(5)
+        return "Rewritten: " + text
+
+    monkeypatch.setattr(rewrite_batch, "rewrite_text", slow_rewrite)
+    article = Article(original_text="Neue Flugverbindungen nach Kreta fuer den ganzen Sommer 2026.")
+    db.session.add(article)
+    db.session.commit()
+
+    def run_batch():
+        with app.app_context():
+            rewrite_pending(5, concurrency=1)
+
+    batch = threading.Thread(target=run_batch)
+    batch.start()
+    assert started.wait(5)
+    threading.Timer(0.2, finish.set).start()
+    with rewrite_claim(article.id, timeout=5) as claimed:
+        db.session.refresh(article)
+        assert claimed
+        assert article.rewritten_text.startswith("Rewritten: ")
+    batch.join(5)
+    assert len(calls) == 1
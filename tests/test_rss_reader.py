@@ -0,0 +1,58 @@
+# tests/test_rss_reader.py
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rss_reader import iter_feed_entries
+from app.sources import RssSource, build_sources
+
+FEEDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "feeds")
+
+
+def feed(name):
+    return os.path.join(FEEDS, name)
+
+
+def test_rss2_entries_with_escaped_html():
+    first, second = list(iter_feed_entries(feed("rss2.xml")))
+    assert first.title == "Kreta & Rhodos: neue Flüge"
+    assert first.url == "https://example.com/news/kreta-rhodos"
+    assert first.summary == "Ab Mai täglich nach Heraklion."
+    assert first.content == "Die Airline fliegt ab Mai täglich."
+    assert first.published == "Mon, 04 May 2026 08:00:00 GMT"
+    # Без <link> ссылкой служит guid
+    assert second.url == "https://example.com/news/ostsee"
+    assert second.summary == "Neue Strandhotels in Warnemünde."
+
+
+def test_rss1_entries():
+    [entry] = list(iter_feed_entries(feed("rss1.xml")))
+    assert entry.title == "Wandern auf Madeira"
+    assert entry.url == "https://example.org/blog/madeira"
+    assert entry.summary == "Levadas & Gipfel"
+    assert entry.published == "2026-05-01T10:00:00Z"
+
+
+def test_atom_entries_use_alternate_link():
+    first, second = list(iter_feed_entries(feed("atom.xml")))
+    assert first.title == "Lissabon im Frühling"
+    assert first.url == "https://example.net/reisen/lissabon"
+    assert first.summary == "Die besten Viertel der Stadt."
+    assert first.content == "Alfama, Baixa und Belém."
+    assert first.published == "2026-05-02T09:00:00Z"
+    # Ссылка без rel считается alternate
+    assert second.url == "https://example.net/reisen/porto"
+    assert second.published == "2026-05-01T09:00:00Z"
+
+
+def test_build_sources_skips_unknown_and_unconfigured():
+    config = {"INGEST_SOURCES": "nosuch,rss", "RSS_FEED_URL": ""}
+    assert build_sources(config) == []
+
+    config = {"INGEST_SOURCES": "nosuch, rss", "RSS_FEED_URL": f"{feed('rss2.xml')},{feed('atom.xml')}",
+              "SOURCE_INTERVALS": "rss=30"}
+    [source] = build_sources(config)
+    assert isinstance(source, RssSource)
+    assert source.feed_urls == [feed("rss2.xml"), feed("atom.xml")]
+    assert source.interval_minutes == 30.0
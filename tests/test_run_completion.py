@@ -0,0 +1,72 @@
+# tests/test_run_completion.py
+import os
+import sys
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.run_completion import complete_run
+from fake_openai import start_fake_openai
+
+
+class EndedStream:
+    """
+    Stream that reports the run and ends without a final run event
+    """
+
+    def __init__(self, run):
+        self.events = [SimpleNamespace(event="thread.run.created", data=run)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(self.events)
+
+
+@pytest.fixture
+def fake_api():
+    server, fake, base_url = start_fake_openai(latency=0.3)
+    client = openai.OpenAI(api_key="test", base_url=base_url)
+    thread = client.beta.threads.create()
+    client.beta.threads.messages.create(thread_id=thread.id, role="user", content="Kreta im Mai")
+    yield client, fake, thread.id
+    server.shutdown()
+
+
+def test_failed_stream_polls_the_run_the_server_created(fake_api, monkeypatch):
+    client, fake, thread_id = fake_api
+    create = client.beta.threads.runs.create
+
+    def create_then_fail(**kwargs):
+        if kwargs.pop("stream", False):
+            create(thread_id=kwargs["thread_id"], assistant_id=kwargs["assistant_id"])
+            raise RuntimeError("connection reset")
+        return create(**kwargs)
+
+    monkeypatch.setattr(client.beta.threads.runs, "create", create_then_fail)
+    result = complete_run(client, thread_id, "asst_1", timeout=5)
+    assert result.status == "completed"
+    assert result.text == "Rewritten: Kreta im Mai"
+    assert fake.requests["runs.create"] == 1
+
+
+def test_stream_without_final_event_is_polled(fake_api, monkeypatch):
+    client, fake, thread_id = fake_api
+    create = client.beta.threads.runs.create
+
+    def create_and_cut(**kwargs):
+        kwargs.pop("stream")
+        kwargs.pop("timeout")
+        return EndedStream(create(**kwargs))
+
+    monkeypatch.setattr(client.beta.threads.runs, "create", create_and_cut)
+    result = complete_run(client, thread_id, "asst_1", timeout=5)
+    assert result.status == "completed"
+    assert result.metrics.mode == "stream+poll"
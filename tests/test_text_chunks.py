@@ -0,0 +1,31 @@
+# tests/test_text_chunks.py
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.text_chunks import estimate_tokens, fit_budget, paragraphs, split_chunks
+
+PARAGRAPH = " ".join(f"Sentence {i} is about the island and its beaches." for i in range(12))
+
+
+def article(count):
+    return "Title\n\nSummary line.\n\n" + "\n\n".join(PARAGRAPH for _ in range(count))
+
+
+def test_summarize_shortens_only_as_many_paragraphs_as_needed():
+    text = article(26)
+    result = fit_budget(text, 2000)
+    assert 0.8 * 2000 < estimate_tokens(result) <= 2000
+    parts = paragraphs(result)
+    assert len(parts) == 28  # все абзацы остались
+    assert parts[2] == PARAGRAPH  # первые - целиком
+    assert parts[-1] != PARAGRAPH
+
+
+def test_chunks_capped_at_max_chunks():
+    text = article(20)
+    assert len(split_chunks(text, 300)) > 4
+    chunks = split_chunks(text, 300, max_chunks=4)
+    assert len(chunks) == 4
+    assert "\n\n".join(chunks) == text